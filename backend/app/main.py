@@ -2,6 +2,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
+from app.utils.logging_config import configure_logging
+
+configure_logging()
+
 from .routers import auth, chat, recommendation, user, reports, roadmap, smart_related
 from app.routers.final_plan import router as final_plan_router
 from app.routers.ai_advisor import router as smart_summary_router
@@ -9,10 +13,15 @@ from app.routers import traits
 from app.routers import health
 from app.routers import compare_programs
 from app.routers import switch_advisor
+from app.routers import jobs
+from app.utils.tracing import tracing_middleware
+from app.utils.warmup import warmup_lifespan
 
-app = FastAPI()
+app = FastAPI(lifespan=warmup_lifespan)
 load_dotenv()
 
+app.middleware("http")(tracing_middleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -43,3 +52,4 @@ app.include_router(traits.router, prefix="/traits", tags=["Traits"])
 app.include_router(health.router, prefix="/health", tags=["Health"])
 app.include_router(compare_programs.router)
 app.include_router(switch_advisor.router)
+app.include_router(jobs.router)
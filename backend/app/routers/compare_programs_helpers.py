@@ -1,21 +1,24 @@
 import re
 import json
 import logging
-from typing import List, Dict, Any
+import threading
+import time
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from datetime import datetime
 
-from app.utils.database import supabase
+from app.utils.catalog_artifact import get_catalog
+from app.utils.database import fetch_all, supabase
 
 logger = logging.getLogger(__name__)
 
-
-COURSE_EQUIVALENCE_GROUPS = [
-    {"MATH1131", "MATH1141"},  
-    {"MATH1231", "MATH1241"}, 
-    {"PHYS1121", "PHYS1131"},  
-    {"CHEM1011", "CHEM1031"}, 
-    {"MATH1081", "MATH1091"},  
-]
+COURSE_CODE_RE = re.compile(r"\b[A-Z]{4}\d{4}\b")
+# Clause labels in handbook condition text, e.g. "Prerequisite: MATH1131. Exclusion: MATH1141"
+CONDITION_CLAUSE_RE = re.compile(
+    r"\b(pre-?requisites?|co-?requisites?|equivalents?|exclusions?|excluded|excludes)\s*(?:courses?)?\s*:",
+    re.IGNORECASE,
+)
+# After a failed build, lookups use an empty index until this long has passed
+EQUIVALENCE_RETRY_SECONDS = 60
 
 
 def infer_course_level(code: str) -> int:
@@ -32,13 +35,147 @@ def get_level_name(level: int) -> str:
     return f"Level {level}"
 
 
+# ---- Course equivalences ----------------------------------------------------
+
+def split_conditions(conditions_text: str) -> Tuple[str, List[str], List[str]]:
+    """
+    Split condition text into (requisite text, codes in Equivalent clauses, codes in Exclusion clauses).
+    "Prerequisite: COMP1511. Exclusion: COMP1917" -> ("Prerequisite: COMP1511. ", [], ["COMP1917"])
+    """
+    if not conditions_text:
+        return "", [], []
+    lowered = conditions_text.lower()
+    if "equiv" not in lowered and "exclu" not in lowered:
+        return conditions_text, [], []
+
+    # [lead, label, body, label, body, ...]
+    parts = CONDITION_CLAUSE_RE.split(conditions_text)
+    requisite = [parts[0]]
+    equivalent: List[str] = []
+    excluded: List[str] = []
+    for label, body in zip(parts[1::2], parts[2::2]):
+        if label.lower().startswith("equiv"):
+            equivalent.extend(COURSE_CODE_RE.findall(body))
+        elif label.lower().startswith("exclu"):
+            excluded.extend(COURSE_CODE_RE.findall(body))
+        else:
+            requisite.append(f"{label}:{body}")
+    return "".join(requisite), equivalent, excluded
+
+
+class CourseEquivalence:
+    """
+    Union-find over course codes named in Equivalent clauses, plus direct exclusion pairs.
+    Exclusions aren't transitive (MATH1031 excludes MATH1131, which excludes MATH1141, doesn't
+    make MATH1031 and MATH1141 interchangeable), so they're kept as pairs and never unioned.
+    freeze() flattens both so a lookup is one dict access each.
+    """
+
+    def __init__(self):
+        self._parent: Dict[str, str] = {}
+        self._group: Dict[str, Tuple[str, ...]] = {}
+        self._excluded: Dict[str, Any] = {}
+
+    def _root(self, code: str) -> str:
+        parent = self._parent
+        root = code
+        while parent.setdefault(root, root) != root:
+            root = parent[root]
+        while code != root:
+            parent[code], code = root, parent[code]
+        return root
+
+    def union(self, a: str, b: str):
+        ra, rb = self._root(a), self._root(b)
+        if ra != rb:
+            self._parent[rb] = ra
+
+    def exclude(self, a: str, b: str):
+        self._excluded.setdefault(a, set()).add(b)
+        self._excluded.setdefault(b, set()).add(a)
+
+    def freeze(self) -> "CourseEquivalence":
+        groups: Dict[str, List[str]] = {}
+        for code in self._parent:
+            groups.setdefault(self._root(code), []).append(code)
+        self._group = {}
+        for members in groups.values():
+            if len(members) > 1:
+                group = tuple(sorted(members))
+                for code in group:
+                    self._group[code] = group
+        self._parent = {}
+        self._excluded = {code: tuple(sorted(others)) for code, others in self._excluded.items()}
+        return self
+
+    def equivalents(self, code: str) -> List[str]:
+        """Codes in the same Equivalent group, then codes with a direct exclusion."""
+        found = [c for c in self._group.get(code, ()) if c != code]
+        found.extend(c for c in self._excluded.get(code, ()) if c != code and c not in found)
+        return found
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "courses": len(self._group),
+            "groups": len({id(g) for g in self._group.values()}),
+            "exclusion_pairs": sum(len(others) for others in self._excluded.values()) // 2,
+        }
+
+
+def build_equivalence_index(rows: Iterable[Tuple[str, Optional[str]]]) -> CourseEquivalence:
+    """Index from (code, conditions text) pairs."""
+    index = CourseEquivalence()
+    for code, conditions in rows:
+        _, equivalent, excluded = split_conditions(conditions or "")
+        for other in equivalent:
+            if other != code:
+                index.union(code, other)
+        for other in excluded:
+            if other != code:
+                index.exclude(code, other)
+    return index.freeze()
+
+
+def _fetch_course_conditions() -> List[Tuple[str, str]]:
+    # Only rows that can have an Equivalent/Exclusion clause
+    rows = fetch_all(
+        "unsw_courses", "code,conditions_for_enrolment",
+        lambda q: q.or_("conditions_for_enrolment.ilike.*equiv*,conditions_for_enrolment.ilike.*exclu*"),
+    )
+    return [(r["code"], r.get("conditions_for_enrolment")) for r in rows]
+
+
+_equivalence: Optional[CourseEquivalence] = None
+_equivalence_failed_at: Optional[float] = None
+_equivalence_lock = threading.Lock()
+_NO_EQUIVALENCES = CourseEquivalence().freeze()
+
+
+def get_equivalence_index() -> CourseEquivalence:
+    """Built once per process from the catalog artifact, or from unsw_courses without one."""
+    global _equivalence, _equivalence_failed_at
+    if _equivalence is not None:
+        return _equivalence
+    with _equivalence_lock:
+        if _equivalence is None:
+            if _equivalence_failed_at is not None and \
+                    time.monotonic() - _equivalence_failed_at < EQUIVALENCE_RETRY_SECONDS:
+                return _NO_EQUIVALENCES
+            try:
+                catalog = get_catalog()
+                rows = catalog.course_conditions() if catalog is not None else _fetch_course_conditions()
+                _equivalence = build_equivalence_index(rows)
+                logger.info("Built course equivalence index: %s", _equivalence.counts())
+            except Exception as e:
+                _equivalence_failed_at = time.monotonic()
+                logger.warning("Could not build course equivalence index: %s", e)
+                return _NO_EQUIVALENCES
+    return _equivalence
+
+
 def get_equivalent_codes(course_code: str) -> List[str]:
     """Get equivalent course codes"""
-    equivalents: List[str] = []
-    for group in COURSE_EQUIVALENCE_GROUPS:
-        if course_code in group:
-            equivalents.extend(list(group - {course_code}))
-    return equivalents
+    return get_equivalence_index().equivalents(course_code)
 
 
 # ---- Prerequisite parsing ---------------------------------------------------
@@ -63,6 +200,9 @@ def parse_prerequisites(conditions_text: str) -> Dict[str, Any]:
     if not conditions_text:
         return {"type": "none", "courses": []}
     
+    # Equivalent/excluded courses aren't requirements
+    conditions_text = split_conditions(conditions_text)[0]
+    
     course_pattern = r"\b[A-Z]{4}\d{4}\b"
     all_courses = re.findall(course_pattern, conditions_text)
     
@@ -258,30 +398,40 @@ def enrich_courses_with_conditions(
     if not codes:
         return course_list
 
-    logger.info(f"Enriching {len(codes)} courses with prerequisite data")
+    logger.debug("Enriching %s courses with prerequisite data", len(codes))
+
+    # Catalog artifact has the conditions and their parsed trees already
+    catalog = get_catalog()
+    if catalog is not None:
+        for c in course_list:
+            if not c.get("conditions_for_enrolment"):
+                row = catalog.course(c["code"])
+                c["conditions_for_enrolment"] = row["conditions_for_enrolment"] if row else ""
+                c["prereq_info"] = catalog.prerequisites(c["code"])
+        return course_list
 
     try:
         resp = supabase.table("unsw_courses").select("code,conditions_for_enrolment").in_("code", codes).execute()
         data = resp.data or []
         
-        logger.info(f"Fetched conditions for {len(data)} courses from database")
+        logger.debug("Fetched conditions for %s courses from database", len(data))
         cond_map = {row["code"]: row.get("conditions_for_enrolment", "") for row in data}
         
         with_conditions = sum(1 for v in cond_map.values() if v and v.strip())
-        logger.info(f"Courses with actual prerequisite data: {with_conditions}/{len(data)}")
+        logger.debug("Courses with actual prerequisite data: %s/%s", with_conditions, len(data))
 
         for c in course_list:
             if not c.get("conditions_for_enrolment"):
                 c["conditions_for_enrolment"] = cond_map.get(c["code"], "")
     except Exception as e:
-        logger.error(f"Error fetching course conditions: {str(e)}", exc_info=True)
+        logger.error("Error fetching course conditions: %s", e, exc_info=True)
 
     return course_list
 
 
 def group_courses_by_level(courses: List[Dict[str, Any]], completed_codes: set) -> Dict[str, Any]:
     """Group courses by level with metadata"""
-    logger.info(f"Grouping {len(courses)} courses by level")
+    logger.debug("Grouping %s courses by level", len(courses))
     
     grouped = {}
     total_prereq_issues = 0
@@ -296,7 +446,7 @@ def group_courses_by_level(courses: List[Dict[str, Any]], completed_codes: set)
             }
         
         conditions = course.get("conditions_for_enrolment", "")
-        prereq_info = parse_prerequisites(conditions)
+        prereq_info = course.get("prereq_info") or parse_prerequisites(conditions)
         is_satisfied, missing_prereqs = check_prerequisite_satisfied(prereq_info, completed_codes)
         
         has_issue = not is_satisfied
@@ -317,7 +467,7 @@ def group_courses_by_level(courses: List[Dict[str, Any]], completed_codes: set)
         if has_issue:
             grouped[level]["has_prereq_issues"] = True
     
-    logger.info(f"Total courses with prerequisite issues: {total_prereq_issues}")
+    logger.debug("Total courses with prerequisite issues: %s", total_prereq_issues)
     
     # Return raw dict - caller will convert to Pydantic models
     return {level: data for level, data in sorted(grouped.items())}
@@ -327,16 +477,23 @@ def detect_critical_issues(
     needed_courses: List[Dict[str, Any]],
     completed_codes: set,
     base_program: Dict[str, Any],
-    target_program: Dict[str, Any]
+    target_program: Dict[str, Any],
+    prereq_status: Optional[Dict[str, tuple]] = None,
 ) -> List[Dict[str, Any]]:
-    """Detect critical blockers for transfer - returns dicts for caller to convert"""
+    """
+    Detect critical blockers for transfer - returns dicts for caller to convert.
+    prereq_status (code -> (is_satisfied, missing)) skips re-checking courses the caller already checked.
+    """
     issues = []
     
     # Check for prerequisite chains
     courses_with_prereqs = []
     for course in needed_courses:
-        prereq_info = parse_prerequisites(course.get("conditions_for_enrolment", ""))
-        is_satisfied, missing_prereqs = check_prerequisite_satisfied(prereq_info, completed_codes)
+        prereq_info = course.get("prereq_info") or parse_prerequisites(course.get("conditions_for_enrolment", ""))
+        if prereq_status is not None and course["code"] in prereq_status:
+            is_satisfied, missing_prereqs = prereq_status[course["code"]]
+        else:
+            is_satisfied, missing_prereqs = check_prerequisite_satisfied(prereq_info, completed_codes)
         
         if not is_satisfied:
             courses_with_prereqs.append({
@@ -395,10 +552,10 @@ def calculate_recommendation(
     Returns (can_transfer, recommendation)
     """
     
-    logger.info(f"Calculating difficulty (student-focused):")
-    logger.info(f"  Transfer rate: {transfer_percentage:.1f}%")
-    logger.info(f"  Courses completed: {completed_courses_count}")
-    logger.info(f"  Courses needed: {courses_needed_count}")
+    logger.debug("Calculating difficulty (student-focused):")
+    logger.debug("  Transfer rate: %.1f%%", transfer_percentage)
+    logger.debug("  Courses completed: %s", completed_courses_count)
+    logger.debug("  Courses needed: %s", courses_needed_count)
     
     score = 0
     
@@ -415,7 +572,7 @@ def calculate_recommendation(
         transfer_score = 30
     
     score += transfer_score
-    logger.info(f"  Transfer efficiency: {transfer_percentage:.1f}% → +{transfer_score} points")
+    logger.debug("  Transfer efficiency: %.1f%% → +%s points", transfer_percentage, transfer_score)
     
     # Remaining Workload (0-40 points)
     if courses_needed_count <= 6:
@@ -430,7 +587,7 @@ def calculate_recommendation(
         workload_score = 40
     
     score += workload_score
-    logger.info(f"  Remaining workload: {courses_needed_count} courses → +{workload_score} points")
+    logger.debug("  Remaining workload: %s courses → +%s points", courses_needed_count, workload_score)
     
     # Critical Blockers (0-30 points)
     blocker_score = 0
@@ -439,7 +596,7 @@ def calculate_recommendation(
     faculty_change_issues = [i for i in critical_issues if (i.type if hasattr(i, 'type') else i.get('type')) == "faculty_change"]
     if faculty_change_issues:
         blocker_score += 15
-        logger.info(f"  Faculty change detected → +15 points")
+        logger.debug("  Faculty change detected → +15 points")
     
     # Prerequisite issues
     is_early_student = completed_courses_count < 18
@@ -454,18 +611,18 @@ def calculate_recommendation(
     if level_1_2_prereq_issues > 0:
         prereq_penalty = min(10, level_1_2_prereq_issues * 0.5)
         blocker_score += prereq_penalty
-        logger.info(f"  Prereq issues (relevant): {level_1_2_prereq_issues} → +{prereq_penalty:.1f} points")
+        logger.debug("  Prereq issues (relevant): %s → +%.1f points", level_1_2_prereq_issues, prereq_penalty)
     
     # Heavy advanced course load
     if not is_early_student:
         advanced_issues = [i for i in critical_issues if (i.type if hasattr(i, 'type') else i.get('type')) == "advanced_requirements"]
         if advanced_issues:
             blocker_score += 5
-            logger.info(f"  Heavy advanced load → +5 points")
+            logger.debug("  Heavy advanced load → +5 points")
     
     score += blocker_score
-    logger.info(f"  Total blockers: +{blocker_score} points")
-    logger.info(f"  TOTAL SCORE: {score}/100")
+    logger.debug("  Total blockers: +%s points", blocker_score)
+    logger.debug("  TOTAL SCORE: %s/100", score)
     
     can_transfer = True
     if score <= 30:
@@ -477,7 +634,7 @@ def calculate_recommendation(
         if score > 85:
             can_transfer = False
     
-    logger.info(f"  → RECOMMENDATION: {recommendation}")
+    logger.debug("  → RECOMMENDATION: %s", recommendation)
     
     return can_transfer, recommendation
 
@@ -0,0 +1,394 @@
+# app/routers/compare_session.py
+# In-memory state behind one program comparison, so what-if edits on the switch page
+# (ticking a completed course, adding a planned one, swapping target specialisations)
+# update the result in place instead of re-running /compare from scratch.
+#
+# Per target course it keeps the parsed prerequisites and their current status, plus a
+# reverse index from each prerequisite (and its equivalents) to the target courses that
+# need it. Per completed course it keeps the target courses it covers. A delta re-matches
+# the courses it names, re-checks only their dependents and rebuilds only the level
+# groups those courses sit in; the summary and recommendation are then recomputed from
+# cached counts.
+
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.utils.catalog_artifact import get_catalog
+from app.utils.database import supabase
+from app.routers.compare_programs_helpers import (
+    get_level_name,
+    get_equivalent_codes,
+    extract_courses_from_sections,
+    enrich_courses_with_conditions,
+    parse_prerequisites,
+    check_prerequisite_satisfied,
+    detect_critical_issues,
+    calculate_recommendation,
+    estimate_completion_date,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _uoc(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except Exception:
+        return 0
+
+
+def _fetch_program(degree_code: str) -> Optional[Dict[str, Any]]:
+    resp = (
+        supabase.table("unsw_degrees_final")
+        .select("*")
+        .eq("degree_code", degree_code)
+        .single()
+        .execute()
+    )
+    return resp.data
+
+
+def _fetch_course_info(codes: List[str]) -> Dict[str, Dict[str, Any]]:
+    """code -> {title, uoc} from the catalog artifact, or one unsw_courses query."""
+    if not codes:
+        return {}
+    catalog = get_catalog()
+    if catalog is not None:
+        return {code: row for code in codes if (row := catalog.course(code))}
+    resp = supabase.table("unsw_courses").select("code,title,uoc").in_("code", codes).execute()
+    return {row["code"]: row for row in (resp.data or [])}
+
+
+class ComparisonState:
+    """Loaded comparison for one user and base/target pair. Not thread-safe: use from the event loop."""
+
+    def __init__(self, user_id: str, base_program: Dict[str, Any], target_program: Dict[str, Any]):
+        self.user_id = user_id
+        self.base_program = base_program
+        self.target_program = target_program
+        self.touched = time.monotonic()
+
+        # code -> {code, name, uoc, planned}; planned courses count as done for the what-if
+        self.completed: Dict[str, Dict[str, Any]] = {}
+
+        self.spec_codes: List[str] = []
+        self._program_courses: List[Dict[str, Any]] = extract_courses_from_sections(
+            target_program.get("sections"), default_category="Program Requirement"
+        )
+        self._spec_courses: Dict[str, List[Dict[str, Any]]] = {}
+        self.target_by_code: Dict[str, Dict[str, Any]] = {}
+        self._by_level: Dict[int, List[str]] = {}
+
+        # Per target course, kept across specialisation swaps
+        self._prereq: Dict[str, Dict[str, Any]] = {}
+        self._prereq_status: Dict[str, Tuple[bool, List[str]]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+
+        # Per completed course: match type and the target courses it covers
+        self._match: Dict[str, Optional[str]] = {}
+        self._covers: Dict[str, Set[str]] = {}
+        self._covered: Counter = Counter()
+
+        self._levels: Dict[int, Dict[str, Any]] = {}
+        self._dirty: Set[int] = set()
+
+    # -- loading -----------------------------------------------------------
+
+    @classmethod
+    def load(cls, user_id: str, base_program_code: str, target_program_code: str,
+             target_specialisation_codes: List[str]) -> "ComparisonState":
+        """Everything /compare reads, loaded once. Raises LookupError if a program doesn't exist."""
+        completed_response = (
+            supabase.table("user_completed_courses")
+            .select("*")
+            .eq("user_id", user_id)
+            .eq("is_completed", True)
+            .execute()
+        )
+        completed_rows = completed_response.data or []
+        logger.debug("Found %d completed courses", len(completed_rows))
+
+        base_program = _fetch_program(base_program_code)
+        target_program = _fetch_program(target_program_code)
+        if not base_program or not target_program:
+            raise LookupError("Program not found")
+        logger.debug("Base: %s, Target: %s", base_program["program_name"], target_program["program_name"])
+
+        state = cls(user_id, base_program, target_program)
+        for row in completed_rows:
+            code = row["course_code"]
+            state.completed[code] = {
+                "code": code, "name": row.get("course_name", ""), "uoc": row.get("uoc"), "planned": False,
+            }
+        state.set_specialisations(target_specialisation_codes)
+        return state
+
+    def _load_specialisations(self, codes: List[str]):
+        missing = [code for code in codes if code not in self._spec_courses]
+        if not missing:
+            return
+        spec_resp = (
+            supabase.table("unsw_specialisations")
+            .select("*")
+            .in_("major_code", missing)
+            .execute()
+        )
+        for spec in (spec_resp.data or []):
+            self._spec_courses[spec["major_code"]] = extract_courses_from_sections(
+                spec.get("sections"),
+                default_category=spec.get("specialisation_type") or "Specialisation",
+            )
+        for code in missing:
+            self._spec_courses.setdefault(code, [])
+
+    def _register(self, courses: List[Dict[str, Any]]):
+        """Parse prerequisites once per course and index them by the courses they mention."""
+        fresh = [c for c in courses if c["code"] not in self._prereq]
+        enrich_courses_with_conditions(fresh)
+        for course in fresh:
+            code = course["code"]
+            info = course.get("prereq_info") or parse_prerequisites(course.get("conditions_for_enrolment", ""))
+            course["prereq_info"] = info
+            self._prereq[code] = info
+            self._prereq_status[code] = check_prerequisite_satisfied(info, self.completed)
+            for req in info.get("courses", []) + [c for g in info.get("or_groups", []) for c in g]:
+                for key in [req, *get_equivalent_codes(req)]:
+                    self._dependents.setdefault(key, set()).add(code)
+
+    # -- deltas ------------------------------------------------------------
+
+    def set_specialisations(self, codes: List[str]):
+        """Swap the target specialisations. Only newly seen ones are fetched and parsed."""
+        self.spec_codes = list(dict.fromkeys(codes))
+        self._load_specialisations(self.spec_codes)
+
+        merged: Dict[str, Dict[str, Any]] = {}
+        for c in self._program_courses + [c for s in self.spec_codes for c in self._spec_courses[s]]:
+            merged.setdefault(c["code"], c)
+        self._register(list(merged.values()))
+        self.target_by_code = merged
+        logger.debug("Total unique target courses: %d", len(merged))
+
+        self._by_level = {}
+        for code, course in merged.items():
+            self._by_level.setdefault(course.get("level", 0), []).append(code)
+
+        # The target set changed, so every match may have too
+        self._covered = Counter()
+        for code in self.completed:
+            self._match[code], self._covers[code] = self._match_course(code)
+            self._covered.update(self._covers[code])
+        self._levels = {}
+        self._dirty = set(self._by_level)
+
+    def add_completed(self, codes: Iterable[str], planned: bool = False):
+        codes = [c for c in dict.fromkeys(codes) if c]
+        new = [c for c in codes if c not in self.completed]
+        for code in codes:
+            if code in self.completed and not planned:
+                # Ticking a planned course as done changes nothing but the flag
+                self.completed[code]["planned"] = False
+        if not new:
+            return
+
+        info = _fetch_course_info([c for c in new if c not in self.target_by_code])
+        for code in new:
+            row = self.target_by_code.get(code) or info.get(code) or {}
+            self.completed[code] = {
+                "code": code, "name": row.get("title") or "", "uoc": row.get("uoc"), "planned": planned,
+            }
+        self._changed(new)
+
+    def remove_completed(self, codes: Iterable[str], planned: bool = False):
+        gone = [c for c in dict.fromkeys(codes) if c in self.completed and self.completed[c]["planned"] == planned]
+        for code in gone:
+            del self.completed[code]
+        self._changed(gone)
+
+    def _changed(self, codes: List[str]):
+        affected: Set[str] = set()
+        for code in codes:
+            old = self._covers.pop(code, set())
+            self._covered.subtract(old)
+            if code in self.completed:
+                self._match[code], self._covers[code] = self._match_course(code)
+                self._covered.update(self._covers[code])
+            else:
+                self._match.pop(code, None)
+            affected |= old | self._covers.get(code, set())
+            if code in self.target_by_code:
+                affected.add(code)
+            # Courses that list this one (or an equivalent of it) as a prerequisite
+            for dependent in self._dependents.get(code, ()):
+                status = check_prerequisite_satisfied(self._prereq[dependent], self.completed)
+                if status != self._prereq_status[dependent]:
+                    self._prereq_status[dependent] = status
+                    affected.add(dependent)
+        self._dirty |= {self.target_by_code[c].get("level", 0) for c in affected if c in self.target_by_code}
+
+    def _match_course(self, code: str) -> Tuple[Optional[str], Set[str]]:
+        target = self.target_by_code
+        if code in target:
+            match_type, matched = "exact", code
+        else:
+            matched = next((eq for eq in get_equivalent_codes(code) if eq in target), None)
+            if matched is None:
+                return None, set()
+            match_type = "equivalent"
+        return match_type, {matched, *(eq for eq in get_equivalent_codes(matched) if eq in target)}
+
+    # -- result ------------------------------------------------------------
+
+    def _needed(self, code: str) -> bool:
+        return code not in self.completed and not self._covered[code]
+
+    def _build_level(self, level: int):
+        courses = []
+        total_uoc = 0
+        for code in self._by_level.get(level, []):
+            if not self._needed(code):
+                continue
+            course = self.target_by_code[code]
+            is_satisfied, missing_prereqs = self._prereq_status[code]
+            courses.append({
+                "code": code,
+                "name": course["title"],
+                "uoc": course["uoc"],
+                "category": course.get("category", ""),
+                "has_prereq_issue": not is_satisfied,
+                "missing_prerequisites": missing_prereqs,
+                "prereq_type": self._prereq[code].get("type", "none"),
+            })
+            total_uoc += course["uoc"]
+        if not courses:
+            self._levels.pop(level, None)
+            return
+        self._levels[level] = {
+            "level": level,
+            "level_name": get_level_name(level),
+            "courses": courses,
+            "total_courses": len(courses),
+            "total_uoc": total_uoc,
+            "has_prerequisite_issues": any(c["has_prereq_issue"] for c in courses),
+        }
+
+    def result(self) -> Dict[str, Any]:
+        """The /compare response body (as plain dicts) for the current state."""
+        self.touched = time.monotonic()
+        for level in self._dirty:
+            self._build_level(level)
+        self._dirty = set()
+
+        transferred_courses, wasted_courses = [], []
+        uoc_transferred = wasted_uoc = completed_uoc_total = 0
+        planned_count = 0
+        for code, completed in self.completed.items():
+            c_uoc = _uoc(completed["uoc"])
+            completed_uoc_total += c_uoc
+            entry = {"code": code, "name": completed["name"], "uoc": c_uoc}
+            if completed["planned"]:
+                entry["planned"] = True
+                planned_count += 1
+            match_type = self._match.get(code)
+            if match_type:
+                transferred_courses.append({**entry, "match_type": match_type})
+                uoc_transferred += c_uoc
+            else:
+                wasted_courses.append(entry)
+                wasted_uoc += c_uoc
+        logger.debug("Transfer: %d courses, %s UOC", len(transferred_courses), uoc_transferred)
+
+        needed_courses = [c for code, c in self.target_by_code.items() if self._needed(code)]
+        requirements_by_level = {str(level): self._levels[level] for level in sorted(self._levels)}
+
+        target_program = self.target_program
+        total_uoc_required = int(target_program.get("minimum_uoc") or 144)
+        uoc_needed = max(0, total_uoc_required - uoc_transferred)
+
+        total_completed = len(self.completed)
+        # Course-based transfer rate (correct denominator)
+        transfer_percentage = (len(transferred_courses) / max(total_completed, 1)) * 100
+
+        estimated_terms = max(1, (uoc_needed + 17) // 18)
+        completion_date = estimate_completion_date(estimated_terms)
+
+        critical_issues = detect_critical_issues(
+            needed_courses, self.completed, self.base_program, target_program,
+            prereq_status=self._prereq_status,
+        )
+
+        courses_with_prereq_issues = [
+            {"code": course["code"], "level": group["level"], "missing": course["missing_prerequisites"]}
+            for group in requirements_by_level.values()
+            for course in group["courses"]
+            if course["has_prereq_issue"]
+        ]
+
+        can_transfer, recommendation = calculate_recommendation(
+            uoc_needed,
+            total_uoc_required,
+            transfer_percentage,
+            critical_issues,
+            len(courses_with_prereq_issues),
+            total_completed,
+            len(needed_courses),
+            courses_with_prereq_issues
+        )
+
+        return {
+            "can_transfer": can_transfer,
+            "recommendation": recommendation,
+            "summary": {
+                "completed_courses_count": total_completed,
+                "completed_uoc": completed_uoc_total,
+                "planned_courses_count": planned_count,
+
+                "courses_transfer": len(transferred_courses),
+                "uoc_transfer": uoc_transferred,
+                "courses_wasted": len(wasted_courses),
+                "uoc_wasted": wasted_uoc,
+
+                "courses_needed": len(needed_courses),
+                "uoc_needed": uoc_needed,
+                "estimated_terms": estimated_terms,
+                "estimated_completion": completion_date,
+                "progress_percentage": round((uoc_transferred / max(total_uoc_required, 1)) * 100, 1),
+
+                "transfer_rate_courses": round(transfer_percentage, 1),
+                "transfer_rate_uoc": round((uoc_transferred / max(completed_uoc_total, 1)) * 100, 1) if completed_uoc_total else 0,
+            },
+            "transfer_analysis": {
+                "transferred_courses": transferred_courses,
+                "wasted_courses": wasted_courses,
+
+                # Alias so switch_advisor can read correctly
+                "non_transferable_courses": wasted_courses,
+
+                "total_completed_courses": total_completed,
+                "transferred_count": len(transferred_courses),
+                "wasted_count": len(wasted_courses),
+
+                "completed_uoc": completed_uoc_total,
+                "transferred_uoc": uoc_transferred,
+                "wasted_uoc": wasted_uoc,
+
+                "transfer_rate": round(transfer_percentage, 1),
+            },
+            "requirements_by_level": requirements_by_level,
+            "critical_issues": critical_issues,
+            "detailed_breakdown": {
+                "base_program": {
+                    "code": self.base_program["degree_code"],
+                    "name": self.base_program["program_name"],
+                    "faculty": self.base_program.get("faculty")
+                },
+                "target_program": {
+                    "code": target_program["degree_code"],
+                    "name": target_program["program_name"],
+                    "faculty": target_program.get("faculty"),
+                    "total_uoc": total_uoc_required
+                },
+            },
+        }
@@ -1,9 +1,40 @@
+import logging
 from app.utils.database import supabase
 from app.utils.openai_client import ask_openai
+from app.utils.tracing import traced
+import asyncio
 import json
+import math
+import threading
+import time
 import uuid
 import re
 from datetime import datetime
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Degrees offered to the LLM, picked by text match against the career recommendations
+SHORTLIST_SIZE = 25
+# The degree text index is rebuilt from unsw_degrees_final at most this often
+DEGREE_INDEX_TTL_SECONDS = 600
+
+# Field weights: a career term in the degree name counts more than one in the blurb
+NAME_WEIGHT = 3.0
+OUTCOMES_WEIGHT = 2.0
+OVERVIEW_WEIGHT = 1.0
+# Career titles say more about fit than the free-text reasons
+TITLE_TERM_WEIGHT = 2.0
+REASON_TERM_WEIGHT = 1.0
+
+STOP_WORDS = {
+    "and", "the", "for", "with", "that", "this", "from", "into", "your", "you", "are",
+    "will", "can", "has", "have", "who", "their", "they", "such", "other", "through",
+    "bachelor", "master", "honours", "advanced", "program", "degree", "students",
+    "student", "strong", "interest", "interests", "skills", "work", "career", "careers",
+    "role", "roles", "related", "graduates", "also", "well", "which", "both",
+}
+TOKEN_RE = re.compile(r"[a-z]{3,}")
 
 
 def clean_openai_response(raw):
@@ -24,6 +55,111 @@ async def get_career_recommendations(user_id: str):
         raise Exception("Failed to fetch career recommendations")
     return response.data
 
+# Lowercase words with stop words dropped; a plural "s" is folded so "engineers" matches "engineer"
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for word in TOKEN_RE.findall((text or "").lower()):
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+_degree_index: Dict[str, Any] = {}
+_degree_index_built = 0.0
+_degree_index_lock = threading.Lock()
+
+
+# Per-degree weighted term sets plus IDF over the catalog, cached for DEGREE_INDEX_TTL_SECONDS
+def get_degree_index() -> Dict[str, Any]:
+    global _degree_index, _degree_index_built
+    with _degree_index_lock:
+        if _degree_index and time.monotonic() - _degree_index_built < DEGREE_INDEX_TTL_SECONDS:
+            return _degree_index
+
+        response = (
+            supabase
+            .from_("unsw_degrees_final")
+            .select("id, degree_code, program_name, career_outcomes, overview_description")
+            .execute()
+        )
+        if not response or not response.data:
+            raise Exception("Failed to fetch UNSW degrees")
+
+        docs = []
+        doc_freq: Dict[str, int] = {}
+        for row in response.data:
+            weights: Dict[str, float] = {}
+            for text, weight in (
+                (row.get("program_name"), NAME_WEIGHT),
+                (row.get("career_outcomes"), OUTCOMES_WEIGHT),
+                (row.get("overview_description"), OVERVIEW_WEIGHT),
+            ):
+                for term in set(tokenize(text)):
+                    weights[term] = max(weights.get(term, 0.0), weight)
+            for term in weights:
+                doc_freq[term] = doc_freq.get(term, 0) + 1
+            docs.append({
+                "id": row["id"],
+                "degree_code": row["degree_code"],
+                "program_name": row["program_name"],
+                "terms": weights,
+            })
+
+        n = len(docs)
+        _degree_index = {
+            "docs": docs,
+            "idf": {term: math.log(1 + n / df) for term, df in doc_freq.items()},
+        }
+        _degree_index_built = time.monotonic()
+        logger.debug("Built degree index: %s degrees, %s terms", n, len(doc_freq))
+        return _degree_index
+
+
+# Rank degrees by weighted, IDF-scaled overlap between career terms and degree text.
+@traced(kind="cpu")
+def shortlist_degrees(recommendations: List[Dict[str, Any]], index: Dict[str, Any],
+                      k: int = SHORTLIST_SIZE) -> List[Dict[str, Any]]:
+    query: Dict[str, float] = {}
+    for rec in recommendations:
+        for term in tokenize(rec.get("career_title")):
+            query[term] = max(query.get(term, 0.0), TITLE_TERM_WEIGHT)
+        for term in tokenize(rec.get("reason")):
+            query.setdefault(term, REASON_TERM_WEIGHT)
+
+    idf = index["idf"]
+    scored = []
+    for position, doc in enumerate(index["docs"]):
+        terms = doc["terms"]
+        score = sum(q * terms[t] * idf[t] for t, q in query.items() if t in terms)
+        scored.append((-score, position, doc))
+
+    scored.sort(key=lambda x: (x[0], x[1]))
+    return [doc for _, _, doc in scored[:k]]
+
+
+# One query for any suggested names that weren't in the shortlist (the LLM strayed)
+def resolve_degree_names(names: List[str], known: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    resolved = {name: known[name] for name in names if name in known}
+    missing = sorted({name for name in names if name and name not in known})
+    if missing:
+        try:
+            response = (
+                supabase
+                .from_("unsw_degrees_final")
+                .select("id, degree_code, program_name")
+                .in_("program_name", missing)
+                .execute()
+            )
+            for row in response.data or []:
+                resolved.setdefault(row["program_name"], row)
+        except Exception as e:
+            logger.warning("[ERROR] Degree name lookup failed for %s: %s", missing, e)
+    return resolved
+
+
 async def generate_final_plan(user_id: str):
 
     # Check if recommendations already exist for this user
@@ -42,18 +178,10 @@ async def generate_final_plan(user_id: str):
     recommendations = await get_career_recommendations(user_id)
     user_recs_text = "\n".join([f"- {r['career_title']} — {r['reason']}" for r in recommendations])
 
-    # Get UNSW degrees
-    degrees_response = (
-        supabase
-        .from_("unsw_degrees_final")
-        .select("program_name")
-        .execute()
-    )
-    if not degrees_response or not degrees_response.data:
-        raise Exception("Failed to fetch UNSW degrees")
-
-    degree_names = [d["program_name"] for d in degrees_response.data]
-    unsw_degree_list = "\n".join([f"- {name}" for name in degree_names])
+    # Shortlist UNSW degrees that match the careers, so the prompt stays the same size as the catalog grows
+    index = await asyncio.to_thread(get_degree_index)
+    shortlist = shortlist_degrees(recommendations, index)
+    unsw_degree_list = "\n".join([f"- {d['program_name']}" for d in shortlist])
 
     # Send to OpenAI to generate final recs using unsw degrees based on the previous career/degree recommendations
     prompt = f"""
@@ -62,7 +190,7 @@ async def generate_final_plan(user_id: str):
     The student received these career recommendations:
     {user_recs_text}
 
-    Below is the official list of ALL UNSW degrees:
+    Below is a shortlist of official UNSW degrees relevant to these careers:
     {unsw_degree_list}
 
     IMPORTANT RULES:
@@ -90,7 +218,7 @@ async def generate_final_plan(user_id: str):
     """
 
     # Call OpenAi and clean response
-    result_raw = ask_openai(prompt)         
+    result_raw = await asyncio.to_thread(ask_openai, prompt)
     result = clean_openai_response(result_raw)
 
     try:
@@ -106,31 +234,24 @@ async def generate_final_plan(user_id: str):
     # Insert into Supabase final_recommendations table (University students only)
     rows = []
 
+    # Resolve every suggested name at once: shortlist rows first, one query for the rest
+    matches = await asyncio.to_thread(
+        resolve_degree_names,
+        [d.get("degreeName") for d in degrees],
+        {d["program_name"]: d for d in shortlist},
+    )
+
     for degree in degrees:
         degree_name = degree.get("degreeName")
         reason = degree.get("reason")
 
-        try:
-            match = (
-                supabase
-                .from_("unsw_degrees_final")
-                .select("id, degree_code, program_name")
-                .eq("program_name", degree_name)
-                .limit(1)
-                .execute()
-            )
-
-            if match and match.data and len(match.data) > 0:
-                degree_id = match.data[0]["id"]  # Get the actual degree ID
-                degree_code = match.data[0]["degree_code"]
-                print(f"Exact match: {degree_name} → {degree_code} (id: {degree_id})")
-            else:
-                print(f"No exact UNSW match found for: '{degree_name}'")
-                continue  
-
-        except Exception as e:
-            print(f"[ERROR] Query failed for '{degree_name}': {e}")
-            continue  
+        match = matches.get(degree_name)
+        if match is None:
+            logger.debug("No exact UNSW match found for: '%s'", degree_name)
+            continue
+        degree_id = match["id"]  # Get the actual degree ID
+        degree_code = match["degree_code"]
+        logger.debug("Exact match: %s → %s (id: %s)", degree_name, degree_code, degree_id)
 
         # Only insert valid UNSW degrees 
         rows.append({
@@ -1,7 +1,9 @@
 # app/routers/flexibility_filtering.py.py
 # Find top degree switch candidates by filtering on faculty, keywords, and course overlap (specialization-aware).
 
+import logging
 from typing import Any, Dict, List
+from app.utils.tracing import traced
 from .flexibility_filtering_helpers import (
     extract_keywords_improved,
     extract_specialization_keywords,
@@ -14,49 +16,53 @@ from .flexibility_filtering_helpers import (
     calculate_overlaps_with_specializations,
 )
 
+logger = logging.getLogger(__name__)
+
 
 # Main entry point: pre-filter degrees to find top candidates for switching.
-async def pre_filter_similar_degrees(
+# Plain sync function (DB + CPU only) so pipelines run it as a db stage off the event loop.
+@traced(kind="cpu")
+def pre_filter_similar_degrees(
     degree_id: str,
     final_limit: int = 15,
     current_spec_course_codes: List[str] = None,
     current_spec_names: List[str] = None
 ) -> List[Dict[str, Any]]:
     
-    print(f"Pre-filtering similar degrees for: {degree_id}")
+    logger.debug("Pre-filtering similar degrees for: %s", degree_id)
     if current_spec_course_codes: 
-        print(f"Specialization-aware mode: {len(current_spec_course_codes)} spec courses provided")
+        logger.debug("Specialization-aware mode: %s spec courses provided", len(current_spec_course_codes))
     if current_spec_names:
-        print(f"Current specializations: {current_spec_names}")
+        logger.debug("Current specializations: %s", current_spec_names)
     
     # Get current degree information
-    current_degree = await fetch_current_degree(degree_id)
+    current_degree = fetch_current_degree(degree_id)
     current_code = current_degree['degree_code']
     current_faculty = current_degree.get('faculty', '')
     current_program_name = current_degree['program_name']
     
     # Get course structure for current degree
-    current_courses = await fetch_degree_courses(current_code)
+    current_courses = fetch_degree_courses(current_code)
     
     # Combine with specialization courses if provided
     if current_spec_course_codes:
         all_current_courses = list(set(current_courses + current_spec_course_codes))
-        print(f"Combined {len(current_courses)} degree courses + {len(current_spec_course_codes)} specialization courses = {len(all_current_courses)} total")
+        logger.debug("Combined %s degree courses + %s specialization courses = %s total", len(current_courses), len(current_spec_course_codes), len(all_current_courses))
         current_courses = all_current_courses
     elif not current_courses:
-        print(f"No courses found in current degree and no specialization courses provided")
+        logger.debug("No courses found in current degree and no specialization courses provided")
         return []
 
-    print(f"Current degree has {len(current_courses)} courses for matching")
+    logger.debug("Current degree has %s courses for matching", len(current_courses))
     
     # Calculate adaptive limits based on database size
-    total_count, initial_candidates, final_limit = await calculate_adaptive_limits(degree_id, final_limit)
-    print(f"Database size: {total_count} degrees | Analyzing: {initial_candidates} | Returning: {final_limit}")
+    total_count, initial_candidates, final_limit = calculate_adaptive_limits(degree_id, final_limit)
+    logger.debug("Database size: %s degrees | Analyzing: %s | Returning: %s", total_count, initial_candidates, final_limit)
     
     # Fetch all other degrees
-    all_degrees = await fetch_all_degrees(degree_id)
+    all_degrees = fetch_all_degrees(degree_id)
     if not all_degrees:
-        print(f"No other degrees found in database")
+        logger.debug("No other degrees found in database")
         return []
     
     # Extract keywords from program and specializations
@@ -67,11 +73,11 @@ async def pre_filter_similar_degrees(
             if spec_name:
                 spec_keywords.update(extract_specialization_keywords(spec_name))
     
-    print(f"Program keywords: {program_keywords}")
-    print(f"Specialization keywords: {spec_keywords}")
+    logger.debug("Program keywords: %s", program_keywords)
+    logger.debug("Specialization keywords: %s", spec_keywords)
     
     # Score and filter candidates
-    top_candidates = await score_and_filter_candidates(
+    top_candidates = score_and_filter_candidates(
         all_degrees, 
         current_faculty,
         current_program_name,
@@ -80,21 +86,21 @@ async def pre_filter_similar_degrees(
         initial_candidates
     )
     
-    print(f"Filtered {len(all_degrees)} degrees to {len(top_candidates)} candidates")
+    logger.debug("Filtered %s degrees to %s candidates", len(all_degrees), len(top_candidates))
     
     if not top_candidates:
-        print(f"WARNING: No suitable candidates found")
+        logger.warning("WARNING: No suitable candidates found")
         return []
     
     # Fetch course structures for top candidates
-    structures = await fetch_candidate_structures(top_candidates)
+    structures = fetch_candidate_structures(top_candidates)
     
     if not structures:
-        print(f"WARNING: No course structures found for candidates")
+        logger.warning("WARNING: No course structures found for candidates")
         return []
     
     # Calculate course overlap for each candidate
-    final_candidates = await calculate_overlaps_with_specializations(
+    final_candidates = calculate_overlaps_with_specializations(
         structures,
         top_candidates,
         current_courses,
@@ -107,6 +113,6 @@ async def pre_filter_similar_degrees(
     top_final = final_candidates[:final_limit]
     
     if top_final:
-        print(f"Returning top {len(top_final)} degrees with overlap ranging from {top_final[0]['overlap_percentage']:.1f}% to {top_final[-1]['overlap_percentage']:.1f}%")
+        logger.debug("Returning top %s degrees with overlap ranging from %.1f%% to %.1f%%", len(top_final), top_final[0]['overlap_percentage'], top_final[-1]['overlap_percentage'])
     
     return top_final
\ No newline at end of file
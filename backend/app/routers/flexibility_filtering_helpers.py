@@ -1,11 +1,16 @@
 # app/routers/flexibility_filtering_helpers.py
 # Helper functions for degree pre-filtering and overlap calculation.
 
+import logging
 from typing import Any, Dict, List, Set
 import json
+from app.utils.catalog_artifact import get_catalog
 from app.utils.database import supabase
+from app.utils.tracing import traced
 from .roadmap_unsw_helpers import extract_all_course_codes, calculate_overlap_weighted
 
+logger = logging.getLogger(__name__)
+
 
 # Extract keywords from program name, filtering out common/stop words.
 def extract_keywords_improved(program_name: str) -> Set[str]:
@@ -56,7 +61,7 @@ def are_related_faculties(faculty1: str, faculty2: str) -> bool:
 
 
 # Fetch current degree information from database.
-async def fetch_current_degree(degree_id: str) -> Dict[str, Any]:
+def fetch_current_degree(degree_id: str) -> Dict[str, Any]:
     response = supabase.from_("unsw_degrees_final")\
         .select("*")\
         .eq("id", degree_id)\
@@ -70,7 +75,13 @@ async def fetch_current_degree(degree_id: str) -> Dict[str, Any]:
 
 
 # Fetch course codes for a given degree.
-async def fetch_degree_courses(degree_code: str) -> List[str]:
+def fetch_degree_courses(degree_code: str) -> List[str]:
+    catalog = get_catalog()
+    if catalog is not None:
+        codes = catalog.degree_course_codes(degree_code)
+        if codes is not None:
+            return codes
+
     response = (
         supabase.from_("unsw_degrees_final")
         .select("sections")
@@ -88,7 +99,7 @@ async def fetch_degree_courses(degree_code: str) -> List[str]:
 
 
 # Calculate adaptive limits based on database size.
-async def calculate_adaptive_limits(degree_id: str, final_limit: int) -> tuple:
+def calculate_adaptive_limits(degree_id: str, final_limit: int) -> tuple:
     response = supabase.from_("unsw_degrees_final")\
         .select("id", count="exact")\
         .execute()
@@ -109,7 +120,7 @@ async def calculate_adaptive_limits(degree_id: str, final_limit: int) -> tuple:
 
 
 # Fetch all degrees except current one.
-async def fetch_all_degrees(degree_id: str) -> List[Dict[str, Any]]:
+def fetch_all_degrees(degree_id: str) -> List[Dict[str, Any]]:
     response = supabase.from_("unsw_degrees_final")\
         .select("id, degree_code, program_name, faculty")\
         .neq("id", degree_id)\
@@ -119,7 +130,8 @@ async def fetch_all_degrees(degree_id: str) -> List[Dict[str, Any]]:
 
 
 # Score and filter candidate degrees based on faculty, keywords, and specialization matching.
-async def score_and_filter_candidates(
+@traced(kind="cpu")
+def score_and_filter_candidates(
     all_degrees: List[Dict[str, Any]],
     current_faculty: str,
     current_program_name: str,
@@ -196,7 +208,7 @@ async def score_and_filter_candidates(
 
 
 # Fetch course structures for candidate degrees.
-async def fetch_candidate_structures(candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def fetch_candidate_structures(candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     candidate_codes = [c['degree_code'] for c in candidates]
     response = (
         supabase.from_("unsw_degrees_final")
@@ -208,7 +220,8 @@ async def fetch_candidate_structures(candidates: List[Dict[str, Any]]) -> List[D
 
 
 # Calculate course overlap for each candidate, including specialization matching.
-async def calculate_overlaps_with_specializations(
+@traced(kind="cpu")
+def calculate_overlaps_with_specializations(
     structures: List[Dict[str, Any]],
     top_candidates: List[Dict[str, Any]],
     current_courses: List[str],
@@ -260,7 +273,7 @@ async def calculate_overlaps_with_specializations(
             }
             
             if current_spec_course_codes and len(current_spec_course_codes) > 0:
-                best_match = await check_specialization_improvements(
+                best_match = check_specialization_improvements(
                     best_match, structure['degree_code'], degree_courses,
                     current_courses, current_set, current_spec_course_codes,
                     current_spec_keywords, base_overlap_pct, degree_info
@@ -270,14 +283,14 @@ async def calculate_overlaps_with_specializations(
                 final_candidates.append(best_match)
         
         except Exception as e:
-            print(f"Error processing degree {structure.get('degree_code')}: {e}")
+            logger.warning("Error processing degree %s: %s", structure.get('degree_code'), e)
             continue
     
     return final_candidates
 
 
 # Check if any specializations improve the overlap for a candidate degree.
-async def check_specialization_improvements(
+def check_specialization_improvements(
     best_match: Dict[str, Any],
     degree_code: str,
     degree_courses: List[str],
@@ -345,6 +358,6 @@ async def check_specialization_improvements(
             best_match['total_target_courses'] = len(target_total_courses)
     
     except Exception as e:
-        print(f"Error checking specializations for {degree_code}: {e}")
+        logger.warning("Error checking specializations for %s: %s", degree_code, e)
     
     return best_match
\ No newline at end of file
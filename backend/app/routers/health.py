@@ -1,8 +1,19 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.utils.warmup import readiness
 
 router = APIRouter()
 
 
+# Liveness: the process is up and serving
 @router.get("")
 def health():
     return {"ok": True}
+
+
+# Readiness: 503 until startup warm-up has opened connections and loaded the catalog
+@router.get("/ready")
+async def ready():
+    report = readiness()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
@@ -1,13 +1,20 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional, Dict, List
-from app.utils.serpapi_client import get_company_careers_url, get_multiple_company_urls
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field, StringConstraints
+from typing import Annotated, Optional, Dict, List
+from app.utils.serpapi_client import careers_url_cache, get_company_careers_url_async, get_multiple_company_urls
+from dependencies import get_current_user
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
+# Every uncached company can cost several paid SerpAPI searches, so bound the input
+MAX_COMPANIES = 50
+CompanyName = Annotated[str, StringConstraints(min_length=1, max_length=100)]
+
 
 class CompanyURLRequest(BaseModel):
-    company_name: str
+    company_name: CompanyName
 
 
 class CompanyURLResponse(BaseModel):
@@ -16,7 +23,7 @@ class CompanyURLResponse(BaseModel):
 
 
 class MultipleCompanyURLRequest(BaseModel):
-    company_names: List[str]
+    company_names: List[CompanyName] = Field(..., max_length=MAX_COMPANIES)
 
 
 class MultipleCompanyURLResponse(BaseModel):
@@ -24,7 +31,7 @@ class MultipleCompanyURLResponse(BaseModel):
 
 
 @router.post("/company-careers-url", response_model=CompanyURLResponse)
-async def get_company_url(request: CompanyURLRequest):
+async def get_company_url(request: CompanyURLRequest, user=Depends(get_current_user)):
     """
     Get the careers page URL for a specific company.
     
@@ -35,7 +42,7 @@ async def get_company_url(request: CompanyURLRequest):
         Company name and careers URL
     """
     try:
-        careers_url = get_company_careers_url(request.company_name)
+        careers_url = await get_company_careers_url_async(request.company_name)
         return CompanyURLResponse(
             company_name=request.company_name,
             careers_url=careers_url
@@ -45,7 +52,7 @@ async def get_company_url(request: CompanyURLRequest):
 
 
 @router.post("/multiple-company-urls", response_model=MultipleCompanyURLResponse)
-async def get_multiple_urls(request: MultipleCompanyURLRequest):
+async def get_multiple_urls(request: MultipleCompanyURLRequest, user=Depends(get_current_user)):
     """
     Get careers page URLs for multiple companies in one request.
     
@@ -56,7 +63,16 @@ async def get_multiple_urls(request: MultipleCompanyURLRequest):
         Dictionary mapping company names to careers URLs
     """
     try:
-        urls = get_multiple_company_urls(request.company_names)
+        urls = await get_multiple_company_urls(request.company_names)
         return MultipleCompanyURLResponse(urls=urls)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch company URLs: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to fetch company URLs: {str(e)}")
+
+
+@router.get("/careers-url-cache/stats")
+async def get_careers_url_cache_stats(user=Depends(get_current_user)):
+    """
+    Hit/miss counters for the careers URL cache (since process start) and
+    the number of live entries on disk.
+    """
+    return await asyncio.to_thread(careers_url_cache.stats)
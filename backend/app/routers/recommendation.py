@@ -1,29 +1,127 @@
 import datetime
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+import logging
+import time
+from collections import OrderedDict
+from fastapi import APIRouter, Depends, HTTPException
 from dependencies import get_current_user
 from app.utils.database import supabase
 from .user import get_user_info, get_student_type
-from app.utils.openai_client import ask_openai
+from app.utils.openai_client import ask_openai, ask_openai_async
+from app.utils.orchestrator import limiter
+from app.utils.sse import KEEP_ALIVE, sse, sse_response
+from app.utils.tracing import traced_task
 from app.models.schemas import ExplainRequest
+from .recommendation_drafts import draft_recommendations, load_trait_scores
 
+import asyncio
 import json
 import uuid
 import re
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
 
+router = APIRouter()
 
-@router.get("/prompt")
-async def get_recommendation_prompts(
-    background_tasks: BackgroundTasks,
-    user=Depends(get_current_user),
-):
+# (recommendation table, report table, details table) per student type
+EXPLAIN_TABLES = {
+    "high_school": ("degree_recommendations", "school_report_analysis", "degree_rec_details"),
+    "university": ("career_recommendations", "transcript_analysis", "career_rec_details"),
+}
+NO_REPORT = "Student did not provide a report. Ignore this part for now"
+STREAM_KEEPALIVE_SECONDS = 15
+
+# Explanation state per recommendation id: queued | generating | ready | failed.
+# In-process only; after a restart the details table is the source of truth.
+EXPLAIN_STATUS_MAX = 5000
+_explain_status: "OrderedDict[str, dict]" = OrderedDict()
+# Keep references to fire-and-forget tasks so they aren't garbage collected
+_background_tasks = set()
+# In-flight generations, so a click on a recommendation awaits the pre-generation instead of repeating it
+_explain_tasks = {}
+# In-flight recommendation generations per user, shared by /prompt (fired by the survey)
+# and /stream (the dashboard), so opening the dashboard mid-generation doesn't start another
+_generation_tasks = {}
+
+
+def _set_explain_status(rec_id: str, state: str, error: str = None, user_id: str = None):
+    # The owner is kept so status and in-flight results are only served to them
+    owner = user_id or _explain_status.get(rec_id, {}).get("user_id")
+    _explain_status[rec_id] = {"state": state, "error": error, "updated_at": time.time(), "user_id": owner}
+    _explain_status.move_to_end(rec_id)
+    while len(_explain_status) > EXPLAIN_STATUS_MAX:
+        _explain_status.popitem(last=False)
+
+
+async def load_survey(user):
     student_type = await get_student_type(user)
     user_info = await get_user_info(user, student_type)
 
     if not student_type or not user_info:
         raise HTTPException(status_code=401, detail="Invalid User")
+    return student_type, user_info
+
+
+def start_generation(user, student_type: str, user_info: dict) -> asyncio.Task:
+    task = _generation_tasks.get(user.id)
+    if task is None:
+        task = asyncio.create_task(generate_recommendations(user, student_type, user_info))
+        _generation_tasks[user.id] = task
+        task.add_done_callback(lambda t, user_id=user.id: _generation_tasks.pop(user_id, None))
+    return task
+
+
+@router.get("/prompt")
+async def get_recommendation_prompts(user=Depends(get_current_user)):
+    student_type, user_info = await load_survey(user)
+    # Shielded: the generation is shared, so one caller going away mustn't cancel it
+    return await asyncio.shield(start_generation(user, student_type, user_info))
+
+
+# Instant rule-based suggestions (nothing is stored); the LLM recommendations replace them
+@router.get("/draft")
+async def get_draft_recommendations(user=Depends(get_current_user)):
+    student_type, user_info = await load_survey(user)
+    trait_scores = await asyncio.to_thread(load_trait_scores, user.id)
+    drafts = await asyncio.to_thread(draft_recommendations, student_type, user_info, trait_scores)
+    return {"status": "draft", "recommendations": drafts}
+
+
+# Progressive version of /prompt (SSE): a "draft" event straight away, then a "final" event
+# with the stored LLM recommendations. Joins a generation already running for the user, and
+# generation carries on if the client disconnects.
+@router.get("/stream")
+async def stream_recommendations(user=Depends(get_current_user)):
+    student_type, user_info = await load_survey(user)
+    final_task = start_generation(user, student_type, user_info)
+
+    async def event_generator():
+        try:
+            trait_scores = await asyncio.to_thread(load_trait_scores, user.id)
+            drafts = await asyncio.to_thread(draft_recommendations, student_type, user_info, trait_scores)
+        except Exception as e:
+            logger.warning("Draft recommendations failed for %s: %s", user.id, e)
+            drafts = []
+        yield sse({"type": "draft", "recommendations": drafts})
+
+        while not final_task.done():
+            done, _ = await asyncio.wait({final_task}, timeout=STREAM_KEEPALIVE_SECONDS)
+            if not done:
+                yield KEEP_ALIVE
+        try:
+            result = final_task.result()
+        except HTTPException as e:
+            yield sse({"type": "error", "detail": e.detail})
+            return
+        except Exception as e:
+            yield sse({"type": "error", "detail": str(e)})
+            return
+        yield sse({"type": "final", **result})
+
+    return sse_response(event_generator())
 
+
+# LLM recommendations for the survey; rows are stored and their explanations pre-generated
+async def generate_recommendations(user, student_type: str, user_info: dict) -> dict:
     if student_type == "university":
         prompt = (
             "You are a university career advisor for UNSW students helping a student explore future job and career options. Based on their profile:\n\n"
@@ -98,7 +196,7 @@ async def get_recommendation_prompts(
         )
     else:
         raise HTTPException(status_code=400, detail="Unknown student type")
-    recommendation = ask_openai(prompt)
+    recommendation = await asyncio.to_thread(ask_openai, prompt)
 
     if student_type == "high_school":
         cleaned = recommendation.strip()
@@ -134,8 +232,7 @@ async def get_recommendation_prompts(
 
         response = supabase.table("degree_recommendations").insert(rows).execute()
 
-        for row in rows:
-            background_tasks.add_task(explain_rec, row["id"], user)
+        schedule_explanations(user, rows)
 
         if not response:
             raise HTTPException(
@@ -178,8 +275,7 @@ async def get_recommendation_prompts(
 
         response = supabase.table("career_recommendations").insert(rows).execute()
 
-        for row in rows:
-            background_tasks.add_task(explain_rec, row["id"], user)
+        schedule_explanations(user, rows)
 
         if not response:
             raise HTTPException(
@@ -194,40 +290,52 @@ async def get_recommendation_prompts(
     return recommendation
 
 
-@router.post("/{rec_id}/explain")
-async def explain_rec(rec_id: str, user=Depends(get_current_user)):
+def explain_tables(student_type: str) -> tuple:
+    if not student_type:
+        raise HTTPException(status_code=401, detail="Invalid User")
+    if student_type not in EXPLAIN_TABLES:
+        raise HTTPException(status_code=400, detail="Unknown student type")
+    return EXPLAIN_TABLES[student_type]
+
+
+# Shared inputs for every explanation in a batch (student type, profile, report), loaded once
+async def load_explain_context(user) -> dict:
     student_type = await get_student_type(user)
     user_info = await get_user_info(user, student_type)
 
-    if not student_type or not user_info:
+    if not user_info:
         raise HTTPException(status_code=401, detail="Invalid User")
+    _, report_table, _ = explain_tables(student_type)
+    report_resp = await asyncio.to_thread(
+        lambda: supabase.table(report_table).select("analysis").eq("user_id", user.id).limit(1).execute()
+    )
+    report = report_resp.data[0].get("analysis") if report_resp and report_resp.data else None
 
-    if student_type == "high_school":
-        table = "degree_recommendations"
-        report_table = "school_report_analysis"
-        response_table = "degree_rec_details"
-    else:
-        table = "career_recommendations"
-        report_table = "transcript_analysis"
-        response_table = "career_rec_details"
+    return {
+        "user_id": user.id,
+        "student_type": student_type,
+        "user_info": user_info,
+        "report": report or NO_REPORT,
+    }
 
-    recommendation = (
-        supabase.table(table).select("*").eq("id", rec_id).single().execute()
-    )
 
-    if not recommendation:
+async def fetch_recommendation(rec_id: str, student_type: str, user_id: str) -> dict:
+    table, _, _ = EXPLAIN_TABLES[student_type]
+    resp = await asyncio.to_thread(
+        lambda: supabase.table(table).select("*").eq("id", rec_id).eq("user_id", user_id).limit(1).execute()
+    )
+    if not resp or not resp.data:
         raise HTTPException(status_code=404, detail="Recommendation not Found")
+    return resp.data[0]
 
-    report = (
-        supabase.table(report_table)
-        .select("analysis")
-        .eq("user_id", user.id)
-        .single()
-        .execute
-    )
 
-    if not report:
-        report = "Student did not provide a report. Ignore this part for now"
+# Generate and store the details for one recommendation. The LLM call waits on the shared "llm" limit.
+async def generate_explanation(recommendation: dict, ctx: dict) -> dict:
+    rec_id = recommendation["id"]
+    student_type = ctx["student_type"]
+    user_info = ctx["user_info"]
+    report = ctx["report"]
+    _, _, response_table = EXPLAIN_TABLES[student_type]
 
     if student_type == "high_school":
         prompt = f"""
@@ -378,7 +486,8 @@ async def explain_rec(rec_id: str, user=Depends(get_current_user)):
     else:
         raise HTTPException(status_code=400, detail="Unknown student type")
 
-    raw_response = ask_openai(prompt)
+    async with limiter("llm"):
+        raw_response = await ask_openai_async(prompt)
 
     cleaned_response = raw_response.strip()
     if cleaned_response.startswith("```"):
@@ -421,7 +530,7 @@ async def explain_rec(rec_id: str, user=Depends(get_current_user)):
             "summary": parsed["summary"],
         }
 
-    response = supabase.table(response_table).upsert(details).execute()
+    response = await asyncio.to_thread(lambda: supabase.table(response_table).upsert(details).execute())
 
     if not response:
         raise HTTPException(
@@ -430,3 +539,83 @@ async def explain_rec(rec_id: str, user=Depends(get_current_user)):
         )
 
     return details
+
+
+async def _explain_tracked(recommendation: dict, ctx: dict) -> dict:
+    rec_id = recommendation["id"]
+    _set_explain_status(rec_id, "generating", user_id=ctx["user_id"])
+    try:
+        details = await generate_explanation(recommendation, ctx)
+    except Exception as e:
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        _set_explain_status(rec_id, "failed", error)
+        raise
+    _set_explain_status(rec_id, "ready")
+    return details
+
+
+# Pre-generate explanations for a fresh batch of recommendations. The shared context is loaded
+# once and every explanation runs concurrently (bounded by the "llm" limit) instead of one
+# after another. Tasks are registered up front so /explain can await them while the context loads.
+def schedule_explanations(user, rows: list):
+    ctx_task = asyncio.create_task(load_explain_context(user))
+
+    async def run_one(row):
+        try:
+            ctx = await asyncio.shield(ctx_task)
+        except Exception as e:
+            _set_explain_status(row["id"], "failed", str(e))
+            raise
+        return await _explain_tracked(row, ctx)
+
+    tasks = []
+    for row in rows:
+        _set_explain_status(row["id"], "queued", user_id=user.id)
+        task = asyncio.create_task(traced_task("recommendation.explain", run_one(row), rec_id=row["id"]))
+        _explain_tasks[row["id"]] = task
+        task.add_done_callback(lambda t, rec_id=row["id"]: _explain_tasks.pop(rec_id, None))
+        tasks.append(task)
+
+    async def summarise():
+        results = await asyncio.gather(ctx_task, *tasks, return_exceptions=True)
+        failed = sum(1 for r in results[1:] if isinstance(r, BaseException))
+        logger.info("Pre-generated %s/%s explanations for user %s", len(tasks) - failed, len(tasks), user.id)
+
+    summary = asyncio.create_task(summarise())
+    _background_tasks.add(summary)
+    summary.add_done_callback(_background_tasks.discard)
+
+
+def _explain_owner(rec_id: str):
+    status = _explain_status.get(rec_id)
+    return status["user_id"] if status is not None else None
+
+
+@router.post("/{rec_id}/explain")
+async def explain_rec(rec_id: str, user=Depends(get_current_user)):
+    # Already being pre-generated for this user: wait for that result rather than calling the LLM again
+    in_flight = _explain_tasks.get(rec_id)
+    if in_flight is not None and _explain_owner(rec_id) == user.id:
+        return await asyncio.shield(in_flight)
+
+    ctx = await load_explain_context(user)
+    recommendation = await fetch_recommendation(rec_id, ctx["student_type"], user.id)
+    return await _explain_tracked(recommendation, ctx)
+
+
+# Readiness of a recommendation's details, so the page can render them as soon as they exist
+@router.get("/{rec_id}/explain/status")
+async def explain_status(rec_id: str, user=Depends(get_current_user)):
+    status = _explain_status.get(rec_id)
+    if status is not None and status["user_id"] == user.id:
+        return {"id": rec_id, "state": status["state"], "error": status["error"], "updated_at": status["updated_at"]}
+
+    # Not tracked in this process (or not theirs): the tables are the source of truth
+    student_type = await get_student_type(user)
+    _, _, response_table = explain_tables(student_type)
+    await fetch_recommendation(rec_id, student_type, user.id)
+    resp = await asyncio.to_thread(
+        lambda: supabase.table(response_table).select("id").eq("id", rec_id).limit(1).execute()
+    )
+    state = "ready" if resp and resp.data else "missing"
+    return {"id": rec_id, "state": state, "error": None, "updated_at": None}
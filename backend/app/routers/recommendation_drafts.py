@@ -0,0 +1,318 @@
+# app/routers/recommendation_drafts.py
+# Rule-based draft recommendations, shown while the LLM recommendations are generated.
+# Careers and UNSW degrees are described by the same feature vector: a weight per study
+# field plus a RIASEC profile. The student gets one from their survey answers (keyword
+# matched onto fields) and their personality quiz trait scores, and drafts are the
+# closest careers/degrees by cosine similarity. Career vectors are built at import;
+# degree vectors once per degree index build (see final_plan_service.get_degree_index).
+
+import logging
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.utils.database import supabase
+from app.utils.tracing import traced
+from .final_plan_service import get_degree_index
+
+logger = logging.getLogger(__name__)
+
+DRAFT_COUNT = 5
+# How much of the match comes from fields vs personality (when quiz results exist)
+FIELD_WEIGHT = 0.65
+RIASEC_WEIGHT = 0.35
+
+RIASEC = ("realistic", "investigative", "artistic", "social", "enterprising", "conventional")
+
+# Keyword prefixes that map free text (survey options, hobbies, degree names) onto fields
+FIELD_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "tech": ("tech", "software", "comput", "coding", "programming", "data", "cyber", "gaming", "game", "information", "artificial", "robot"),
+    "engineering": ("engineer", "mechan", "electr", "civil", "aerospace", "mechatron", "construct", "industrial", "design and technology"),
+    "science": ("science", "research", "physic", "chemi", "biolog", "math", "statist", "astronom", "investigat", "laborator"),
+    "health": ("health", "medic", "nurs", "pharma", "psycholog", "physio", "optom", "exercise", "biomed", "dent"),
+    "business": ("business", "commerce", "manag", "marketing", "entrepreneur", "econom", "consult", "work studies"),
+    "finance": ("financ", "account", "actuar", "investment", "bank", "econom"),
+    "law": ("law", "legal", "policy", "politic", "criminolog", "justice", "international relations"),
+    "arts": ("art ", "arts", "design", "music", "drama", "dance", "film", "photograph", "ceramic", "textile", "perform", "paint", "draw", "fashion", "architect"),
+    "media": ("media", "communicat", "journal", "writing", "english", "podcast", "social media", "video", "blog"),
+    "humanities": ("history", "humanit", "philosoph", "languag", "religion", "society and culture", "aboriginal", "linguist", "reading"),
+    "education": ("educat", "teach", "training", "tutor", "early childhood"),
+    "environment": ("environment", "sustainab", "agricultur", "marine", "geograph", "ecolog", "climate", "natural resources", "hiking", "garden"),
+    "social": ("social work", "community", "volunteer", "counsel", "family studies", "psycholog"),
+    "government": ("government", "public service", "public policy", "defence"),
+    "sport": ("sport", "fitness", "exercise", "gym", "recreation", "athlet", "movement"),
+    "hospitality": ("hospitality", "tourism", "event", "food", "cook", "travel"),
+    "trades": ("trade", "construct", "vocational", "vet course", "manufactur", "logistic", "woodwork", "industrial technology"),
+}
+FIELDS = tuple(FIELD_KEYWORDS)
+
+# RIASEC profile a degree inherits from its fields (degrees don't take the quiz)
+FIELD_RIASEC: Dict[str, Dict[str, float]] = {
+    "tech": {"investigative": 0.8, "conventional": 0.5, "realistic": 0.4},
+    "engineering": {"realistic": 0.9, "investigative": 0.7},
+    "science": {"investigative": 1.0, "realistic": 0.3},
+    "health": {"social": 0.8, "investigative": 0.7},
+    "business": {"enterprising": 0.9, "conventional": 0.5},
+    "finance": {"conventional": 0.9, "enterprising": 0.6},
+    "law": {"enterprising": 0.8, "investigative": 0.4, "social": 0.3},
+    "arts": {"artistic": 1.0},
+    "media": {"artistic": 0.7, "enterprising": 0.4, "social": 0.3},
+    "humanities": {"artistic": 0.5, "social": 0.5, "investigative": 0.4},
+    "education": {"social": 1.0},
+    "environment": {"realistic": 0.7, "investigative": 0.6},
+    "social": {"social": 1.0},
+    "government": {"conventional": 0.6, "enterprising": 0.5, "social": 0.4},
+    "sport": {"realistic": 0.7, "social": 0.6},
+    "hospitality": {"enterprising": 0.6, "social": 0.7},
+    "trades": {"realistic": 1.0, "conventional": 0.3},
+}
+
+FIELD_LABELS = {
+    "tech": "technology", "engineering": "engineering", "science": "science and research",
+    "health": "health", "business": "business", "finance": "finance", "law": "law and policy",
+    "arts": "arts and design", "media": "media and communication", "humanities": "the humanities",
+    "education": "education", "environment": "the environment", "social": "community work",
+    "government": "public service", "sport": "sport and fitness", "hospitality": "hospitality",
+    "trades": "hands-on, applied work",
+}
+
+# (title, industry, fields, RIASEC, education, skills, salary)
+CAREERS: List[Tuple[str, str, Dict[str, float], Dict[str, float], str, List[str], str]] = [
+    ("Software Engineer", "Technology", {"tech": 1.0, "engineering": 0.4}, {"investigative": 0.8, "realistic": 0.5, "conventional": 0.4},
+     "Bachelor's degree in Computer Science or Software Engineering", ["Programming", "Problem Solving", "System Design"], "$80000-$130000"),
+    ("Data Scientist", "Technology", {"tech": 0.9, "science": 0.7, "finance": 0.2}, {"investigative": 1.0, "conventional": 0.5},
+     "Bachelor's degree in Data Science, Statistics or Computer Science", ["Python", "Statistics", "Machine Learning"], "$90000-$140000"),
+    ("Cyber Security Analyst", "Technology", {"tech": 1.0, "government": 0.3}, {"investigative": 0.8, "conventional": 0.7},
+     "Bachelor's degree in Computer Science or Cyber Security", ["Networking", "Threat Analysis", "Attention to Detail"], "$85000-$130000"),
+    ("UX Designer", "Technology", {"tech": 0.6, "arts": 0.8, "media": 0.3}, {"artistic": 0.9, "investigative": 0.5, "social": 0.4},
+     "Bachelor's degree in Design, HCI or a related field", ["User Research", "Prototyping", "Visual Design"], "$75000-$120000"),
+    ("Mechanical Engineer", "Engineering", {"engineering": 1.0, "science": 0.3}, {"realistic": 1.0, "investigative": 0.7},
+     "Bachelor of Engineering (Honours) in Mechanical Engineering", ["CAD", "Thermodynamics", "Project Management"], "$75000-$115000"),
+    ("Civil Engineer", "Construction & Infrastructure", {"engineering": 1.0, "environment": 0.3, "trades": 0.3}, {"realistic": 1.0, "investigative": 0.5, "conventional": 0.4},
+     "Bachelor of Engineering (Honours) in Civil Engineering", ["Structural Analysis", "Project Management", "AutoCAD"], "$75000-$115000"),
+    ("Electrical Engineer", "Engineering", {"engineering": 1.0, "tech": 0.4, "science": 0.3}, {"realistic": 0.9, "investigative": 0.8},
+     "Bachelor of Engineering (Honours) in Electrical Engineering", ["Circuit Design", "Power Systems", "Problem Solving"], "$80000-$120000"),
+    ("Environmental Scientist", "Environment & Sustainability", {"environment": 1.0, "science": 0.7}, {"investigative": 0.9, "realistic": 0.7},
+     "Bachelor's degree in Environmental Science", ["Field Work", "Data Analysis", "Environmental Policy"], "$65000-$100000"),
+    ("Research Scientist", "Science & Research", {"science": 1.0}, {"investigative": 1.0, "artistic": 0.3},
+     "Bachelor of Science, usually followed by Honours or a PhD", ["Experimental Design", "Statistics", "Scientific Writing"], "$70000-$110000"),
+    ("Doctor", "Health & Medicine", {"health": 1.0, "science": 0.6}, {"investigative": 0.9, "social": 0.8},
+     "Doctor of Medicine (MD)", ["Clinical Reasoning", "Communication", "Resilience"], "$75000-$250000"),
+    ("Registered Nurse", "Health & Medicine", {"health": 1.0, "social": 0.5}, {"social": 1.0, "realistic": 0.4},
+     "Bachelor of Nursing", ["Patient Care", "Communication", "Teamwork"], "$70000-$95000"),
+    ("Psychologist", "Health & Medicine", {"health": 0.7, "social": 0.8, "science": 0.4}, {"social": 1.0, "investigative": 0.7},
+     "Bachelor of Psychology plus postgraduate training", ["Counselling", "Assessment", "Empathy"], "$80000-$120000"),
+    ("Physiotherapist", "Health & Medicine", {"health": 0.9, "sport": 0.7}, {"social": 0.8, "realistic": 0.7},
+     "Bachelor of Physiotherapy or Exercise Physiology", ["Anatomy", "Rehabilitation", "Communication"], "$70000-$100000"),
+    ("Accountant", "Finance & Accounting", {"finance": 1.0, "business": 0.5}, {"conventional": 1.0, "enterprising": 0.4},
+     "Bachelor of Commerce (Accounting)", ["Financial Reporting", "Excel", "Attention to Detail"], "$65000-$100000"),
+    ("Financial Analyst", "Finance & Accounting", {"finance": 1.0, "business": 0.6, "tech": 0.2}, {"conventional": 0.8, "investigative": 0.6, "enterprising": 0.6},
+     "Bachelor of Commerce (Finance) or Economics", ["Financial Modelling", "Excel", "Valuation"], "$75000-$120000"),
+    ("Management Consultant", "Business", {"business": 1.0, "finance": 0.4}, {"enterprising": 1.0, "investigative": 0.5, "social": 0.4},
+     "Bachelor's degree in Commerce, Engineering or Economics", ["Problem Solving", "Presentation", "Stakeholder Management"], "$80000-$130000"),
+    ("Marketing Manager", "Business", {"business": 0.8, "media": 0.7, "arts": 0.3}, {"enterprising": 0.9, "artistic": 0.6, "social": 0.4},
+     "Bachelor of Commerce (Marketing) or Communications", ["Campaign Strategy", "Analytics", "Copywriting"], "$75000-$120000"),
+    ("Entrepreneur", "Business", {"business": 1.0, "tech": 0.3}, {"enterprising": 1.0, "artistic": 0.4},
+     "Any bachelor's degree; business or technical study helps", ["Leadership", "Risk Taking", "Sales"], "Varies Widely"),
+    ("Lawyer", "Law & Public Policy", {"law": 1.0, "business": 0.3}, {"enterprising": 0.8, "investigative": 0.6, "social": 0.4},
+     "Bachelor of Laws (LLB) or Juris Doctor, plus PLT", ["Legal Research", "Writing", "Negotiation"], "$70000-$150000"),
+    ("Policy Advisor", "Government & Public Service", {"government": 1.0, "law": 0.6, "humanities": 0.4}, {"investigative": 0.6, "enterprising": 0.6, "social": 0.5},
+     "Bachelor's degree in Politics, Economics or Law", ["Research", "Writing", "Stakeholder Engagement"], "$75000-$115000"),
+    ("Secondary Teacher", "Education & Training", {"education": 1.0, "humanities": 0.3, "science": 0.3}, {"social": 1.0, "artistic": 0.3},
+     "Bachelor of Education or a bachelor's degree plus a Master of Teaching", ["Communication", "Lesson Planning", "Patience"], "$75000-$110000"),
+    ("Social Worker", "Social Work & Community Services", {"social": 1.0, "health": 0.3}, {"social": 1.0, "enterprising": 0.3},
+     "Bachelor of Social Work", ["Case Management", "Empathy", "Advocacy"], "$65000-$95000"),
+    ("Graphic Designer", "Arts & Design", {"arts": 1.0, "media": 0.5}, {"artistic": 1.0, "realistic": 0.3},
+     "Bachelor of Design", ["Adobe Creative Suite", "Typography", "Visual Communication"], "$55000-$85000"),
+    ("Architect", "Architecture & Design", {"arts": 0.8, "engineering": 0.5}, {"artistic": 0.9, "realistic": 0.6, "investigative": 0.4},
+     "Bachelor of Architectural Studies plus a Master of Architecture", ["Design", "CAD", "Spatial Reasoning"], "$65000-$110000"),
+    ("Journalist", "Media & Communication", {"media": 1.0, "humanities": 0.5}, {"artistic": 0.8, "investigative": 0.6, "social": 0.5},
+     "Bachelor of Media or Communications", ["Writing", "Interviewing", "Research"], "$55000-$90000"),
+    ("Film and Video Producer", "Arts & Entertainment", {"arts": 0.9, "media": 0.8}, {"artistic": 1.0, "enterprising": 0.6},
+     "Bachelor of Film, Media or Fine Arts", ["Storytelling", "Editing", "Project Management"], "$55000-$100000"),
+    ("Exercise Physiologist", "Sports & Fitness", {"sport": 1.0, "health": 0.7}, {"realistic": 0.8, "social": 0.8},
+     "Bachelor of Exercise Physiology", ["Anatomy", "Exercise Prescription", "Motivation"], "$65000-$90000"),
+    ("Event Manager", "Hospitality & Tourism", {"hospitality": 1.0, "business": 0.5}, {"enterprising": 0.9, "social": 0.7, "conventional": 0.4},
+     "Bachelor's degree in Business, Tourism or Events", ["Organisation", "Negotiation", "Communication"], "$60000-$90000"),
+    ("Construction Project Manager", "Trades & Construction", {"trades": 0.9, "engineering": 0.6, "business": 0.4}, {"realistic": 0.8, "enterprising": 0.7, "conventional": 0.5},
+     "Bachelor of Construction Management or Engineering", ["Scheduling", "Budgeting", "Leadership"], "$90000-$140000"),
+    ("Agricultural Scientist", "Agriculture & Natural Resources", {"environment": 1.0, "science": 0.6}, {"realistic": 0.9, "investigative": 0.8},
+     "Bachelor of Agricultural or Environmental Science", ["Field Research", "Soil Science", "Data Analysis"], "$65000-$95000"),
+    ("Supply Chain Analyst", "Manufacturing & Logistics", {"trades": 0.5, "business": 0.8, "tech": 0.3}, {"conventional": 0.9, "enterprising": 0.5},
+     "Bachelor of Commerce or Engineering", ["Forecasting", "Excel", "Process Improvement"], "$70000-$105000"),
+]
+
+
+def _normalise(vector: Dict[str, float]) -> Dict[str, float]:
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    return {k: v / norm for k, v in vector.items() if v} if norm else {}
+
+
+def _cosine(a: Dict[str, float], b: Dict[str, float]) -> float:
+    # Both sides are pre-normalised
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+def fields_from_text(items: Iterable[Any]) -> Dict[str, float]:
+    """Keyword-match free text (or lists of survey options) onto study fields."""
+    weights: Dict[str, float] = {}
+    for item in items:
+        if not item:
+            continue
+        values = item if isinstance(item, (list, tuple)) else [item]
+        for value in values:
+            text = " " + re.sub(r"[^a-z ]+", " ", str(value).lower()) + " "
+            for field, keywords in FIELD_KEYWORDS.items():
+                if any(f" {kw}" in text for kw in keywords):
+                    weights[field] = weights.get(field, 0.0) + 1.0
+    return weights
+
+
+def riasec_from_fields(fields: Dict[str, float]) -> Dict[str, float]:
+    profile: Dict[str, float] = {}
+    for field, weight in fields.items():
+        for trait, affinity in FIELD_RIASEC.get(field, {}).items():
+            profile[trait] = profile.get(trait, 0.0) + weight * affinity
+    return profile
+
+
+def _career_vectors() -> List[Dict[str, Any]]:
+    vectors = []
+    for title, industry, fields, riasec, education, skills, salary in CAREERS:
+        vectors.append({
+            "career_title": title,
+            "industry": industry,
+            "education_required": education,
+            "skills_needed": skills,
+            "avg_salary_range": salary,
+            "fields": _normalise(fields),
+            "riasec": _normalise(riasec),
+        })
+    return vectors
+
+
+CAREER_VECTORS = _career_vectors()
+
+_degree_vectors: List[Dict[str, Any]] = []
+_degree_vectors_for: Optional[int] = None
+
+
+# Degree vectors come from the shared degree index; rebuilt only when the index is
+def _get_degree_vectors() -> List[Dict[str, Any]]:
+    global _degree_vectors, _degree_vectors_for
+    index = get_degree_index()
+    if _degree_vectors_for == id(index):
+        return _degree_vectors
+
+    vectors = []
+    for doc in index["docs"]:
+        # Only name and career-outcome terms (weight >= 2): overview text is too noisy for field tags
+        strong_terms = [term for term, weight in doc["terms"].items() if weight >= 2]
+        fields = fields_from_text([doc["program_name"]])
+        for field, weight in fields_from_text(strong_terms).items():
+            fields[field] = fields.get(field, 0.0) + 0.5 * weight
+        if not fields:
+            continue
+        vectors.append({
+            "program_name": doc["program_name"],
+            "degree_code": doc["degree_code"],
+            "fields": _normalise(fields),
+            "riasec": _normalise(riasec_from_fields(fields)),
+        })
+    _degree_vectors, _degree_vectors_for = vectors, id(index)
+    return vectors
+
+
+def load_trait_scores(user_id: str) -> Dict[str, float]:
+    try:
+        resp = (
+            supabase.table("personality_results")
+            .select("trait_scores")
+            .eq("user_id", user_id)
+            .limit(1)
+            .execute()
+        )
+    except Exception as e:
+        logger.warning("Could not load personality results for %s: %s", user_id, e)
+        return {}
+    if not resp.data:
+        return {}
+    scores = resp.data[0].get("trait_scores") or {}
+    return {k.lower(): float(v) for k, v in scores.items() if k.lower() in RIASEC and v is not None}
+
+
+def student_vector(student_type: str, user_info: Dict[str, Any], trait_scores: Dict[str, float]):
+    if student_type == "university":
+        answers = [
+            user_info.get("degree_field"), user_info.get("interest_areas"), user_info.get("interest_areas_other"),
+            user_info.get("hobbies"), user_info.get("hobbies_other"),
+        ]
+    else:
+        answers = [
+            user_info.get("career_interests"), user_info.get("degree_interest"),
+            user_info.get("academic_strengths"), user_info.get("hobbies"),
+        ]
+    fields = fields_from_text(answers)
+    return _normalise(fields), _normalise(trait_scores)
+
+
+def _reason(fields: Dict[str, float], candidate: Dict[str, Any], riasec: Dict[str, float]) -> str:
+    shared = sorted(
+        (f for f in candidate["fields"] if f in fields),
+        key=lambda f: -(fields[f] * candidate["fields"][f]),
+    )[:2]
+    parts = []
+    if shared:
+        parts.append("Matches your interest in " + " and ".join(FIELD_LABELS[f] for f in shared))
+    top_traits = [t for t, _ in sorted(riasec.items(), key=lambda x: -x[1])[:2] if t in candidate["riasec"]]
+    if top_traits:
+        parts.append("suits your " + " and ".join(top_traits) + " personality traits")
+    return ("; ".join(parts) + ".").capitalize() if parts else "A broad match for your survey answers."
+
+
+def _rank(candidates: List[Dict[str, Any]], fields: Dict[str, float], riasec: Dict[str, float], k: int):
+    field_weight, riasec_weight = (FIELD_WEIGHT, RIASEC_WEIGHT) if riasec else (1.0, 0.0)
+    scored = []
+    for position, candidate in enumerate(candidates):
+        score = field_weight * _cosine(fields, candidate["fields"])
+        if riasec:
+            score += riasec_weight * _cosine(riasec, candidate["riasec"])
+        scored.append((-score, position, candidate))
+    scored.sort(key=lambda x: (x[0], x[1]))
+    return [(candidate, -neg) for neg, _, candidate in scored[:k]]
+
+
+@traced(kind="cpu")
+def draft_recommendations(student_type: str, user_info: Dict[str, Any], trait_scores: Dict[str, float],
+                          k: int = DRAFT_COUNT) -> List[Dict[str, Any]]:
+    """Instant, deterministic suggestions in the same shape as the LLM rows (flagged draft=True)."""
+    fields, riasec = student_vector(student_type, user_info, trait_scores)
+    if not fields and not riasec:
+        return []
+
+    drafts = []
+    if student_type == "university":
+        for career, score in _rank(CAREER_VECTORS, fields, riasec, k):
+            drafts.append({
+                "career_title": career["career_title"],
+                "industry": career["industry"],
+                "suitability_score": round(100 * score),
+                "reason": _reason(fields, career, riasec),
+                "avg_salary_range": career["avg_salary_range"],
+                "education_required": career["education_required"],
+                "skills_needed": career["skills_needed"],
+                "draft": True,
+            })
+    else:
+        for degree, score in _rank(_get_degree_vectors(), fields, riasec, k):
+            drafts.append({
+                "degree_name": degree["program_name"],
+                "university_name": "University of New South Wales",
+                "degree_code": degree["degree_code"],
+                "suitability_score": round(100 * score),
+                "reason": _reason(fields, degree, riasec),
+                "draft": True,
+            })
+    return drafts
@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException
 from dependencies import get_current_user
 from app.utils.database import supabase
@@ -6,51 +7,65 @@ from app.utils.openai_client import ask_openai, ask_gemini
 from pydantic import BaseModel
 
 
-from PyPDF2 import PdfReader
-from docx import Document
-from PIL import Image
-import pytesseract
-import io
+from app.utils.document_extraction import (
+    DocumentTooLargeError, UnsupportedDocumentError, download_to_tempfile, extract_text
+)
+from app.utils.transcript_parser import is_course_completed, parse_unsw_transcript, rank_courses
+import asyncio
 import datetime
 import json
+import time
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
 
+router = APIRouter()
 
-def extract_text_from_file(data: bytes, filename: str) -> str:
-    fileName = filename.lower()
-
-    if fileName.endswith(".pdf"):
-        reader = PdfReader(io.BytesIO(data))
-        pages = [page.extract_text() or "" for page in reader.pages]
-        return "\n".join(pages)
-
-    elif fileName.endswith(".docx"):
-        doc = Document(io.BytesIO(data))
-        texts = [p.text for p in doc.paragraphs]
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    texts.append(cell.text)
-        return "\n".join(texts)
-
-    elif (
-        fileName.endswith(".png")
-        or fileName.endswith(".jpeg")
-        or fileName.endswith(".jpg")
-        or fileName.endswith(".tiff")
-    ):
-        img = Image.open(io.BytesIO(data))
-        # ensure RGB or grayscale:
-        if img.mode not in ("RGB", "L"):
-            img = img.convert("RGB")
-        return pytesseract.image_to_string(img)
-
-    else:
-        raise HTTPException(
-            status_code=400,
-            detail="Unsupported file type; only PDF, DOCX, and JPEG/PNG/TIFF images are allowed.",
-        )
+# Header / free-form text sent to the LLM when the transcript was parsed by rules
+MAX_FREEFORM_CHARS = 4000
+
+
+# Write parsed transcript courses into user_completed_courses (used by /compare and the
+# progress page). Later attempts of the same course win; in-progress courses are skipped.
+def sync_completed_courses(user_id: str, parsed: dict) -> int:
+    latest = {}
+    for term in parsed["term_summaries"]:
+        for course in term["courses"]:
+            if course["grade"] is None and course["mark"] is None:
+                continue
+            latest[course["code"]] = course
+
+    if not latest:
+        return 0
+
+    existing = (
+        supabase.table("user_completed_courses")
+        .select("id, course_code")
+        .eq("user_id", user_id)
+        .in_("course_code", list(latest))
+        .execute()
+    )
+    existing_ids = {row["course_code"]: row["id"] for row in existing.data or []}
+
+    new_rows = []
+    for code, course in latest.items():
+        values = {"mark": course["mark"], "is_completed": is_course_completed(course)}
+        if code in existing_ids:
+            supabase.table("user_completed_courses").update(values).eq("id", existing_ids[code]).execute()
+        else:
+            new_rows.append({
+                "user_id": user_id,
+                "course_code": code,
+                "course_name": course["title"],
+                "uoc": course["uoc"],
+                "category": "Transcript",
+                "source_type": "transcript",
+                "source_code": None,
+                **values,
+            })
+
+    if new_rows:
+        supabase.table("user_completed_courses").insert(new_rows).execute()
+    return len(latest)
 
 
 class AnalyseReportRequest(BaseModel):
@@ -75,13 +90,40 @@ async def analyse_report(request: AnalyseReportRequest, user=Depends(get_current
     if not path:
         raise HTTPException(status_code=400, detail="File path is required")
 
-    download = supabase.storage.from_("reports").download(path)
+    timings = {}
 
-    if not download:
+    # Stream the upload to a temp file (size-capped) instead of loading it into memory
+    start = time.perf_counter()
+    try:
+        signed = await asyncio.to_thread(
+            supabase.storage.from_("reports").create_signed_url, path, 60
+        )
+        document = await download_to_tempfile(signed["signedURL"], path)
+    except UnsupportedDocumentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DocumentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        logger.warning("[reports] Download failed for %s: %s", path, e)
         raise HTTPException(status_code=400, detail="Could not Download")
+    timings["download"] = time.perf_counter() - start
 
-    raw = download
-    report_text = extract_text_from_file(raw, path)
+    start = time.perf_counter()
+    try:
+        extraction = await extract_text(document)
+    except UnsupportedDocumentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        document.close()
+    timings["extract"] = time.perf_counter() - start
+    report_text = extraction.text
+
+    # Fast path: UNSW transcripts are parsed by rules; the LLM only writes the free-form parts
+    parsed = None
+    if student_type != "high_school":
+        start = time.perf_counter()
+        parsed = parse_unsw_transcript(report_text)
+        timings["parse"] = time.perf_counter() - start
 
     if student_type == "high_school":
         prompt = f"""
@@ -100,6 +142,40 @@ async def analyse_report(request: AnalyseReportRequest, user=Depends(get_current
           
           Return  **only** a single valid JSON object.
         """
+    elif parsed:
+        course_lines = "\n".join(
+            f"{term['term']}: " + ", ".join(
+                f"{c['code']} {c['title']} {c['mark'] if c['mark'] is not None else ''} {c['grade'] or ''}".strip()
+                for c in term["courses"]
+            )
+            for term in parsed["term_summaries"]
+        )
+        prompt = f"""
+        You are a seasoned UNSW academic advisor. The course results below were already extracted from a student's transcript.
+
+        Return the result as a single valid JSON object. Do not use markdown or explanations. Only include fields if the information is clearly present.
+
+        The JSON must include the following fields:
+
+        - **full_name** (string): Student’s full name (from the transcript header)  
+        - **student_id** (string): UNSW student ID (from the transcript header)  
+        - **degree_program** (string): Full name of the degree program (e.g. "Bachelor of Engineering (Honours)")  
+        - **major** (string): Name of the major or specialisation (e.g. "Computer Engineering")  
+        - **strengths** (array of strings): Short phrases summarizing strong academic areas  
+        - **weaknesses** (array of strings): Areas needing improvement  
+        - **evaluation** (string): A concise paragraph summarizing overall academic standing  
+        - **recommendation** (string): Specific advice on what to improve or prioritize going forward
+
+        Return only the JSON result. Do not include markdown, explanation, or commentary.
+
+        WAM: {parsed["wam"]}  |  UOC completed: {parsed["uoc_completed"]} of {parsed["uoc_attempted"]} attempted
+
+        Results by term:
+        {course_lines}
+
+        Transcript header / other text:
+        {parsed["unparsed_text"][:MAX_FREEFORM_CHARS]}
+        """
     else:
         prompt = f"""
         You are a seasoned UNSW academic advisor. Analyse the following university transcript text and extract key academic information.
@@ -140,7 +216,9 @@ async def analyse_report(request: AnalyseReportRequest, user=Depends(get_current
         {report_text}
         """
 
-    ai_output_str = ask_gemini(prompt)
+    start = time.perf_counter()
+    ai_output_str = await asyncio.to_thread(ask_gemini, prompt)
+    timings["llm"] = time.perf_counter() - start
     text = ai_output_str.strip()
     if text.startswith("```"):
         # remove ```json or ``` at top/bottom
@@ -152,6 +230,23 @@ async def analyse_report(request: AnalyseReportRequest, user=Depends(get_current
     except json.JSONDecodeError as e:
         raise HTTPException(500, f"Could not parse LLM output as JSON: {e}")
 
+    if parsed:
+        # Rule-parsed numbers are authoritative; the LLM only filled in the narrative fields
+        ai_output.update({
+            "wam": parsed["wam"],
+            "uoc_attempted": parsed["uoc_attempted"],
+            "uoc_completed": parsed["uoc_completed"],
+            "term_summaries": parsed["term_summaries"],
+            **rank_courses(parsed),
+        })
+        start = time.perf_counter()
+        try:
+            synced = await asyncio.to_thread(sync_completed_courses, user.id, parsed)
+            logger.debug("[reports] Synced %s transcript courses for %s", synced, user.id)
+        except Exception as e:
+            logger.warning("[reports] Failed to sync completed courses: %s", e)
+        timings["sync_courses"] = time.perf_counter() - start
+
     # Upsert in one go (avoids having to check update vs insert yourself)
     upsert_payload = {
         "user_id": user.id,
@@ -160,8 +255,14 @@ async def analyse_report(request: AnalyseReportRequest, user=Depends(get_current
         "analysed_at": datetime.datetime.now().isoformat(),
     }
 
+    start = time.perf_counter()
     resp = supabase.table(report_table).upsert(upsert_payload).execute()
+    timings["save"] = time.perf_counter() - start
     if not resp:
         raise HTTPException(500, f"DB upsert failed: {resp.error.message}")
 
+    stage_times = ", ".join(f"{name}={secs:.2f}s" for name, secs in timings.items())
+    detail = ", ".join(f"{name}={secs:.2f}s" for name, secs in extraction.timings.items())
+    logger.info("[reports] %s | size=%sB pages=%s cached=%s truncated=%s rule_parsed=%s (%s)", stage_times, document.size, extraction.pages, extraction.cached, extraction.truncated, parsed is not None, detail)
+
     return {"analysis": ai_output}
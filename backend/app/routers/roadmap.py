@@ -1,6 +1,11 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from app.utils.database import supabase
+from app.utils.roadmap_events import roadmap_events
+from app.utils.sse import KEEP_ALIVE, sse, sse_response
+from app.utils.tracing import traced_task
 from dependencies import get_current_user
+import asyncio
 
 from .roadmap_common import (
     SchoolReq, UNSWReq, RoadmapResp,
@@ -12,13 +17,27 @@ from .roadmap_unsw_flexibility import generate_and_update_flexibility
 from .roadmap_industry import generate_and_update_industry_careers
 from .roadmap_industry import generate_and_update_societies
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["roadmap"])
 
+# Keep references to fire-and-forget background tasks so they aren't garbage collected.
+# Each task runs in its own span, linked to the request that scheduled it
+_background_tasks = set()
+
+def _spawn(coro, name: str, **attributes):
+    task = asyncio.create_task(traced_task(name, coro, **attributes))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+# SSE stream settings
+EVENTS_MAX_SECONDS = 300
+EVENTS_KEEPALIVE_SECONDS = 15
+
 # Generate roadmap for high school students
 @router.post("/school", response_model=RoadmapResp)
 async def create_school(body: SchoolReq, user=Depends(get_current_user)):
-    import asyncio
-    
     ensure(bool(body.recommendation_id or body.degree_name), "Provide recommendation_id or degree_name.")
     ctx = await gather_school_context(user.id, body)
     payload = await ai_generate_school_payload(ctx)
@@ -33,7 +52,8 @@ async def create_school(body: SchoolReq, user=Depends(get_current_user)):
     rec = ins.data[0]
     
     # Trigger background task for careers
-    asyncio.create_task(generate_and_update_school_careers(rec["id"], ctx))
+    roadmap_events.expect(rec["id"], ["career_pathways"])
+    _spawn(generate_and_update_school_careers(rec["id"], ctx), "roadmap.school_careers", roadmap_id=rec["id"])
     
     return {"id": rec["id"], "mode": rec["mode"], "payload": rec["payload"]}
 
@@ -44,9 +64,6 @@ async def create_unsw(
     background_tasks: BackgroundTasks,  
     user=Depends(get_current_user)
 ):
-    import time
-    endpoint_start = time.time()
-    
     ensure(any([body.degree_id, body.uac_code, body.program_name]),
            "Provide degree_id or uac_code or program_name.")
 
@@ -54,10 +71,7 @@ async def create_unsw(
     ctx = await gather_unsw_context(user.id, body)
     payload = await ai_generate_unsw_payload(ctx)
 
-    print(f"[TIMING] After AI generation: {time.time() - endpoint_start:.1f}s")
-
     # save roadmap in DB 
-    db_start = time.time()
     try:
         ins = (
             supabase.table("unsw_roadmap")
@@ -74,15 +88,11 @@ async def create_unsw(
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Insert failed: {e}")
-    
-    print(f"[TIMING] DB insert: {time.time() - db_start:.1f}s")
 
     rec = ins.data[0]
 
     # Trigger BOTH background tasks in parallel 
     try:
-        import asyncio
-        
         # Check if degree has courses for flexibility generation
         degree_code = ctx.get("degree_code")
         core_courses = ctx.get("core_courses", [])
@@ -94,22 +104,25 @@ async def create_unsw(
 
         total_courses = len(core_courses) + len(honours_courses) + len(major_courses) + len(minor_courses)
 
-        print(f"[FLEXIBILITY] degree_code={degree_code}, core={len(core_courses)}, honours={len(honours_courses)}, major={len(major_courses)}, minor={len(minor_courses)}, total={total_courses}")
+        logger.debug("[FLEXIBILITY] degree_code=%s, core=%s, honours=%s, major=%s, minor=%s, total=%s", degree_code, len(core_courses), len(honours_courses), len(major_courses), len(minor_courses), total_courses)
+
+        sections = ["industry_societies", "industry_experience", "career_pathways"]
+        if total_courses > 0:
+            sections.append("flexibility_detailed")
+        roadmap_events.expect(rec["id"], sections)
 
         if total_courses > 0:
-            print(f"[Background] Launching flexibility (has {total_courses} total courses)")
-            asyncio.create_task(generate_and_update_flexibility(rec["id"], rec))
+            logger.info("[Background] Launching flexibility (has %s total courses)", total_courses)
+            _spawn(generate_and_update_flexibility(rec["id"], rec), "roadmap.flexibility", roadmap_id=rec["id"])
         else:
-            print(f"[Background] Skipping flexibility - no courses found for degree {degree_code}")
+            logger.info("[Background] Skipping flexibility - no courses found for degree %s", degree_code)
         
         # Always generate societies and industry/careers
-        asyncio.create_task(generate_and_update_societies(rec["id"], rec))
-        asyncio.create_task(generate_and_update_industry_careers(rec["id"], rec))
+        _spawn(generate_and_update_societies(rec["id"], rec), "roadmap.societies", roadmap_id=rec["id"])
+        _spawn(generate_and_update_industry_careers(rec["id"], rec), "roadmap.industry_careers", roadmap_id=rec["id"])
             
     except Exception as e:
-        print(f"[Background] Failed to schedule tasks: {e}")
-
-    print(f"[TIMING] TOTAL ENDPOINT: {time.time() - endpoint_start:.1f}s")
+        logger.warning("[Background] Failed to schedule tasks: %s", e)
 
     # Return immediate response to frontend
     return {"id": rec["id"], "mode": rec["mode"], "payload": rec["payload"]}
@@ -146,6 +159,7 @@ async def generate_flexibility(
         }
     
     # Schedule background task to generate flexibility
+    roadmap_events.expect(roadmap_id, ["flexibility_detailed"])
     background_tasks.add_task(
         generate_and_update_flexibility,
         roadmap_id,
@@ -157,6 +171,52 @@ async def generate_flexibility(
         "message": "Flexibility recommendations are being generated in the background"
     }
 
+# Stream section-ready events for a roadmap (SSE) so the client can re-fetch the
+# payload once per finished section instead of polling GET /roadmap/{mode}
+@router.get("/{mode}/{roadmap_id}/events")
+async def roadmap_events_stream(mode: str, roadmap_id: str, user=Depends(get_current_user)):
+    table = table_for_mode(mode)
+    try:
+        owned = (
+            supabase.from_(table)
+            .select("id").eq("id", roadmap_id).eq("user_id", user.id)
+            .limit(1).execute()
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Query failed: {e}")
+    if not owned.data:
+        raise HTTPException(status_code=404, detail="Roadmap not found")
+
+    queue, history, pending = roadmap_events.subscribe(roadmap_id)
+
+    async def event_generator():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + EVENTS_MAX_SECONDS
+        try:
+            yield sse({"type": "subscribed", "roadmap_id": roadmap_id, "pending": pending})
+
+            # Replay what already landed before the client connected
+            for event in history:
+                yield sse(event)
+            # Nothing in flight for this roadmap (already complete, or never scheduled here)
+            if pending is None:
+                return
+
+            while loop.time() < deadline:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield KEEP_ALIVE
+                    continue
+                yield sse(event)
+                if event["type"] == "complete":
+                    return
+            yield sse({"type": "timeout", "roadmap_id": roadmap_id})
+        finally:
+            roadmap_events.unsubscribe(roadmap_id, queue)
+
+    return sse_response(event_generator())
+
 # Get user's most recent roadmap by mode 
 @router.get("/{mode}", response_model=RoadmapResp)
 async def get_latest(mode: str, user=Depends(get_current_user)):
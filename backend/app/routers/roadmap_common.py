@@ -1,7 +1,10 @@
 from fastapi import HTTPException
 from pydantic import BaseModel
 from typing import Optional, Any, Dict, List
-import json, re
+from datetime import datetime
+import json, re, threading
+from app.utils.database import supabase
+from app.utils.roadmap_events import roadmap_events
 
 # Request and Response models
 class SchoolReq(BaseModel):
@@ -56,3 +59,23 @@ def assert_keys(payload: Dict[str, Any], required: List[str], where: str):
 def _first_or_none(res) -> Optional[Dict[str, Any]]:
     return res.data[0] if (res and getattr(res, "data", None)) else None
 
+
+
+# Background sections finish independently and each one does read-modify-write on
+# the same payload, so merges for one roadmap are serialised (striped locks).
+_PAYLOAD_LOCKS = [threading.Lock() for _ in range(64)]
+
+def merge_roadmap_payload(table: str, roadmap_id: str, updates: Dict[str, Any], touch: bool = True) -> Dict[str, Any]:
+    with _PAYLOAD_LOCKS[hash(roadmap_id) % len(_PAYLOAD_LOCKS)]:
+        latest = supabase.from_(table).select("payload").eq("id", roadmap_id).single().execute()
+        payload = latest.data.get("payload", {}) if latest.data else {}
+        payload.update(updates)
+
+        row: Dict[str, Any] = {"payload": payload}
+        if touch:
+            row["updated_at"] = datetime.utcnow().isoformat()
+        supabase.from_(table).update(row).eq("id", roadmap_id).execute()
+
+    # Let SSE subscribers know these sections are ready to fetch
+    roadmap_events.publish(roadmap_id, updates.keys())
+    return payload
@@ -1,15 +1,17 @@
 # Generated the societies, industry and careers sections in roadmap university mode
 
+import logging
 import json
 import re
-import asyncio
-import time
 from typing import Any, Dict, List
-from datetime import datetime
-from app.utils.database import supabase
-from app.utils.openai_client import ask_openai
+from app.utils.openai_client import ask_openai_async
+from app.utils.orchestrator import Stage, run_stages
+from app.utils.roadmap_events import roadmap_events
+from .roadmap_common import merge_roadmap_payload
 from .roadmap_unsw_helpers import fetch_user_specialisation_context
 
+logger = logging.getLogger(__name__)
+
 # Json parse fixing
 def sanitize_and_parse_json(raw_text: str) -> Dict[str, Any]:
 
@@ -24,7 +26,7 @@ def sanitize_and_parse_json(raw_text: str) -> Dict[str, Any]:
     try:
         return json.loads(text)
     except json.JSONDecodeError as e:
-        print(f"[JSON] Initial parse failed: {e}")
+        logger.warning("[JSON] Initial parse failed: %s", e)
         last_error = e
         
     try:
@@ -43,7 +45,7 @@ def sanitize_and_parse_json(raw_text: str) -> Dict[str, Any]:
 
         return json.loads(cleaned)
     except json.JSONDecodeError as e:
-        print(f"[JSON] Cleanup parse failed: {e}")
+        logger.warning("[JSON] Cleanup parse failed: %s", e)
         last_error = e
 
     # Fix unquoted property names
@@ -55,7 +57,7 @@ def sanitize_and_parse_json(raw_text: str) -> Dict[str, Any]:
         fixed = re.sub(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*:', quote_property_names, cleaned)
         return json.loads(fixed)
     except json.JSONDecodeError as e:
-        print(f"[JSON] Property name fixing failed: {e}")
+        logger.warning("[JSON] Property name fixing failed: %s", e)
         last_error = e
 
     # Extract core JSON object/brackets
@@ -69,7 +71,7 @@ def sanitize_and_parse_json(raw_text: str) -> Dict[str, Any]:
             json_only = re.sub(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*:', r'"\1":', json_only)
             return json.loads(json_only)
     except json.JSONDecodeError as e:
-        print(f"[JSON] Extraction strategy failed: {e}")
+        logger.warning("[JSON] Extraction strategy failed: %s", e)
         last_error = e
 
     # Fix specific known patterns
@@ -92,11 +94,11 @@ def sanitize_and_parse_json(raw_text: str) -> Dict[str, Any]:
 
         return json.loads(fixed_text)
     except json.JSONDecodeError as e:
-        print(f"Pattern fixing failed: {e}")
+        logger.warning("Pattern fixing failed: %s", e)
         last_error = e
 
     # If all strategies failed
-    print(f"All parsing strategies failed")
+    logger.warning("All parsing strategies failed")
     # print(f"Raw text (first 500 chars):\n{raw_text[:500]}")
 
     raise ValueError(
@@ -198,10 +200,10 @@ async def ai_generate_societies(context: Dict[str, Any]) -> Dict[str, Any]:
     Return ONLY valid JSON. Start with {{ and end with }}.
     """
         
-    print("Societies generating...")
+    logger.debug("Societies generating...")
     
     try:
-        raw = ask_openai(prompt)
+        raw = await ask_openai_async(prompt)
         
         raw_stripped = raw.strip()
         first_brace = raw_stripped.find('{')
@@ -211,11 +213,11 @@ async def ai_generate_societies(context: Dict[str, Any]) -> Dict[str, Any]:
         result = sanitize_and_parse_json(json_only)
         faculty_count = len(result.get('societies', {}).get('faculty_specific', []))
         events_count = len(result.get('societies', {}).get('major_events', []))
-        print(f"[Stage 1: Societies] ✓ Generated {faculty_count} societies, {events_count} events")
+        logger.info("[Stage 1: Societies] ✓ Generated %s societies, %s events", faculty_count, events_count)
         return result
         
     except Exception as e:
-        print(f"[Stage 1: Societies] ✗ Error: {e}")
+        logger.warning("[Stage 1: Societies] ✗ Error: %s", e)
         return {
             "societies": {
                 "faculty_specific": [],
@@ -306,10 +308,10 @@ async def ai_generate_industry_experience(context: Dict[str, Any]) -> Dict[str,
     Use REAL company and program names. Return ONLY valid JSON. Start with {{ and end with }}.
     """
         
-    print("Industry Experience Generating...")
+    logger.debug("Industry Experience Generating...")
     
     try:
-        raw = ask_openai(prompt)
+        raw = await ask_openai_async(prompt)
         
         raw_stripped = raw.strip()
         first_brace = raw_stripped.find('{')
@@ -317,7 +319,7 @@ async def ai_generate_industry_experience(context: Dict[str, Any]) -> Dict[str,
         json_only = raw_stripped[first_brace:last_brace + 1] if first_brace != -1 else raw_stripped
         
         result = sanitize_and_parse_json(json_only)
-        print(f"Industry generated {len(result.get('industry_experience', {}).get('internship_programs', []))} internship programs")
+        logger.info("Industry generated %s internship programs", len(result.get('industry_experience', {}).get('internship_programs', [])))
         return result
         
     except Exception as e:
@@ -469,10 +471,10 @@ async def ai_generate_career_pathways(context: Dict[str, Any]) -> Dict[str, Any]
     Return ONLY valid JSON. Start with {{ and end with }}.
     """
 
-    print("Career Pathways Generating...")
+    logger.debug("Career Pathways Generating...")
     
     try:
-        raw = ask_openai(prompt)
+        raw = await ask_openai_async(prompt)
         raw_stripped = raw.strip()
         
         # Extract JSON
@@ -484,7 +486,7 @@ async def ai_generate_career_pathways(context: Dict[str, Any]) -> Dict[str, Any]
         return result
                 
     except Exception as e:
-        print(f"Raw:\n{raw if 'raw' in locals() else 'N/A'}")
+        logger.debug("Raw:\n%s", raw if 'raw' in locals() else 'N/A')
         
         return {
             "career_pathways": {
@@ -508,11 +510,9 @@ async def ai_generate_career_pathways(context: Dict[str, Any]) -> Dict[str, Any]
         }
 
 
-# Generate industry experience and career pathways ssections in one call
-async def generate_and_update_industry_careers(roadmap_id: str, roadmap_data: dict):
-
-    loop = asyncio.get_event_loop()
-
+# Shared context stage for the background sections: program info plus the
+# user's selected specialisations
+def _load_section_context(roadmap_data: dict) -> Dict[str, Any]:
     base_context = {
         "program_name": roadmap_data.get("program_name"),
         "faculty": roadmap_data.get("payload", {}).get("faculty"),
@@ -525,71 +525,66 @@ async def generate_and_update_industry_careers(roadmap_id: str, roadmap_data: di
             spec = fetch_user_specialisation_context(user_id, degree_code)
             base_context.update(spec)
         except Exception as e:
-            print("Failed to load specialisations:", str(e))
+            logger.warning("Failed to load specialisations: %s", e)
+    return base_context
 
-    # Run only 2 tasks in parallel (no societies)
-    industry_future = loop.run_in_executor(
-        None, lambda: asyncio.run(ai_generate_industry_experience(base_context))
-    )
-    careers_future = loop.run_in_executor(
-        None, lambda: asyncio.run(ai_generate_career_pathways(base_context))
-    )
 
-    # print(f"Waiting for industry and careers for roadmap {roadmap_id}...")
+# Generate industry experience and career pathways sections in one pipeline
+async def generate_and_update_industry_careers(roadmap_id: str, roadmap_data: dict):
 
-    industry_result, careers_result = await asyncio.gather(
-        industry_future, careers_future
-    )
+    def load_context(ctx, results):
+        return _load_section_context(roadmap_data)
 
-    print("Industry and careers finished. Merging payload...")
+    async def industry(ctx, results):
+        return await ai_generate_industry_experience(results["context"])
 
-    latest = supabase.from_("unsw_roadmap").select("payload").eq("id", roadmap_id).single().execute()
-    payload = latest.data.get("payload", {}) if latest.data else {}
+    async def careers(ctx, results):
+        return await ai_generate_career_pathways(results["context"])
 
-    payload["industry_experience"] = industry_result.get("industry_experience", {})
-    payload["career_pathways"] = careers_result.get("career_pathways", {})
+    def save(ctx, results):
+        merge_roadmap_payload("unsw_roadmap", roadmap_id, {
+            "industry_experience": results["industry"].get("industry_experience", {}),
+            "career_pathways": results["careers"].get("career_pathways", {}),
+        })
 
-    supabase.from_("unsw_roadmap").update({
-        "payload": payload,
-        "updated_at": datetime.utcnow().isoformat(),
-    }).eq("id", roadmap_id).execute()
+    stages = [
+        Stage("context", load_context, limit="db"),
+        Stage("industry", industry, deps=("context",), limit="llm"),
+        Stage("careers", careers, deps=("context",), limit="llm"),
+        Stage("save", save, deps=("industry", "careers"), limit="db"),
+    ]
 
-    print("Industry and careers saved.")
+    try:
+        await run_stages(stages, {}, label=f"industry_careers {roadmap_id}")
+        logger.info("Industry and careers saved.")
+    except Exception as e:
+        logger.warning("Industry and careers failed for roadmap %s: %s", roadmap_id, e)
+        roadmap_events.publish(roadmap_id, ["industry_experience", "career_pathways"], status="failed")
 
 
-# Generate societies section in another call 
+# Generate societies section in another pipeline
 async def generate_and_update_societies(roadmap_id: str, roadmap_data: dict):
 
-    start = time.time()
-
-    base_context = {
-        "program_name": roadmap_data.get("program_name"),
-        "faculty": roadmap_data.get("payload", {}).get("faculty"),
-    }
-
-    user_id = roadmap_data.get("user_id")
-    degree_code = roadmap_data.get("degree_code")
-    if user_id and degree_code:
-        try:
-            spec = fetch_user_specialisation_context(user_id, degree_code)
-            base_context.update(spec)
-        except Exception as e:
-            print(f"Failed to load specialisations: {e}")
+    def load_context(ctx, results):
+        return _load_section_context(roadmap_data)
 
-    # Generate societies
-    societies_result = await ai_generate_societies(base_context)
-
-    # Load latest payload and merge
-    latest = supabase.from_("unsw_roadmap").select("payload").eq("id", roadmap_id).single().execute()
-    payload = latest.data.get("payload", {}) if latest.data else {}
+    async def societies(ctx, results):
+        return await ai_generate_societies(results["context"])
 
     # Save to industry_societies for frontend polling
-    payload["industry_societies"] = societies_result.get("societies", {})
+    def save(ctx, results):
+        merge_roadmap_payload("unsw_roadmap", roadmap_id, {
+            "industry_societies": results["societies"].get("societies", {}),
+        })
 
-    # Save immediately
-    supabase.from_("unsw_roadmap").update({
-        "payload": payload,
-        "updated_at": datetime.utcnow().isoformat()
-    }).eq("id", roadmap_id).execute()
+    stages = [
+        Stage("context", load_context, limit="db"),
+        Stage("societies", societies, deps=("context",), limit="llm"),
+        Stage("save", save, deps=("societies",), limit="db"),
+    ]
 
-    print(f"Societies section completed in {time.time() - start:.1f}s")
\ No newline at end of file
+    try:
+        await run_stages(stages, {}, label=f"societies {roadmap_id}")
+    except Exception as e:
+        logger.warning("Societies failed for roadmap %s: %s", roadmap_id, e)
+        roadmap_events.publish(roadmap_id, ["industry_societies"], status="failed")
@@ -1,12 +1,17 @@
+import logging
 from typing import Any, Dict
 from app.utils.database import supabase
-from app.utils.openai_client import ask_openai
+from app.utils.openai_client import ask_openai_async
 from .roadmap_common import (
-    _first_or_none, assert_keys
+    _first_or_none, assert_keys, merge_roadmap_payload
 )
+import asyncio
 import json
+from app.utils.roadmap_events import roadmap_events
 from .roadmap_industry import sanitize_and_parse_json
 
+logger = logging.getLogger(__name__)
+
 
 async def gather_school_context(user_id: str, req) -> Dict[str, Any]:
     rec = None
@@ -121,7 +126,7 @@ async def ai_generate_school_payload(context: Dict[str, Any]) -> Dict[str, Any]:
     - Output is valid JSON only.
     """
 
-    raw = ask_openai(prompt)
+    raw = await ask_openai_async(prompt)
     payload = sanitize_and_parse_json(raw)
 
     assert_keys(
@@ -224,30 +229,28 @@ async def ai_generate_school_careers(context: Dict[str, Any]) -> Dict[str, Any]:
     Return ONLY valid JSON.
     """
 
-    raw = ask_openai(prompt)
+    raw = await ask_openai_async(prompt)
     return sanitize_and_parse_json(raw)
 
 
 # Background task to update DB with careers
 async def generate_and_update_school_careers(roadmap_id: str, context: Dict[str, Any]):
-    print(f"[School Background] Generating careers for {roadmap_id}...")
+    logger.debug("[School Background] Generating careers for %s...", roadmap_id)
     
     try:
         careers_data = await ai_generate_school_careers(context)
         
-        # Get current payload
-        latest = supabase.from_("school_roadmap").select("payload").eq("id", roadmap_id).single().execute()
-        payload = latest.data.get("payload", {}) if latest.data else {}
-        
-        # Merge careers data
-        payload["career_pathways"] = careers_data.get("career_pathways", {})
-        
-        # Save
-        supabase.from_("school_roadmap").update({
-            "payload": payload
-        }).eq("id", roadmap_id).execute()
+        # Merge careers data into the latest payload
+        await asyncio.to_thread(
+            merge_roadmap_payload,
+            "school_roadmap",
+            roadmap_id,
+            {"career_pathways": careers_data.get("career_pathways", {})},
+            False,
+        )
         
-        print(f"[School Background] Careers saved for {roadmap_id}")
+        logger.info("[School Background] Careers saved for %s", roadmap_id)
         
     except Exception as e:
-        print(f"[School Background] Failed: {e}")
\ No newline at end of file
+        logger.warning("[School Background] Failed: %s", e)
+        roadmap_events.publish(roadmap_id, ["career_pathways"], status="failed")
\ No newline at end of file
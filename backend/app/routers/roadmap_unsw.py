@@ -1,8 +1,9 @@
+import logging
 from typing import Any, Dict
 import json
-import time
 
-from app.utils.openai_client import ask_openai
+from app.utils.openai_client import ask_openai_async
+from app.utils.orchestrator import Stage, StageFailed, run_stages
 from .roadmap_common import parse_json_or_500, assert_keys
 from .roadmap_unsw_helpers import (
     fetch_degree_by_identifier,
@@ -12,71 +13,62 @@ from .roadmap_unsw_helpers import (
     fetch_user_specialisation_context,
 )
 
+logger = logging.getLogger(__name__)
+
 # Gathers complete context for UNSW degree roadmap generation.
+# The degree lookup runs first, then related info, core courses and the user's
+# specialisations are fetched in parallel since they only depend on the degree.
 async def gather_unsw_context(user_id: str, req) -> Dict[str, Any]:
 
-    total_start = time.time()
-
-    print(f"Gathering UNSW context for request: {req}")
-
-    # Fetch degree information
-    t1 = time.time()
-    degree = fetch_degree_by_identifier(
-        degree_id=req.degree_id,
-        uac_code=req.uac_code,
-        program_name=req.program_name,
-    )
-
-    print(f"[TIMING] fetch_degree_by_identifier: {time.time() - t1:.1f}s")
-
+    logger.debug("Gathering UNSW context for request: %s", req)
+
+    def load_degree(ctx, results):
+        return fetch_degree_by_identifier(
+            degree_id=req.degree_id,
+            uac_code=req.uac_code,
+            program_name=req.program_name,
+        )
+
+    def load_related(ctx, results):
+        return fetch_degree_related_info(results["degree"].get("id"))
+
+    def load_core_courses(ctx, results):
+        degree_code = results["degree"].get("degree_code")
+        return fetch_program_core_courses(degree_code) if degree_code else []
+
+    def load_specialisations(ctx, results):
+        degree_code = results["degree"].get("degree_code")
+        if not (user_id and degree_code):
+            return {}
+        return fetch_user_specialisation_context(user_id, degree_code)
+
+    stages = [
+        Stage("degree", load_degree, limit="db"),
+        Stage("related", load_related, deps=("degree",), limit="db",
+              required=False, fallback=([], [], [])),
+        Stage("core_courses", load_core_courses, deps=("degree",), limit="db",
+              required=False, fallback=[]),
+        Stage("specialisations", load_specialisations, deps=("degree",), limit="db",
+              required=False, fallback={}),
+    ]
+    run = await run_stages(stages, {}, label="unsw_context")
+
+    degree = run.results["degree"]
     degree_id = degree.get("id")
     degree_code = degree.get("degree_code")
-
-    # Fetch related information
-    t2 = time.time()
-    majors, minors, doubles = fetch_degree_related_info(degree_id)
-    print(f"[TIMING] fetch_degree_related_info: {time.time() - t2:.1f}s")
-
-    # Fetch core courses
-    core_courses = []
-    core_courses_formatted = ""
-
-    # print(f"Degree ID: {degree_id}")
-    # print(f"Degree Code: {degree_code}")
-    # print(f"Program Name: {degree.get('program_name')}")
-    # print(f"Faculty: {degree.get('faculty')}")
-
-    if degree_code:
-        t3 = time.time()
-        core_courses = fetch_program_core_courses(degree_code)
-        print(f"[TIMING] fetch_program_core_courses: {time.time() - t3:.1f}s")
-        if core_courses:
-            t4 = time.time()
-            core_courses_formatted = format_core_courses_for_prompt(core_courses)
-            print(f"[TIMING] format_core_courses_for_prompt: {time.time() - t4:.1f}s")
-
-            # Debug logging
-            # print(f"\n{'='*50}")
-            # print(f"CORE COURSES FOR AI CONTEXT ({len(core_courses)} courses)")
-            # print(f"{'='*50}")
-
-            for c in core_courses[:5]:  # Show first 5
-                overview_preview = (c.get('overview') or '')[:100]
-                print(f"  {c['code']}: {c.get('name')} | {c.get('section')} | {overview_preview}...")
-            if len(core_courses) > 5:
-                print(f"  ... and {len(core_courses) - 5} more courses")
-            print(f"{'='*50}\n")
+    majors, minors, doubles = run.results["related"]
+    core_courses = run.results["core_courses"] or []
+    specialisations = run.results["specialisations"] or {}
+
+    core_courses_formatted = format_core_courses_for_prompt(core_courses) if core_courses else ""
+    if core_courses:
+        for c in core_courses[:5]:  # Show first 5
+            overview_preview = (c.get('overview') or '')[:100]
+            logger.debug("  %s: %s | %s | %s...", c['code'], c.get('name'), c.get('section'), overview_preview)
+        if len(core_courses) > 5:
+            logger.debug("  ... and %s more courses", len(core_courses) - 5)
 
     faculty = degree.get("faculty")
-    
-    specialisations = {}
-    if user_id and degree_code:
-        try:
-            specialisations = fetch_user_specialisation_context(user_id, degree_code)
-            print(f"[TIMING] Fetched specialisations: {specialisations.get('selected_honours_name', 'None')}")
-        except Exception as e:
-            print(f"[ERROR] Failed to fetch specialisations: {e}")
-
 
     # Return complete context
     return {
@@ -152,14 +144,14 @@ async def ai_generate_general_info(context: Dict[str, Any]) -> Dict[str, Any]:
         if selected_honours: selected_list.append(f"Honours: {selected_honours}")
         if selected_major_name: selected_list.append(f"Major: {selected_major_name}")
         if selected_minor_name: selected_list.append(f"Minor: {selected_minor_name}")
-        print(f"[Capstone] Including specialisation courses - {', '.join(selected_list)}")
+        logger.debug("[Capstone] Including specialisation courses - %s", ', '.join(selected_list))
     else:
-        print(f"[Capstone] No specialisations selected, using core courses only")
+        logger.debug("[Capstone] No specialisations selected, using core courses only")
         
 
     # Token monitoring
     prompt_est_tokens = len(core_courses_text) // 4
-    print(f"Stage 1 prompt size: ~{prompt_est_tokens} tokens")
+    logger.debug("Stage 1 prompt size: ~%s tokens", prompt_est_tokens)
 
     # Build AI prompt for general info
     prompt = f"""You are a UNSW academic advisor. Using official UNSW sources (Handbook, progression plans, etc.), provide comprehensive information for {program_name} ({uac_code}).
@@ -230,8 +222,8 @@ async def ai_generate_general_info(context: Dict[str, Any]) -> Dict[str, Any]:
 CRITICAL FOR CAPSTONE: You MUST use the core courses list provided to identify actual capstone/thesis courses from this program. Only list courses that appear in the core courses section above.
 """
 
-    print("Stage 1: Generating general program information...")
-    raw = ask_openai(prompt)
+    logger.debug("Stage 1: Generating general program information...")
+    raw = await ask_openai_async(prompt)
     draft = parse_json_or_500(raw)
 
     # Validate structure
@@ -260,12 +252,12 @@ CRITICAL FOR CAPSTONE: You MUST use the core courses list provided to identify a
             draft["capstone"]["highlights"] = (
                 "No dedicated capstone or signature course was identified among the program's courses."
             )
-            print("Capstone validation: No valid courses found")
+            logger.debug("Capstone validation: No valid courses found")
         else:
             draft["capstone"]["courses"] = validated_capstone
             source = 'core + specialisation' if has_any_specialisation else 'core only'
-            print(f"Capstone validation: {len(validated_capstone)} courses validated from {source}")
-    print("Stage 1: General program information generated successfully")
+            logger.debug("Capstone validation: %s courses validated from %s", len(validated_capstone), source)
+    logger.info("Stage 1: General program information generated successfully")
     return draft
 
 # Stage 2: Return hardcoded honours information based on faculty.
@@ -273,7 +265,7 @@ async def ai_generate_honours_info(context: Dict[str, Any]) -> Dict[str, Any]:
 
     faculty = context.get("faculty", "").lower()
     
-    print(f"Stage 2: Fetching hardcoded honours for faculty: {faculty}")
+    logger.debug("Stage 2: Fetching hardcoded honours for faculty: %s", faculty)
     
     # Hardcoded honours structures
     HONOURS_DATA = {
@@ -331,33 +323,22 @@ async def ai_generate_honours_info(context: Dict[str, Any]) -> Dict[str, Any]:
     # Determine which honours structure to use
     if "business" in faculty or "commerce" in faculty or "economics" in faculty:
         honours_data = HONOURS_DATA["business"]
-        print("Stage 2: Using Business honours structure")
+        logger.debug("Stage 2: Using Business honours structure")
     elif "engineering" in faculty:
         honours_data = HONOURS_DATA["engineering"]
-        print("Stage 2: Using Engineering honours structure")
+        logger.debug("Stage 2: Using Engineering honours structure")
     else:
         honours_data = HONOURS_DATA["general"]
-        print(f"Stage 2: Using General honours structure (no specific match for '{faculty}')")
+        logger.debug("Stage 2: Using General honours structure (no specific match for '%s')", faculty)
     
-    print("Stage 2: Honours information retrieved instantly (hardcoded)")
+    logger.debug("Stage 2: Honours information retrieved instantly (hardcoded)")
     return {"honours": honours_data}
 
 
 # Generate complete roadmap payload using PARALLEL two-stage AI generation.
-# Both sections will run concurrently using threads
+# Both stages run concurrently on the event loop via the stage orchestrator
 async def ai_generate_unsw_payload(context: Dict[str, Any]) -> Dict[str, Any]:
 
-    import asyncio
-    import time
-    from concurrent.futures import ThreadPoolExecutor
-    
-    total_start = time.time()
-
-    # print("Starting PARALLEL two-stage AI generation for degree")
-    # print(f"Program: {context.get('program_name')}")
-    # print(f"Degree code: {context.get('degree_code')}")
-    # print(f"Core courses in context: {len(context.get('core_courses', []))}")
-
     # Fallback honours structure
     fallback_honours = {
         "honours": {
@@ -373,48 +354,25 @@ async def ai_generate_unsw_payload(context: Dict[str, Any]) -> Dict[str, Any]:
         }
     }
 
-    # Wrapper functions with timing
-    def run_general():
-        start = time.time()
-        print(f"[Stage 1] STARTED at {start:.1f}")
-        result = asyncio.run(ai_generate_general_info(context))
-        elapsed = time.time() - start
-        print(f"[Stage 1] COMPLETED in {elapsed:.1f}s")
-        return result
-    
-    def run_honours():
-        start = time.time()
-        print(f"[Stage 2] STARTED at {start:.1f}")
-        result = asyncio.run(ai_generate_honours_info(context))
-        elapsed = time.time() - start
-        print(f"[Stage 2] COMPLETED in {elapsed:.1f}s")
-        return result
-
-    # Run both AI calls in parallel using ThreadPoolExecutor
-    loop = asyncio.get_event_loop()
-    
-    with ThreadPoolExecutor(max_workers=2) as executor:
-        general_future = loop.run_in_executor(executor, run_general)
-        honours_future = loop.run_in_executor(executor, run_honours)
-        
-        # Wait for both to complete
-        try:
-            general_info = await general_future
-        except Exception as e:
-            print(f"Stage 1 failed: {e}")
-            raise Exception("Failed to generate general program information")
-        
-        try:
-            honours_info = await honours_future
-        except Exception as e:
-            print(f"Stage 2 failed: {e}")
-            honours_info = fallback_honours
-
-    # Debugging
-    # total_elapsed = time.time() - total_start
-    # print(f"\n{'='*50}")
-    # print(f"TOTAL PARALLEL GENERATION TIME: {total_elapsed:.1f}s")
-    # print(f"{'='*50}\n")
+    async def run_general(ctx, results):
+        return await ai_generate_general_info(ctx)
+
+    async def run_honours(ctx, results):
+        return await ai_generate_honours_info(ctx)
+
+    stages = [
+        Stage("general", run_general, limit="llm"),
+        Stage("honours", run_honours, required=False, fallback=fallback_honours),
+    ]
+
+    try:
+        run = await run_stages(stages, context, label="unsw_payload")
+    except StageFailed as e:
+        logger.warning("Stage 1 failed: %s", e.error)
+        raise Exception("Failed to generate general program information")
+
+    general_info = run.results["general"]
+    honours_info = run.results["honours"]
 
     # Combine both stages into ONE payload
     payload = {
@@ -434,5 +392,5 @@ async def ai_generate_unsw_payload(context: Dict[str, Any]) -> Dict[str, Any]:
         "selected_minor_courses": context.get("selected_minor_courses", []),
     }
 
-    print("Parallel two-stage generation complete!")
+    logger.info("Parallel two-stage generation complete!")
     return payload
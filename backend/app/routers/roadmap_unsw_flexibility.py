@@ -1,16 +1,18 @@
 # Handles generation of flexibility section in unsw roadmap
 
-from typing import Any, Dict, List
+import logging
+from typing import Any, Dict, List, Optional
 import json
-import asyncio
-import time
-from datetime import datetime
 from app.utils.database import supabase
-from app.utils.openai_client import ask_openai
-from .roadmap_common import parse_json_or_500, assert_keys
+from app.utils.openai_client import ask_openai_async
+from app.utils.orchestrator import Stage, run_stages
+from app.utils.roadmap_events import roadmap_events
+from .roadmap_common import parse_json_or_500, assert_keys, merge_roadmap_payload
 from .roadmap_unsw_helpers import format_candidates_for_ai
 from .flexibility_filtering import pre_filter_similar_degrees
 
+logger = logging.getLogger(__name__)
+
 # Function to prevent error of AI dropping the degree id field at times
 def merge_degree_ids(draft: Dict[str, Any], selected_degrees: List[Dict[str, Any]]) -> Dict[str, Any]:
     for recommendation in draft.get("easy_switches", []):
@@ -37,35 +39,23 @@ def merge_degree_ids(draft: Dict[str, Any], selected_degrees: List[Dict[str, Any
     return draft
 
 
-# AI call function to generate flexibility section
-async def ai_generate_flexibility_info(context: Dict[str, Any]) -> Dict[str, Any]:
-
-    degree_id = context.get("degree_id")
-    program_name = context.get("program_name")
-    faculty = context.get("faculty", "Not specified")
-    
-    # Extract specialization context  
+# Collect the student's specialisation names / course codes from the context
+def _specialisation_inputs(context: Dict[str, Any]):
     selected_honours_name = context.get("selected_honours_name")
     selected_major_name = context.get("selected_major_name")
     selected_minor_name = context.get("selected_minor_name")
     selected_honours_courses = context.get("selected_honours_courses", [])
     selected_major_courses = context.get("selected_major_courses", [])
     selected_minor_courses = context.get("selected_minor_courses", [])
-    
+
     # Combine all specialization course codes
     spec_course_codes = list(set(
         selected_honours_courses + selected_major_courses + selected_minor_courses
     ))
-    
+
     # Build list of specialization names
-    spec_names = []
-    if selected_honours_name:
-        spec_names.append(selected_honours_name)
-    if selected_major_name:
-        spec_names.append(selected_major_name)
-    if selected_minor_name:
-        spec_names.append(selected_minor_name)
-    
+    spec_names = [n for n in (selected_honours_name, selected_major_name, selected_minor_name) if n]
+
     # Build human-readable specialization context
     spec_display = []
     if selected_honours_name:
@@ -74,25 +64,38 @@ async def ai_generate_flexibility_info(context: Dict[str, Any]) -> Dict[str, Any
         spec_display.append(f"Major: {selected_major_name}")
     if selected_minor_name:
         spec_display.append(f"Minor: {selected_minor_name}")
-    
+
     spec_context_str = ", ".join(spec_display) if spec_display else "None selected"
+    return spec_course_codes, spec_names, spec_context_str
+
 
+# Pre-filter stage: find the top similar degrees (sync, DB bound)
+def find_flexibility_candidates(context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    degree_id = context.get("degree_id")
     if not degree_id:
         raise Exception("degree_id required in context for flexibility generation")
 
-    print("Starting Stage 3: Flexibility generation")  
-    print(f"Student's specializations: {spec_context_str}")  
+    spec_course_codes, spec_names, _ = _specialisation_inputs(context)
+    return pre_filter_similar_degrees(
+        degree_id,
+        final_limit=15,
+        current_spec_course_codes=spec_course_codes if spec_course_codes else None,
+        current_spec_names=spec_names if spec_names else None,
+    )
 
-    # Pre-filter to get top similar degrees (NOW WITH SPEC NAMES!)
-    try:
-        top_degrees = await pre_filter_similar_degrees(
-            degree_id, 
-            final_limit=15,
-            current_spec_course_codes=spec_course_codes if spec_course_codes else None,
-            current_spec_names=spec_names if spec_names else None  # NEW parameter
-        )
-    except Exception as e:
-        print(f"ERROR: Pre-filtering failed: {e}")
+
+# AI call function to generate flexibility section from the pre-filtered candidates.
+# top_degrees is None when the pre-filter stage failed.
+async def ai_generate_flexibility_info(context: Dict[str, Any], top_degrees: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+
+    program_name = context.get("program_name")
+    faculty = context.get("faculty", "Not specified")
+    _, _, spec_context_str = _specialisation_inputs(context)
+
+    logger.debug("Starting Stage 3: Flexibility generation")  
+    logger.debug("Student's specializations: %s", spec_context_str)  
+
+    if top_degrees is None:
         return {
             "flexibility_detailed": {
                 "easy_switches": [],
@@ -101,7 +104,7 @@ async def ai_generate_flexibility_info(context: Dict[str, Any]) -> Dict[str, Any
         }
 
     if not top_degrees:
-        print("No similar degrees found")
+        logger.debug("No similar degrees found")
         return {
             "flexibility_detailed": {
                 "easy_switches": [],
@@ -114,10 +117,10 @@ async def ai_generate_flexibility_info(context: Dict[str, Any]) -> Dict[str, Any
 
     # Calculate token estimate
     prompt_tokens = (len(program_name) + len(candidates_text)) // 4
-    print(f"Flexibility prompt size: {prompt_tokens} tokens")
+    logger.debug("Flexibility prompt size: %s tokens", prompt_tokens)
 
     # Stage 3a to get degree ranking
-    print("Stage 3a: Getting AI to rank and select top 5 degrees...")
+    logger.debug("Stage 3a: Getting AI to rank and select top 5 degrees...")
     
     ranking_prompt = f"""You are a UNSW academic advisor. A student is in {program_name} (Faculty: {faculty}).
 
@@ -160,8 +163,8 @@ async def ai_generate_flexibility_info(context: Dict[str, Any]) -> Dict[str, Any
     }}"""
     
     try:
-        ranking_raw = ask_openai(ranking_prompt)
-        print(f"Stage 3a response received: {len(ranking_raw)} characters")
+        ranking_raw = await ask_openai_async(ranking_prompt)
+        logger.debug("Stage 3a response received: %s characters", len(ranking_raw))
 
         # Clean and parse ranking response
         ranking_stripped = ranking_raw.strip()
@@ -177,7 +180,7 @@ async def ai_generate_flexibility_info(context: Dict[str, Any]) -> Dict[str, Any
         assert_keys(ranking_result, ["top_5_programs"], "ranking")
 
         top_5_selections = ranking_result["top_5_programs"]
-        print(f"Stage 3a complete: Top 5 selected")
+        logger.info("Stage 3a complete: Top 5 selected")
         
         # Match selected programs and attach specialization info from AI ranking
         selected_degrees = []
@@ -206,11 +209,11 @@ async def ai_generate_flexibility_info(context: Dict[str, Any]) -> Dict[str, Any
                         }
                     
                     selected_degrees.append(matched_degree)
-                    print(f"  ✓ {program_name_sel}" + (f" + {ai_spec_name} ({ai_spec_type})" if ai_spec_name else ""))
+                    logger.debug("  ✓ %s%s", program_name_sel, f" + {ai_spec_name} ({ai_spec_type})" if ai_spec_name else "")
                     break
         
         if not selected_degrees:
-            print("No degrees matched AI selection")
+            logger.debug("No degrees matched AI selection")
             return {
                 "flexibility_detailed": {
                     "easy_switches": [],
@@ -219,7 +222,7 @@ async def ai_generate_flexibility_info(context: Dict[str, Any]) -> Dict[str, Any
             }
 
         # STage 3b to get detailed recommendations for the top 5 selected degrees
-        print(f"Stage 3b: Generating detailed recommendations for {len(selected_degrees)} degrees...")
+        logger.debug("Stage 3b: Generating detailed recommendations for %s degrees...", len(selected_degrees))
         
         # Format only the selected 5 degrees
         selected_text = format_candidates_for_ai(selected_degrees)
@@ -278,8 +281,8 @@ async def ai_generate_flexibility_info(context: Dict[str, Any]) -> Dict[str, Any
         Keep responses CONCISE. When a specialization is recommended, naturally explain why it complements the student's current path. 
         """
 
-        detail_raw = ask_openai(detail_prompt)
-        print(f"Stage 3b response received: {len(detail_raw)} characters")
+        detail_raw = await ask_openai_async(detail_prompt)
+        logger.debug("Stage 3b response received: %s characters", len(detail_raw))
 
         # Clean response - extract JSON
         detail_stripped = detail_raw.strip()
@@ -288,16 +291,16 @@ async def ai_generate_flexibility_info(context: Dict[str, Any]) -> Dict[str, Any
 
         if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
             json_only = detail_stripped[first_brace:last_brace + 1]
-            print(f"Extracted JSON from position {first_brace} to {last_brace + 1}")
+            logger.debug("Extracted JSON from position %s to %s", first_brace, last_brace + 1)
         else:
             json_only = detail_stripped
-            print("No JSON extraction needed")
+            logger.debug("No JSON extraction needed")
 
         # multi-stage JSON parse
         try:
             draft = parse_json_or_500(json_only)
         except Exception as e:
-            print(f"[Flexibility JSON Parse] Primary parse failed: {e}")
+            logger.warning("[Flexibility JSON Parse] Primary parse failed: %s", e)
             import re
 
             # Basic cleanup
@@ -320,9 +323,9 @@ async def ai_generate_flexibility_info(context: Dict[str, Any]) -> Dict[str, Any
             # Try parsing again
             try:
                 draft = json.loads(cleaned)
-                print("Fallback parse succeeded after auto-repair")
+                logger.debug("Fallback parse succeeded after auto-repair")
             except Exception as e2:
-                print(f"Fallback failed: {e2}")
+                logger.warning("Fallback failed: %s", e2)
                 draft = {"easy_switches": [], "error": "Malformed or truncated JSON"}
 
         # Guarantee schema key exists
@@ -331,7 +334,7 @@ async def ai_generate_flexibility_info(context: Dict[str, Any]) -> Dict[str, Any
         assert_keys(draft, ["easy_switches"], "flexibility")
 
         if not draft.get("easy_switches"):
-            print("AI returned empty recommendations")
+            logger.debug("AI returned empty recommendations")
             return {
                 "flexibility_detailed": {
                     "easy_switches": [],
@@ -342,14 +345,14 @@ async def ai_generate_flexibility_info(context: Dict[str, Any]) -> Dict[str, Any
         # Merge degree IDs back into recommendations 
         draft = merge_degree_ids(draft, selected_degrees)
 
-        print(f"Stage 3b complete: {len(draft['easy_switches'])} detailed recommendations generated")
+        logger.info("Stage 3b complete: %s detailed recommendations generated", len(draft['easy_switches']))
 
         return {
             "flexibility_detailed": draft
         }
 
     except Exception as e:
-        print(f"Stage 3 error: {type(e).__name__}: {e}")
+        logger.warning("Stage 3 error: %s: %s", type(e).__name__, e)
         return {
             "flexibility_detailed": {
                 "easy_switches": [],
@@ -358,34 +361,28 @@ async def ai_generate_flexibility_info(context: Dict[str, Any]) -> Dict[str, Any
         }
 
 
-# Async wrapper that schedules flexibility generation in background thread
+# Flexibility pipeline: context -> pre-filter -> AI ranking/details -> save.
+# DB stages run in the shared executor, the AI stage on the event loop.
 async def generate_and_update_flexibility(roadmap_id: str, roadmap_data: dict):
-    loop = asyncio.get_event_loop()
-    await loop.run_in_executor(None, _generate_and_update_flexibility_sync, roadmap_id, roadmap_data)
 
+    logger.info("Started for roadmap: %s", roadmap_id)
 
-# Performs pre-filtering, AI generation, and saves flexibility data to database.
-def _generate_and_update_flexibility_sync(roadmap_id: str, roadmap_data: dict):
-
-    start = time.time()
-    print(f"Started for roadmap: {roadmap_id}")
-
-    try:
-        # Build context
+    def build_context(ctx, results):
+        payload = roadmap_data.get("payload", {})
         context = {
             "degree_id": roadmap_data.get("degree_id"),
             "program_name": roadmap_data.get("program_name"),
-            "faculty": roadmap_data.get("payload", {}).get("faculty"),
-            "selected_honours_name": roadmap_data.get("payload", {}).get("selected_honours_name"),
-            "selected_honours_courses": roadmap_data.get("payload", {}).get("selected_honours_courses", []),
-            "selected_major_name": roadmap_data.get("payload", {}).get("selected_major_name"),
-            "selected_major_courses": roadmap_data.get("payload", {}).get("selected_major_courses", []),
-            "selected_minor_name": roadmap_data.get("payload", {}).get("selected_minor_name"),
-            "selected_minor_courses": roadmap_data.get("payload", {}).get("selected_minor_courses", []),
+            "faculty": payload.get("faculty"),
+            "selected_honours_name": payload.get("selected_honours_name"),
+            "selected_honours_courses": payload.get("selected_honours_courses", []),
+            "selected_major_name": payload.get("selected_major_name"),
+            "selected_major_courses": payload.get("selected_major_courses", []),
+            "selected_minor_name": payload.get("selected_minor_name"),
+            "selected_minor_courses": payload.get("selected_minor_courses", []),
         }
 
         if not context["faculty"] and context["degree_id"]:
-            print("Faculty not found in payload — fetching from unsw_degrees_final table...")
+            logger.debug("Faculty not found in payload — fetching from unsw_degrees_final table...")
             degree_row = (
                 supabase.from_("unsw_degrees_final")
                 .select("faculty")
@@ -395,36 +392,28 @@ def _generate_and_update_flexibility_sync(roadmap_id: str, roadmap_data: dict):
             )
             if degree_row and degree_row.data:
                 context["faculty"] = degree_row.data.get("faculty")
+        return context
 
-        print(f"Flexibility context built: {json.dumps(context, indent=2)}")
-
-        # Generate flexibility recommendations
-        flexibility = asyncio.run(ai_generate_flexibility_info(context))
-
-        # Load LATEST payload from database (preserve other background tasks' work)
-        latest = supabase.from_("unsw_roadmap").select("payload").eq("id", roadmap_id).single().execute()
-        payload = latest.data.get("payload", {}) if latest.data else {}
-
-        # Merge only flexibility data
-        payload.update(flexibility)
-
-        # Save back to database
-        update_response = (
-            supabase.from_("unsw_roadmap")
-            .update({
-                "payload": payload,
-                "updated_at": datetime.utcnow().isoformat()
-            })
-            .eq("id", roadmap_id)
-            .execute()
-        )
-
-        print(f"[Flexibility Thread] Update complete for {roadmap_id} "
-              f"({time.time() - start:.1f}s elapsed)")
-        if update_response.data:
-            print(json.dumps(update_response.data, indent=2))
-        else:
-            print("Empty update response")
+    def candidates(ctx, results):
+        return find_flexibility_candidates(results["context"])
+
+    async def flexibility(ctx, results):
+        return await ai_generate_flexibility_info(results["context"], results["candidates"])
 
+    # Merge only flexibility data into the LATEST payload (preserve other sections)
+    def save(ctx, results):
+        merge_roadmap_payload("unsw_roadmap", roadmap_id, results["flexibility"])
+
+    stages = [
+        Stage("context", build_context, limit="db"),
+        Stage("candidates", candidates, deps=("context",), limit="db", required=False),
+        Stage("flexibility", flexibility, deps=("context", "candidates"), limit="llm"),
+        Stage("save", save, deps=("flexibility",), limit="db"),
+    ]
+
+    try:
+        await run_stages(stages, {}, label=f"flexibility {roadmap_id}")
+        logger.info("[Flexibility] Update complete for %s", roadmap_id)
     except Exception as e:
-        print(f"Flexibility section error for roadmap {roadmap_id}: {e}")
\ No newline at end of file
+        logger.warning("Flexibility section error for roadmap %s: %s", roadmap_id, e)
+        roadmap_events.publish(roadmap_id, ["flexibility_detailed"], status="failed")
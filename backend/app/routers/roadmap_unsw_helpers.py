@@ -1,7 +1,10 @@
+import logging
 from typing import Any, Dict, List
 from app.utils.database import supabase
 import json
 
+logger = logging.getLogger(__name__)
+
 
 CORE_COURSE_KEYWORDS = [
     "core",
@@ -21,7 +24,7 @@ CORE_COURSE_KEYWORDS = [
 # Helper functions for Capstone (Program Highlights section) in roadmap unsw
 def fetch_program_core_courses(degree_code: str) -> List[Dict[str, Any]]:
     if not degree_code:
-        print("Missing degree_code in fetch_program_core_courses.")
+        logger.debug("Missing degree_code in fetch_program_core_courses.")
         return []
     try:
         result = (
@@ -32,7 +35,7 @@ def fetch_program_core_courses(degree_code: str) -> List[Dict[str, Any]]:
             .execute()
         )
         if not result.data or not result.data[0].get("sections"):
-            print(f"No sections found for degree_code {degree_code}")
+            logger.debug("No sections found for degree_code %s", degree_code)
             return []
 
         if not result.data:
@@ -42,7 +45,7 @@ def fetch_program_core_courses(degree_code: str) -> List[Dict[str, Any]]:
         core_courses = extract_core_courses_from_sections(sections)
         return enrich_courses_with_db_details(core_courses)
     except Exception as e:
-        print(f"fetch_program_core_courses failed for {degree_code}: {e}")
+        logger.warning("fetch_program_core_courses failed for %s: %s", degree_code, e)
         return []
     
 
@@ -58,7 +61,7 @@ def parse_sections_json(sections_data) -> list:
             sections = sections_data
         return sections if isinstance(sections, list) else []
     except (json.JSONDecodeError, TypeError, AttributeError) as e:
-        print(f"Error parsing sections JSON: {e}")
+        logger.warning("Error parsing sections JSON: %s", e)
         return []
     
 def extract_core_courses_from_sections(sections: list) -> List[Dict[str, Any]]:
@@ -104,7 +107,7 @@ def enrich_courses_with_db_details(courses: List[Dict[str, Any]]) -> List[Dict[s
                     "study_level": d.get("study_level", ""),
                 })
     except Exception as e:
-        print(f"Error enriching course details: {e}")
+        logger.warning("Error enriching course details: %s", e)
     return courses
 
 
@@ -183,10 +186,10 @@ def fetch_degree_by_identifier(degree_id=None, uac_code=None, program_name=None)
                 degree = getattr(result, "data", None)
 
     except Exception as e:
-        print(f"Error fetching degree: {e}")
+        logger.warning("Error fetching degree: %s", e)
 
     if not degree:
-        print(f"No degree found for id={degree_id}, uac={uac_code}, name={program_name}")
+        logger.debug("No degree found for id=%s, uac=%s, name=%s", degree_id, uac_code, program_name)
         return {
             "id": degree_id,
             "program_name": program_name,
@@ -222,7 +225,7 @@ def fetch_degree_related_info(degree_id: str):
         d = supabase.from_("degree_double_degrees").select("program_name").eq("degree_id", degree_id).execute()
         doubles = [r["program_name"] for r in (d.data or []) if r.get("program_name")]
     except Exception as e:
-        print(f"Error fetching related degree info: {e}")
+        logger.warning("Error fetching related degree info: %s", e)
     return majors, minors, doubles
 
 
@@ -366,7 +369,7 @@ def fetch_user_specialisation_context(user_id: str, degree_code: str) -> Dict[st
         return result
 
     except Exception as e:
-        print(f"[fetch_user_specialisation_context] Error: {e}")
+        logger.warning("[fetch_user_specialisation_context] Error: %s", e)
         return {
             "selected_major_name": None,
             "selected_major_courses": [],
@@ -431,7 +434,7 @@ def extract_core_course_codes_from_sections(sections_data) -> List[str]:
         return core_course_codes
     
     except Exception as e:
-        print(f"[extract_core_courses_from_sections] Error: {e}")
+        logger.warning("[extract_core_courses_from_sections] Error: %s", e)
         return []
     
 
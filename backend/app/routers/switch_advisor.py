@@ -3,17 +3,33 @@
 # Takes the EXISTING /compare endpoint results and sends them to OpenAI for analysis
 # Does NOT duplicate compare logic — receives comparison_data from frontend
 
-import os
+import hashlib
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from openai import OpenAI
+from app.utils.openai_client import get_async_openai
+from app.utils.sse import sse, sse_response
+from app.utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+MODEL = "gpt-4o"
+# Verdicts are cached by a hash of the prompt inputs (what build_context extracts), so
+# re-opening the same base/target pair with the same progress is instant
+VERDICT_CACHE_TTL_SECONDS = 24 * 3600
+VERDICT_CACHE_MAX = 2000
+
+_verdicts: "OrderedDict[str, tuple]" = OrderedDict()
+_verdicts_lock = threading.Lock()
+
+# Field order the model is asked to write in; streaming emits each field as it completes
+FIELDS = ["verdict", "verdict_label", "summary", "key_insights", "pros", "cons", "action_steps", "detailed_analysis"]
 
 
 # ─── Request / Response Models ───────────────────────────────────
@@ -38,7 +54,7 @@ class SwitchAdvisorResponse(BaseModel):
     detailed_analysis: str  # 2-3 paragraph deep dive
 
 
-# ─── Endpoint ────────────────────────────────────────────────────
+# ─── Endpoints ───────────────────────────────────────────────────
 
 @router.post("/switch-advisor", response_model=SwitchAdvisorResponse)
 async def get_switch_advice(request: SwitchAdvisorRequest):
@@ -49,43 +65,176 @@ async def get_switch_advice(request: SwitchAdvisorRequest):
     a natural language analysis and recommendation.
     """
     try:
-        comparison = request.comparison_data
+        context = build_context(request.comparison_data)
+        key = verdict_cache_key(context)
+        result = get_cached_verdict(key)
+        if result is None:
+            async for _ in stream_verdict(context, key):
+                pass
+            result = get_cached_verdict(key)
+        return SwitchAdvisorResponse(**result)
+
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse OpenAI response: {e}")
+        raise HTTPException(status_code=500, detail="Failed to parse AI response")
+    except Exception as e:
+        logger.error(f"Switch advisor error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# SSE version: one "field" event per verdict field as soon as the model has written it
+# (verdict and summary first, detailed_analysis last), then "done" with the full verdict
+@router.post("/switch-advisor/stream")
+async def stream_switch_advice(request: SwitchAdvisorRequest):
+    context = build_context(request.comparison_data)
+    key = verdict_cache_key(context)
+
+    async def event_generator():
+        cached = get_cached_verdict(key)
+        if cached is not None:
+            for name in FIELDS:
+                yield sse({"type": "field", "name": name, "value": cached[name]})
+            yield sse({"type": "done", "cached": True, **cached})
+            return
+
+        try:
+            # Fields arrive continuously once the model starts, so no keep-alive is needed
+            async for name, value in stream_verdict(context, key):
+                yield sse({"type": "field", "name": name, "value": value})
+        except json.JSONDecodeError as e:
+            logger.error("Failed to parse OpenAI response: %s", e)
+            yield sse({"type": "error", "detail": "Failed to parse AI response"})
+            return
+        except Exception as e:
+            logger.error("Switch advisor error: %s", e)
+            yield sse({"type": "error", "detail": str(e)})
+            return
+        yield sse({"type": "done", "cached": False, **get_cached_verdict(key)})
+
+    return sse_response(event_generator())
+
+
+# ─── Verdict generation & cache ──────────────────────────────────
+
+def verdict_cache_key(context: dict) -> str:
+    # The prompts are derived from context alone; the system prompt and model are
+    # included so editing either invalidates old verdicts
+    payload = json.dumps(
+        {"model": MODEL, "system": build_system_prompt(), "context": context},
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_verdict(key: str):
+    with _verdicts_lock:
+        entry = _verdicts.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > VERDICT_CACHE_TTL_SECONDS:
+            del _verdicts[key]
+            return None
+        _verdicts.move_to_end(key)
+        return result
 
-        context = build_context(comparison)
-        system_prompt = build_system_prompt()
-        user_prompt = build_user_prompt(context)
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
+def _store_verdict(key: str, result: dict):
+    with _verdicts_lock:
+        _verdicts[key] = (time.monotonic(), result)
+        _verdicts.move_to_end(key)
+        while len(_verdicts) > VERDICT_CACHE_MAX:
+            _verdicts.popitem(last=False)
+
+
+def normalise_verdict(result: dict) -> dict:
+    return {
+        "verdict": result.get("verdict", "conditional"),
+        "verdict_label": result.get("verdict_label", "Review Needed"),
+        "summary": result.get("summary", ""),
+        "key_insights": result.get("key_insights", []),
+        "pros": result.get("pros", []),
+        "cons": result.get("cons", []),
+        "action_steps": result.get("action_steps", []),
+        "detailed_analysis": result.get("detailed_analysis", ""),
+    }
+
+
+class _FieldParser:
+    """Incremental parser for the model's JSON object: returns top-level members once complete."""
+
+    def __init__(self):
+        self.text = ""
+        self.pos = None  # just after "{" or the last complete member
+        self.decoder = json.JSONDecoder()
+
+    def _skip(self, i: int, chars: str) -> int:
+        while i < len(self.text) and self.text[i] in chars:
+            i += 1
+        return i
+
+    def feed(self, chunk: str) -> list:
+        self.text += chunk
+        if self.pos is None:
+            start = self.text.find("{")
+            if start < 0:
+                return []
+            self.pos = start + 1
+
+        members = []
+        while True:
+            i = self._skip(self.pos, " \t\r\n,")
+            try:
+                name, i = self.decoder.raw_decode(self.text, i)
+                i = self._skip(i, " \t\r\n")
+                if i >= len(self.text) or self.text[i] != ":":
+                    return members
+                i = self._skip(i + 1, " \t\r\n")
+                value, i = self.decoder.raw_decode(self.text, i)
+            except json.JSONDecodeError:
+                # Member not complete yet
+                return members
+            # A number could still be growing; wait until something follows it
+            if not isinstance(value, (str, list, dict, bool)) and value is not None \
+                    and self._skip(i, " \t\r\n") >= len(self.text):
+                return members
+            members.append((name, value))
+            self.pos = i
+
+
+async def stream_verdict(context: dict, key: str):
+    """
+    Stream the verdict from the model, yielding (field, value) pairs as each completes.
+    The full verdict is cached under key once the response is parsed.
+    """
+    parser = _FieldParser()
+    emitted = set()
+    with span("switch_advisor.verdict", kind="llm", model=MODEL):
+        stream = await get_async_openai().chat.completions.create(
+            model=MODEL,
             messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
+                {"role": "system", "content": build_system_prompt()},
+                {"role": "user", "content": build_user_prompt(context)},
             ],
             temperature=0.7,
             max_tokens=2000,
             response_format={"type": "json_object"},
+            stream=True,
         )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            for name, value in parser.feed(chunk.choices[0].delta.content or ""):
+                if name in FIELDS and name not in emitted:
+                    emitted.add(name)
+                    yield name, value
 
-        raw = response.choices[0].message.content
-        result = json.loads(raw)
-
-        return SwitchAdvisorResponse(
-            verdict=result.get("verdict", "conditional"),
-            verdict_label=result.get("verdict_label", "Review Needed"),
-            summary=result.get("summary", ""),
-            key_insights=result.get("key_insights", []),
-            pros=result.get("pros", []),
-            cons=result.get("cons", []),
-            action_steps=result.get("action_steps", []),
-            detailed_analysis=result.get("detailed_analysis", ""),
-        )
-
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse OpenAI response: {e}")
-        raise HTTPException(status_code=500, detail="Failed to parse AI response")
-    except Exception as e:
-        logger.error(f"Switch advisor error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    result = normalise_verdict(json.loads(parser.text))
+    _store_verdict(key, result)
+    # Fields the model left out still reach streaming clients, with their defaults
+    for name in FIELDS:
+        if name not in emitted:
+            yield name, result[name]
 
 
 # ─── Context Builder ─────────────────────────────────────────────
@@ -300,6 +449,7 @@ You must respond in JSON with exactly this structure:
   "action_steps": ["string", ...] (3-5 concrete next steps if they decide to switch),
   "detailed_analysis": "string (2-3 paragraphs with deeper analysis)"
 }
+Write the keys in exactly this order.
 
 CRITICAL NUMBERS RULES:
 - Use the provided COURSE transfer rate as the headline (transfer_rate_courses).
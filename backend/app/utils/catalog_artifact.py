@@ -0,0 +1,429 @@
+# app/utils/catalog_artifact.py
+# Compact, memory-mapped snapshot of the UNSW catalog (degrees, specialisations,
+# courses, parsed sections and prerequisite trees).
+#
+# The build step pulls the catalog tables from Supabase once and writes a single
+# binary file. Every worker then mmaps that file read-only: there is nothing to parse
+# at startup, and all workers on a host share one physical copy through the page
+# cache instead of each holding its own dicts of parsed `sections` JSON.
+#
+# Build:  python -m app.utils.catalog_artifact [--out path]
+#
+# Layout (all integers little-endian u32, NONE = 0xFFFFFFFF):
+#   header    magic, version, then (offset, count) for each block below
+#   strings   count+1 offsets, then one utf-8 blob; every string is stored once
+#   courses   sorted by code -> a course's index is its interned integer id
+#             (code, title, faculty, conditions, uoc, prereq offset)
+#   prereqs   flat u32 stream: type, n, course ids..., n_groups, (n, ids...)...
+#   sections  (title, first ref, ref count)
+#   refs      (course id, uoc, name) - the courses listed inside a section
+#   degrees   sorted by degree_code (code, id, name, faculty, minimum_uoc, first section, n)
+#   specs     sorted by major_code (code, name, type, faculty, first section, n)
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"UVCATLG\0"
+VERSION = 1
+NONE = 0xFFFFFFFF
+
+CATALOG_ARTIFACT_PATH = os.getenv(
+    "CATALOG_ARTIFACT_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "catalog.bin"),
+)
+
+BLOCKS = ("strings", "courses", "prereqs", "sections", "refs", "degrees", "specs")
+HEADER = struct.Struct("<8sI" + "II" * len(BLOCKS))
+U32 = struct.Struct("<I")
+COURSE = struct.Struct("<6I")
+SECTION = struct.Struct("<3I")
+REF = struct.Struct("<3I")
+DEGREE = struct.Struct("<7I")
+SPEC = struct.Struct("<6I")
+
+PREREQ_TYPES = ["none", "single", "or", "and", "mixed"]
+
+
+def _load_sections(raw: Any) -> List[Dict[str, Any]]:
+    if not raw:
+        return []
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except Exception:
+            return []
+    return [s for s in raw if isinstance(s, dict)]
+
+
+def _as_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+class _Strings:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        value = str(value)
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = len(self.values)
+            self.ids[value] = sid
+            self.values.append(value)
+        return sid
+
+    def encode(self) -> bytes:
+        blobs = [v.encode("utf-8") for v in self.values]
+        offsets = [0]
+        for b in blobs:
+            offsets.append(offsets[-1] + len(b))
+        return struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(blobs)
+
+
+def build_catalog_bytes(
+    degrees: Iterable[Dict[str, Any]],
+    specialisations: Iterable[Dict[str, Any]],
+    courses: Iterable[Dict[str, Any]],
+) -> bytes:
+    # Imported here so the loader doesn't pull in the router package
+    from app.routers.compare_programs_helpers import parse_prerequisites
+
+    degrees = sorted((d for d in degrees if d.get("degree_code")), key=lambda d: d["degree_code"])
+    specialisations = sorted((s for s in specialisations if s.get("major_code")), key=lambda s: s["major_code"])
+    course_rows = {c["code"]: c for c in courses if c.get("code")}
+
+    degree_sections = [_load_sections(d.get("sections")) for d in degrees]
+    spec_sections = [_load_sections(s.get("sections")) for s in specialisations]
+    prereq_trees = {code: parse_prerequisites(row.get("conditions_for_enrolment") or "") for code, row in course_rows.items()}
+
+    # Every course code we reference gets an integer id, even ones missing from unsw_courses
+    codes = set(course_rows)
+    for sections in degree_sections + spec_sections:
+        for section in sections:
+            codes.update(c["code"] for c in section.get("courses") or [] if c.get("code"))
+    for tree in prereq_trees.values():
+        codes.update(tree.get("courses", []))
+        for group in tree.get("or_groups", []):
+            codes.update(group)
+    code_list = sorted(codes)
+    course_id = {code: i for i, code in enumerate(code_list)}
+
+    strings = _Strings()
+
+    prereqs: List[int] = []
+    course_block = bytearray()
+    for code in code_list:
+        row = course_rows.get(code, {})
+        tree = prereq_trees.get(code, {"type": "none", "courses": []})
+        offset = len(prereqs)
+        prereqs.append(PREREQ_TYPES.index(tree["type"]))
+        prereqs.append(len(tree["courses"]))
+        prereqs.extend(course_id[c] for c in tree["courses"])
+        groups = tree.get("or_groups", [])
+        prereqs.append(len(groups))
+        for group in groups:
+            prereqs.append(len(group))
+            prereqs.extend(course_id[c] for c in group)
+        course_block += COURSE.pack(
+            strings.intern(code),
+            strings.intern(row.get("title")),
+            strings.intern(row.get("faculty")),
+            strings.intern(row.get("conditions_for_enrolment") or None),
+            _as_int(row.get("uoc")),
+            offset,
+        )
+
+    section_block = bytearray()
+    ref_block = bytearray()
+    section_count = 0
+    ref_count = 0
+
+    def add_sections(sections: List[Dict[str, Any]]) -> int:
+        nonlocal section_count, ref_count
+        first = section_count
+        for section in sections:
+            refs = [c for c in section.get("courses") or [] if c.get("code")]
+            section_block.extend(SECTION.pack(strings.intern(section.get("title")), ref_count, len(refs)))
+            for c in refs:
+                ref_block.extend(REF.pack(course_id[c["code"]], _as_int(c.get("uoc")), strings.intern(c.get("name"))))
+            ref_count += len(refs)
+            section_count += 1
+        return first
+
+    degree_block = bytearray()
+    for degree, sections in zip(degrees, degree_sections):
+        first = add_sections(sections)
+        degree_block += DEGREE.pack(
+            strings.intern(degree["degree_code"]),
+            strings.intern(degree.get("id")),
+            strings.intern(degree.get("program_name")),
+            strings.intern(degree.get("faculty")),
+            _as_int(degree.get("minimum_uoc")),
+            first,
+            len(sections),
+        )
+
+    spec_block = bytearray()
+    for spec, sections in zip(specialisations, spec_sections):
+        first = add_sections(sections)
+        spec_block += SPEC.pack(
+            strings.intern(spec["major_code"]),
+            strings.intern(spec.get("major_name")),
+            strings.intern(spec.get("specialisation_type")),
+            strings.intern(spec.get("faculty")),
+            first,
+            len(sections),
+        )
+
+    blocks = {
+        "strings": (strings.encode(), len(strings.values)),
+        "courses": (bytes(course_block), len(code_list)),
+        "prereqs": (struct.pack(f"<{len(prereqs)}I", *prereqs), len(prereqs)),
+        "sections": (bytes(section_block), section_count),
+        "refs": (bytes(ref_block), ref_count),
+        "degrees": (bytes(degree_block), len(degrees)),
+        "specs": (bytes(spec_block), len(specialisations)),
+    }
+
+    header_fields: List[int] = []
+    body = bytearray()
+    offset = HEADER.size
+    for name in BLOCKS:
+        data, count = blocks[name]
+        header_fields += [offset, count]
+        body += data
+        offset += len(data)
+
+    return HEADER.pack(MAGIC, VERSION, *header_fields) + bytes(body)
+
+
+def fetch_catalog_rows() -> Dict[str, List[Dict[str, Any]]]:
+    from app.utils.database import fetch_all
+
+    return {
+        "degrees": fetch_all("unsw_degrees_final", "id, degree_code, program_name, faculty, minimum_uoc, sections"),
+        "specialisations": fetch_all("unsw_specialisations", "major_code, major_name, specialisation_type, faculty, sections"),
+        "courses": fetch_all("unsw_courses", "code, title, uoc, faculty, conditions_for_enrolment"),
+    }
+
+
+def write_catalog_artifact(path: str = CATALOG_ARTIFACT_PATH) -> int:
+    rows = fetch_catalog_rows()
+    data = build_catalog_bytes(rows["degrees"], rows["specialisations"], rows["courses"])
+    # Write next to the target and rename, so running workers keep their old mapping
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+# ---------------------------------------------------------------------------
+# Load
+# ---------------------------------------------------------------------------
+
+class CatalogArtifact:
+    """Read-only view over a catalog file. Lookups decode straight from the mmap."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mm)
+
+        magic, version, *fields = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a catalog artifact (v{VERSION}): {path}")
+        self._blocks = {name: (fields[2 * i], fields[2 * i + 1]) for i, name in enumerate(BLOCKS)}
+
+        str_offset, str_count = self._blocks["strings"]
+        self._str_offsets = str_offset
+        self._str_blob = str_offset + (str_count + 1) * U32.size
+
+    def close(self):
+        self._buf.release()
+        self._mm.close()
+
+    def prefault(self):
+        """Ask the kernel to read the whole file into the page cache ahead of first lookup."""
+        if hasattr(mmap, "MADV_WILLNEED"):
+            self._mm.madvise(mmap.MADV_WILLNEED)
+
+    def counts(self) -> Dict[str, int]:
+        return {name: count for name, (_, count) in self._blocks.items()}
+
+    # -- primitives --------------------------------------------------------
+
+    def _u32(self, offset: int) -> int:
+        return U32.unpack_from(self._buf, offset)[0]
+
+    def _str(self, sid: int) -> Optional[str]:
+        if sid == NONE:
+            return None
+        start = self._u32(self._str_offsets + sid * U32.size)
+        end = self._u32(self._str_offsets + (sid + 1) * U32.size)
+        return bytes(self._buf[self._str_blob + start:self._str_blob + end]).decode("utf-8")
+
+    def _record(self, block: str, rec: struct.Struct, index: int) -> tuple:
+        offset, _ = self._blocks[block]
+        return rec.unpack_from(self._buf, offset + index * rec.size)
+
+    def _find(self, block: str, rec: struct.Struct, code: str) -> Optional[int]:
+        # Binary search over records sorted by their first field (an interned code)
+        lo, hi = 0, self._blocks[block][1]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_code = self._str(self._record(block, rec, mid)[0])
+            if mid_code < code:
+                lo = mid + 1
+            elif mid_code > code:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def _sections(self, first: int, count: int) -> List[Dict[str, Any]]:
+        sections = []
+        for i in range(first, first + count):
+            title_sid, ref_start, ref_count = self._record("sections", SECTION, i)
+            courses = []
+            for r in range(ref_start, ref_start + ref_count):
+                cid, uoc, name_sid = self._record("refs", REF, r)
+                courses.append({"code": self.course_code(cid), "name": self._str(name_sid), "uoc": uoc})
+            sections.append({"title": self._str(title_sid), "courses": courses})
+        return sections
+
+    # -- courses -----------------------------------------------------------
+
+    def course_id(self, code: str) -> Optional[int]:
+        return self._find("courses", COURSE, code)
+
+    def course_code(self, course_id: int) -> str:
+        return self._str(self._record("courses", COURSE, course_id)[0])
+
+    def course(self, code: str) -> Optional[Dict[str, Any]]:
+        cid = self.course_id(code)
+        if cid is None:
+            return None
+        code_sid, title_sid, faculty_sid, cond_sid, uoc, _ = self._record("courses", COURSE, cid)
+        return {
+            "code": code,
+            "title": self._str(title_sid),
+            "uoc": uoc,
+            "faculty": self._str(faculty_sid),
+            "conditions_for_enrolment": self._str(cond_sid) or "",
+        }
+
+    def course_conditions(self) -> Iterable[tuple]:
+        """(code, conditions text) for every course that has conditions."""
+        for cid in range(self._blocks["courses"][1]):
+            code_sid, _, _, cond_sid, _, _ = self._record("courses", COURSE, cid)
+            if cond_sid != NONE:
+                yield self._str(code_sid), self._str(cond_sid)
+
+    def prerequisites(self, code: str) -> Dict[str, Any]:
+        """Pre-parsed prerequisite tree, same shape as parse_prerequisites()."""
+        cid = self.course_id(code)
+        if cid is None:
+            return {"type": "none", "courses": []}
+        prereq_offset, _ = self._blocks["prereqs"]
+        pos = prereq_offset + self._record("courses", COURSE, cid)[5] * U32.size
+
+        def take() -> int:
+            nonlocal pos
+            value = self._u32(pos)
+            pos += U32.size
+            return value
+
+        kind = PREREQ_TYPES[take()]
+        courses = [self.course_code(take()) for _ in range(take())]
+        groups = [[self.course_code(take()) for _ in range(take())] for _ in range(take())]
+        tree: Dict[str, Any] = {"type": kind, "courses": courses}
+        if kind == "mixed":
+            tree["or_groups"] = groups
+        return tree
+
+    # -- programs ----------------------------------------------------------
+
+    def degree(self, degree_code: str) -> Optional[Dict[str, Any]]:
+        index = self._find("degrees", DEGREE, degree_code)
+        if index is None:
+            return None
+        _, id_sid, name_sid, faculty_sid, minimum_uoc, first, count = self._record("degrees", DEGREE, index)
+        return {
+            "id": self._str(id_sid),
+            "degree_code": degree_code,
+            "program_name": self._str(name_sid),
+            "faculty": self._str(faculty_sid),
+            "minimum_uoc": minimum_uoc,
+            "sections": self._sections(first, count),
+        }
+
+    def degree_course_codes(self, degree_code: str) -> Optional[List[str]]:
+        degree = self.degree(degree_code)
+        if degree is None:
+            return None
+        return [c["code"] for s in degree["sections"] for c in s["courses"]]
+
+    def specialisation(self, major_code: str) -> Optional[Dict[str, Any]]:
+        index = self._find("specs", SPEC, major_code)
+        if index is None:
+            return None
+        _, name_sid, type_sid, faculty_sid, first, count = self._record("specs", SPEC, index)
+        return {
+            "major_code": major_code,
+            "major_name": self._str(name_sid),
+            "specialisation_type": self._str(type_sid),
+            "faculty": self._str(faculty_sid),
+            "sections": self._sections(first, count),
+        }
+
+
+_catalog: Optional[CatalogArtifact] = None
+_catalog_checked = False
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> Optional[CatalogArtifact]:
+    """The shared catalog artifact, or None if it hasn't been built (callers fall back to Supabase)."""
+    global _catalog, _catalog_checked
+    if _catalog_checked:
+        return _catalog
+    with _catalog_lock:
+        if not _catalog_checked:
+            try:
+                _catalog = CatalogArtifact(CATALOG_ARTIFACT_PATH)
+                logger.info("Mapped catalog %s: %s", CATALOG_ARTIFACT_PATH, _catalog.counts())
+            except FileNotFoundError:
+                _catalog = None
+            except Exception as e:
+                logger.warning("Could not load catalog %s: %s", CATALOG_ARTIFACT_PATH, e)
+                _catalog = None
+            _catalog_checked = True
+    return _catalog
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the memory-mapped catalog artifact")
+    parser.add_argument("--out", default=CATALOG_ARTIFACT_PATH)
+    args = parser.parse_args()
+    size = write_catalog_artifact(args.out)
+    print(f"✅ Wrote {args.out} ({size / 1024:.1f} KB)")
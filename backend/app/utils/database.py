@@ -1,7 +1,29 @@
 from supabase import Client, create_client
 from app.config import SUPABASE_URL, SUPABASE_ROLE_KEY
+from app.utils.tracing import instrument_httpx_client
 
 if not all([SUPABASE_ROLE_KEY, SUPABASE_URL]):
     raise EnvironmentError("One or more Supabase Env Variables are missing")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_ROLE_KEY)
\ No newline at end of file
+supabase: Client = create_client(SUPABASE_URL, SUPABASE_ROLE_KEY)
+
+# Every query becomes a "db" span under the current request
+instrument_httpx_client(supabase.postgrest.session, "db")
+instrument_httpx_client(getattr(supabase.auth, "_http_client", None), "http")
+
+PAGE_SIZE = 1000
+
+
+def fetch_all(table: str, columns: str, build=None, page_size: int = PAGE_SIZE) -> list:
+    """Every row of a select, paged past PostgREST's row limit. build(query) adds filters."""
+    rows = []
+    start = 0
+    while True:
+        query = supabase.table(table).select(columns)
+        if build is not None:
+            query = build(query)
+        page = query.range(start, start + page_size - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
@@ -0,0 +1,138 @@
+# app/utils/degree_summaries.py
+# Pre-generated degree smart summaries.
+#
+# A summary only depends on catalog fields of unsw_degrees_final (program_name,
+# overview_description, career_outcomes), so it's generated once per degree by an
+# offline job into the degree_summaries table and served from there:
+#
+#   degree_id       primary key          unsw_degrees_final.id (same type)
+#   program_name    text
+#   summary         text
+#   source_hash     text                 sha256 of the source fields + prompt version
+#   updated_at      timestamptz
+#
+# Job:  python -m app.utils.degree_summaries [--concurrency 8] [--force]
+#
+# The job skips degrees whose stored source_hash still matches, so re-running it only
+# regenerates degrees that failed last time or whose catalog entry (or the prompt) changed.
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.database import fetch_all, supabase
+from app.utils.openai_client import ask_openai_async
+from app.utils.precompute import run_cli, run_precompute
+
+logger = logging.getLogger(__name__)
+
+# Bump when the prompt changes; every source_hash changes with it
+PROMPT_VERSION = 1
+TABLE = "degree_summaries"
+SOURCE_TABLE = "unsw_degrees_final"
+SOURCE_FIELDS = ("program_name", "overview_description", "career_outcomes")
+
+
+def career_outcomes_list(career_outcomes: Any) -> List[str]:
+    # Stored as a comma separated string
+    if not isinstance(career_outcomes, str):
+        return []
+    return [s.strip() for s in career_outcomes.split(",") if s.strip()]
+
+
+def source_hash(degree: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        [PROMPT_VERSION] + [degree.get(field) or "" for field in SOURCE_FIELDS], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_prompt(degree: Dict[str, Any]) -> str:
+    return f"""
+    You are UniVise's Smart Advisor.
+    Your job is to give students a clear and concise summary of the degree below, to help them decide whether it suits them.
+
+    Degree: {degree['program_name']}
+    Description: {degree.get('overview_description') or 'N/A'}
+    Career Outcomes: {', '.join(career_outcomes_list(degree.get('career_outcomes'))) or 'N/A'}
+
+    FORMAT your answer like this:
+    What this degree is about:
+    [2–3 short sentences on what students study and the skills they build]
+
+    Who it suits:
+    [1–2 short sentences on the interests, strengths and personality types that do well in it]
+
+    Career Directions:
+    • [Career path 1]
+    • [Career path 2]
+    • [Career path 3] (optional)
+
+    You may also like:
+    [1–2 related degrees or majors if relevant, otherwise omit]
+
+    Tone: Friendly, encouraging, and direct.
+    Avoid long paragraphs.
+    No markdown formatting like **bold**.
+    Keep it scannable and easy to understand at a glance.
+    """
+
+
+def get_stored_summary(degree_id: Any) -> Optional[str]:
+    res = (
+        supabase.table(TABLE)
+        .select("summary")
+        .eq("degree_id", degree_id)
+        .limit(1)
+        .execute()
+    )
+    rows = res.data or []
+    return rows[0].get("summary") if rows else None
+
+
+# ---------------------------------------------------------------------------
+# Offline job
+# ---------------------------------------------------------------------------
+
+def _row(degree: Dict[str, Any], summary: str, digest: str) -> Dict[str, Any]:
+    return {
+        "degree_id": degree["id"],
+        "program_name": degree.get("program_name"),
+        "summary": summary,
+        "source_hash": digest,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+async def generate_all(concurrency: int = 8, force: bool = False) -> Dict[str, int]:
+    degrees = [d for d in fetch_all(SOURCE_TABLE, "id," + ",".join(SOURCE_FIELDS)) if d.get("program_name")]
+    stored: Dict[Any, str] = {}
+    if not force:
+        stored = {r["degree_id"]: r.get("source_hash")
+                  for r in fetch_all(TABLE, "degree_id,source_hash,summary") if r.get("summary")}
+    todo = []
+    for degree in degrees:
+        digest = source_hash(degree)
+        if stored.get(degree["id"]) != digest:
+            todo.append((degree, digest))
+    skipped = len(degrees) - len(todo)
+    logger.info("Generating %d degree summaries (%d already current)", len(todo), skipped)
+
+    def store(item: Tuple[Dict[str, Any], str], summary: str):
+        degree, digest = item
+        supabase.table(TABLE).upsert(_row(degree, summary, digest), on_conflict="degree_id").execute()
+
+    counts = await run_precompute(
+        todo,
+        lambda item: ask_openai_async(build_prompt(item[0])),
+        store,
+        concurrency,
+        describe=lambda item: f"degree {item[0]['id']}",
+    )
+    return {"total": len(degrees), "skipped": skipped, **counts}
+
+
+if __name__ == "__main__":
+    run_cli("Pre-generate degree smart summaries", generate_all)
@@ -0,0 +1,309 @@
+# app/utils/document_extraction.py
+# Text extraction for uploaded school reports / transcripts.
+# Uploads are streamed from storage into a temp file on disk (with a size cap) instead
+# of being held in memory, and hashed on the way in. PDF parsing, DOCX parsing and
+# Tesseract OCR are CPU-bound and hold the GIL, so they run in a small process pool that
+# reads the temp file by path. PDFs are extracted a few pages at a time, in parallel,
+# and extraction stops once enough text has been collected for the LLM prompt. Pages
+# without a text layer (scans) are OCR'd from their embedded images. Results are cached
+# by content hash so re-uploading the same file skips extraction entirely.
+
+import logging
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".png", ".jpeg", ".jpg", ".tiff")
+
+# Worker processes for extraction (PDF page chunks / OCR run in parallel across these)
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Pages handed to one worker at a time
+PDF_PAGES_PER_CHUNK = 4
+# Pages with less text than this are treated as scanned and OCR'd
+MIN_PAGE_TEXT_CHARS = 20
+# Number of extracted documents kept in the content-hash cache
+EXTRACTION_CACHE_SIZE = 128
+
+# Ingestion limits
+MAX_UPLOAD_BYTES = 15 * 1024 * 1024
+MAX_PDF_PAGES = 40
+# Stop extracting once we have this much text (more than the prompt needs)
+MAX_REPORT_CHARS = 60_000
+# Extracted text stays in memory up to this size, then spills to disk
+TEXT_SPOOL_BYTES = 256 * 1024
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+
+class UnsupportedDocumentError(ValueError):
+    pass
+
+
+class DocumentTooLargeError(ValueError):
+    pass
+
+
+@dataclass
+class ExtractionResult:
+    text: str
+    pages: int = 1
+    cached: bool = False
+    truncated: bool = False
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class DownloadedDocument:
+    """An upload streamed to a temp file. Call close() to delete it."""
+    path: str
+    filename: str
+    size: int
+    sha256: str
+
+    def close(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Worker functions (module level so they can be pickled into the process pool)
+# ---------------------------------------------------------------------------
+
+def _ocr_image(source) -> str:
+    from PIL import Image
+    import pytesseract
+
+    img = Image.open(source)
+    # ensure RGB or grayscale:
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    return pytesseract.image_to_string(img)
+
+
+def _pdf_page_count(path: str) -> int:
+    from PyPDF2 import PdfReader
+
+    return len(PdfReader(path).pages)
+
+
+def _pdf_page_text(page) -> str:
+    text = page.extract_text() or ""
+    if len(text.strip()) >= MIN_PAGE_TEXT_CHARS:
+        return text
+
+    # Scanned page: OCR the largest embedded image
+    try:
+        images = list(page.images)
+    except Exception:
+        images = []
+    if not images:
+        return text
+    largest = max(images, key=lambda img: len(img.data))
+    try:
+        return _ocr_image(io.BytesIO(largest.data))
+    except Exception as e:
+        logger.warning("[extraction] OCR failed for scanned page: %s", e)
+        return text
+
+
+def _pdf_pages_text(path: str, start: int, end: int) -> List[str]:
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(path)
+    return [_pdf_page_text(reader.pages[i]) for i in range(start, min(end, len(reader.pages)))]
+
+
+def _docx_text(path: str) -> str:
+    from docx import Document
+
+    doc = Document(path)
+    texts = [p.text for p in doc.paragraphs]
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                texts.append(cell.text)
+    return "\n".join(texts)
+
+
+# ---------------------------------------------------------------------------
+# Pool + cache
+# ---------------------------------------------------------------------------
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+_cache: "OrderedDict[str, Tuple[str, int, bool]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS)
+        return _pool
+
+
+def _cache_get(key: str) -> Optional[Tuple[str, int, bool]]:
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache.move_to_end(key)
+        return hit
+
+
+def _cache_put(key: str, text: str, pages: int, truncated: bool):
+    with _cache_lock:
+        _cache[key] = (text, pages, truncated)
+        _cache.move_to_end(key)
+        while len(_cache) > EXTRACTION_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _kind_for(filename: str) -> str:
+    name = filename.lower()
+    if name.endswith(".pdf"):
+        return "pdf"
+    if name.endswith(".docx"):
+        return "docx"
+    if name.endswith(IMAGE_EXTENSIONS):
+        return "image"
+    raise UnsupportedDocumentError(
+        "Unsupported file type; only PDF, DOCX, and JPEG/PNG/TIFF images are allowed."
+    )
+
+
+# ---------------------------------------------------------------------------
+# Ingestion
+# ---------------------------------------------------------------------------
+
+async def download_to_tempfile(url: str, filename: str) -> DownloadedDocument:
+    """
+    Stream a file into a temp file on disk, hashing as we go.
+    Raises DocumentTooLargeError as soon as the size cap is exceeded and
+    UnsupportedDocumentError before downloading anything we can't read.
+    """
+    _kind_for(filename)
+    suffix = os.path.splitext(filename)[1].lower()
+    fd, tmp_path = tempfile.mkstemp(prefix="report-", suffix=suffix)
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with os.fdopen(fd, "wb") as out:
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                async with client.stream("GET", url) as resp:
+                    resp.raise_for_status()
+
+                    declared = resp.headers.get("content-length")
+                    if declared and int(declared) > MAX_UPLOAD_BYTES:
+                        raise DocumentTooLargeError(
+                            f"File is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)}MB."
+                        )
+
+                    async for chunk in resp.aiter_bytes(DOWNLOAD_CHUNK_BYTES):
+                        size += len(chunk)
+                        if size > MAX_UPLOAD_BYTES:
+                            raise DocumentTooLargeError(
+                                f"File is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)}MB."
+                            )
+                        digest.update(chunk)
+                        out.write(chunk)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    return DownloadedDocument(path=tmp_path, filename=filename, size=size, sha256=digest.hexdigest())
+
+
+async def _extract_pdf(path: str, spool, timings: Dict[str, float]) -> Tuple[int, bool]:
+    """
+    Extract PDF pages in order into the spool, keeping at most one chunk per worker
+    in flight. Returns (pages extracted, truncated).
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+
+    start = time.perf_counter()
+    page_count = await loop.run_in_executor(pool, _pdf_page_count, path)
+    timings["pdf_open"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    last_page = min(page_count, MAX_PDF_PAGES)
+    truncated = page_count > last_page
+    chars = 0
+    pages_done = 0
+
+    in_flight = []
+    next_page = 0
+    try:
+        while next_page < last_page or in_flight:
+            while next_page < last_page and len(in_flight) < EXTRACTION_WORKERS:
+                end = min(next_page + PDF_PAGES_PER_CHUNK, last_page)
+                in_flight.append(loop.run_in_executor(pool, _pdf_pages_text, path, next_page, end))
+                next_page = end
+
+            # Consume chunks in page order so the text stays in reading order
+            chunk = await in_flight.pop(0)
+            for page_text in chunk:
+                spool.write(page_text)
+                spool.write("\n")
+                chars += len(page_text) + 1
+                pages_done += 1
+
+            if chars >= MAX_REPORT_CHARS:
+                truncated = truncated or next_page < last_page or bool(in_flight)
+                break
+    finally:
+        for fut in in_flight:
+            fut.cancel()
+
+    timings["pdf_pages"] = time.perf_counter() - start
+    return pages_done, truncated
+
+
+async def extract_text(document: DownloadedDocument) -> ExtractionResult:
+    """
+    Extract text from a downloaded PDF / DOCX / image without blocking the event loop.
+    Text is capped at MAX_REPORT_CHARS. Raises UnsupportedDocumentError for other
+    file types.
+    """
+    kind = _kind_for(document.filename)
+    timings: Dict[str, float] = {}
+    key = f"{kind}:{document.sha256}"
+
+    hit = _cache_get(key)
+    if hit is not None:
+        text, pages, truncated = hit
+        return ExtractionResult(text=text, pages=pages, cached=True, truncated=truncated, timings=timings)
+
+    loop = asyncio.get_running_loop()
+    with tempfile.SpooledTemporaryFile(max_size=TEXT_SPOOL_BYTES, mode="w+", encoding="utf-8") as spool:
+        if kind == "pdf":
+            pages, truncated = await _extract_pdf(document.path, spool, timings)
+        else:
+            start = time.perf_counter()
+            func = _docx_text if kind == "docx" else _ocr_image
+            spool.write(await loop.run_in_executor(_get_pool(), func, document.path))
+            pages, truncated = 1, False
+            timings[kind] = time.perf_counter() - start
+
+        spool.seek(0)
+        text = spool.read(MAX_REPORT_CHARS)
+        truncated = truncated or bool(spool.read(1))
+
+    _cache_put(key, text, pages, truncated)
+    return ExtractionResult(text=text, pages=pages, cached=False, truncated=truncated, timings=timings)
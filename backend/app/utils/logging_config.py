@@ -0,0 +1,157 @@
+# app/utils/logging_config.py
+# Process-wide logging: modules keep using logging.getLogger(__name__); this wires
+# the root logger to a bounded queue so request code only pays for building a
+# LogRecord. Formatting (message interpolation, JSON, redaction) and the write to
+# stdout happen on a listener thread. When the queue is full, records are dropped
+# and counted rather than blocking the request.
+#
+#   LOG_LEVEL   DEBUG / INFO (default) / WARNING ...
+#   LOG_FORMAT  json (default) | text
+#
+# High-volume events can be sampled per call: logger.info("...", extra={"sample_rate": 0.05}).
+# Sampling never drops WARNING and above. Structured fields go in extra={"data": {...}}.
+# Secrets (bearer tokens, JWTs, API keys, password/token fields) are redacted.
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+from app.utils.tracing import current_trace_id
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_SIZE = 10000
+
+SENSITIVE_KEYS = {
+    "authorization", "token", "access_token", "refresh_token", "password",
+    "api_key", "apikey", "secret", "service_role_key", "jwt",
+}
+REDACTED = "[REDACTED]"
+
+_REDACT_PATTERNS = [
+    (re.compile(r"(?i)bearer\s+[A-Za-z0-9._~+/=-]+"), f"Bearer {REDACTED}"),
+    (re.compile(r"eyJ[A-Za-z0-9_-]{5,}\.[A-Za-z0-9_-]{5,}\.[A-Za-z0-9_-]*"), REDACTED),
+    (re.compile(r"\bsk-[A-Za-z0-9_-]{10,}"), REDACTED),
+    (re.compile(r"(?i)(['\"]?(?:access_token|refresh_token|token|password|api_key|apikey|secret)['\"]?\s*[:=]\s*)['\"]?[^'\",\s}]+['\"]?"),
+     rf"\1'{REDACTED}'"),
+]
+
+
+def redact(value: Any) -> Any:
+    if isinstance(value, str):
+        for pattern, replacement in _REDACT_PATTERNS:
+            value = pattern.sub(replacement, value)
+        return value
+    if isinstance(value, dict):
+        return {
+            k: REDACTED if str(k).lower() in SENSITIVE_KEYS else redact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    return value
+
+
+class ContextFilter(logging.Filter):
+    """Runs on the calling thread: applies sampling and captures the trace id."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample_rate", None)
+        if rate is not None and record.levelno < logging.WARNING and random.random() >= rate:
+            return False
+        record.trace_id = current_trace_id()
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    # The stock prepare() formats the message on the caller's thread; defer it to the listener
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": redact(record.getMessage()),
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            payload["trace_id"] = trace_id
+        data = getattr(record, "data", None)
+        if data:
+            payload["data"] = redact(data)
+        if record.exc_info:
+            payload["exc"] = redact(self.formatException(record.exc_info))
+        return json.dumps(payload, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s%(trace)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        trace_id = getattr(record, "trace_id", None)
+        record.trace = f" [{trace_id[:8]}]" if trace_id else ""
+        line = super().format(record)
+        data = getattr(record, "data", None)
+        if data:
+            line += f" {json.dumps(data, default=str)}"
+        return redact(line)
+
+
+_handler: Optional[DroppingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging():
+    """Install the queue handler on the root logger (idempotent)."""
+    global _handler, _listener
+    if _listener is not None:
+        return
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(TextFormatter() if LOG_FORMAT == "text" else JsonFormatter())
+
+    _handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    _handler.addFilter(ContextFilter())
+    _listener = QueueListener(_handler.queue, output)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root.addHandler(_handler)
+    root.setLevel(LOG_LEVEL)
+
+    # Request logging comes from the tracing middleware (sampled); uvicorn's access log would duplicate it
+    logging.getLogger("uvicorn.access").disabled = True
+    # Library chatter (every HTTP request to Supabase/OpenAI) only at WARNING
+    for noisy in ("httpx", "httpcore", "hpack", "openai"):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+
+
+def dropped_records() -> int:
+    return _handler.dropped if _handler is not None else 0
@@ -1,7 +1,10 @@
 # app/utils/mindmesh_rules.py
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional, Protocol, Tuple
 import re
-from .database import supabase
+import threading
+import time
+from .database import fetch_all, supabase
 
 # ---- Local "Item-like" protocol so we don't import the router ----
 class ItemLike(Protocol):
@@ -21,164 +24,319 @@ def _is_level1_code(code: Optional[str]) -> bool:
     m = re.search(r"\b[A-Z]{4}(\d{4})\b", str(code or ""))
     return bool(m and m.group(1)[0] == "1")
 
-async def _fetch_course_catalog(keys_or_ids: List[Tuple[Optional[str], Optional[str]]]) -> Dict[str, Dict[str, Any]]:
-    """
-    Accepts list of (source_id, item_key), returns map by both id and code:
-      idx[id] and idx[code] -> { id, code, title, faculty, level }
-    """
-    ids = [sid for sid, _ in keys_or_ids if sid]
-    codes = [k for _, k in keys_or_ids if k]
-
-    idx: Dict[str, Dict[str, Any]] = {}
-
-    # Fetch by id
-    if ids:
-        cr = (
-            supabase.table("unsw_courses")
-            .select("id,code,title,faculty")
-            .in_("id", ids)
-            .execute()
-        )
-        for r in (cr.data or []):
-            rec = {
-                "id": r["id"],
-                "code": r.get("code"),
-                "title": r.get("title"),
-                "faculty": r.get("faculty"),
-                "level": _infer_level_from_code(r.get("code")),
-            }
-            idx[r["id"]] = rec
-            if rec["code"]:
-                idx[rec["code"]] = rec
-
-    # Fill missing by code
-    fetch_codes = [c for c in codes if c not in idx]
-    if fetch_codes:
-        cr2 = (
-            supabase.table("unsw_courses")
-            .select("id,code,title,faculty")
-            .in_("code", fetch_codes)
-            .execute()
-        )
-        for r in (cr2.data or []):
-            rec = {
-                "id": r["id"],
-                "code": r.get("code"),
-                "title": r.get("title"),
-                "faculty": r.get("faculty"),
-                "level": _infer_level_from_code(r.get("code")),
-            }
-            idx[r["id"]] = rec
-            if rec["code"]:
-                idx[rec["code"]] = rec
-
-    return idx
-
-async def _fetch_degree_faculty(deg: ItemLike) -> Optional[str]:
-    """
-    Get faculty for a degree using source_id if available,
-    otherwise by uac_code or program_name — from unsw_degrees_final.
-    """
-    # Try by id
-    if deg.source_id:
-        dr = (
-            supabase.table("unsw_degrees_final")
-            .select("id,faculty")
-            .eq("id", deg.source_id)
-            .limit(1)
-            .execute()
-        )
-        row = (dr.data or [None])[0]
-        if row:
-            return row.get("faculty")
-
-    # Fallback by uac_code
-    if deg.item_key and re.fullmatch(r"\d{6}", str(deg.item_key)):
-        dr2 = (
-            supabase.table("unsw_degrees_final")
-            .select("uac_code,faculty")
-            .eq("uac_code", str(deg.item_key))
-            .limit(1)
-            .execute()
-        )
-        row = (dr2.data or [None])[0]
-        if row:
-            return row.get("faculty")
-
-    # Fallback by program_name
-    if deg.title:
-        dr3 = (
-            supabase.table("unsw_degrees_final")
-            .select("program_name,faculty")
-            .eq("program_name", deg.title)
-            .limit(1)
-            .execute()
-        )
-        row = (dr3.data or [None])[0]
-        if row:
-            return row.get("faculty")
-
-    return None
-
-
-async def _existing_item_keys(user_id: str, mesh_id: str) -> set:
-    q = (
-        supabase.from_("mindmesh_items")
-        .select("item_type,item_key")
-        .eq("user_id", user_id)
-        .eq("mesh_id", mesh_id)
-        .execute()
+# ---------- cached catalog indexes ----------
+# Both are rebuilt at most every INDEX_TTL_SECONDS, so edge building itself costs no catalog queries.
+INDEX_TTL_SECONDS = 900
+
+_index_lock = threading.Lock()
+_degree_faculty_index: Dict[str, Any] = {}
+_level1_index: Dict[str, Any] = {}
+
+
+def _fresh(index: Dict[str, Any]) -> bool:
+    return bool(index) and time.monotonic() - index["built"] < INDEX_TTL_SECONDS
+
+
+def _get_degree_faculty_index() -> Dict[str, Any]:
+    """Degree id / uac_code / program_name -> faculty."""
+    global _degree_faculty_index
+    with _index_lock:
+        if not _fresh(_degree_faculty_index):
+            by_id, by_uac, by_name = {}, {}, {}
+            for r in fetch_all("unsw_degrees_final", "id,uac_code,program_name,faculty"):
+                faculty = r.get("faculty")
+                if not faculty:
+                    continue
+                by_id[str(r["id"])] = faculty
+                if r.get("uac_code"):
+                    by_uac.setdefault(str(r["uac_code"]), faculty)
+                if r.get("program_name"):
+                    by_name.setdefault(r["program_name"], faculty)
+            _degree_faculty_index = {"id": by_id, "uac": by_uac, "name": by_name, "built": time.monotonic()}
+        return _degree_faculty_index
+
+
+def _get_level1_index() -> Dict[str, Any]:
+    """Level-1 courses: by faculty (catalog order), and by code / id for candidate lookups."""
+    global _level1_index
+    with _index_lock:
+        if not _fresh(_level1_index):
+            by_faculty: Dict[str, List[Dict[str, Any]]] = {}
+            by_key: Dict[str, Dict[str, Any]] = {}
+            # ____1% = four letters then a level-1 digit; _is_level1_code re-checks the shape
+            rows = fetch_all("unsw_courses", "id,code,title,faculty", lambda q: q.like("code", "____1%"))
+            for r in rows:
+                if not _is_level1_code(r.get("code")):
+                    continue
+                rec = {
+                    "id": r["id"],
+                    "code": r["code"],
+                    "title": r.get("title"),
+                    "faculty": (r.get("faculty") or "").strip(),
+                    "level": 1,
+                }
+                by_faculty.setdefault(rec["faculty"], []).append(rec)
+                by_key[rec["code"]] = rec
+                by_key[str(rec["id"])] = rec
+            _level1_index = {"by_faculty": by_faculty, "by_key": by_key, "built": time.monotonic()}
+        return _level1_index
+
+
+def _resolve_degree_faculties(degrees: List[ItemLike]) -> Dict[str, str]:
+    """item_key -> faculty for every degree, by source_id, then uac_code, then program_name."""
+    index = _get_degree_faculty_index()
+    faculties = {}
+    for deg in degrees:
+        faculty = None
+        if deg.source_id:
+            faculty = index["id"].get(str(deg.source_id))
+        if not faculty and deg.item_key and re.fullmatch(r"\d{6}", str(deg.item_key)):
+            faculty = index["uac"].get(str(deg.item_key))
+        if not faculty and deg.title:
+            faculty = index["name"].get(deg.title)
+        if faculty:
+            faculties[deg.item_key] = faculty.strip()
+    return faculties
+
+
+# ---------- per-mesh adjacency index ----------
+# What edge building needs to know about one mesh: its items, level-1 courses and degrees
+# grouped by faculty, and the edges already emitted. Loaded once per mesh and then kept
+# current by the writes below, so adding items only looks at the new items. The index only
+# changes after a write has succeeded; edge building itself works on a local view. Items
+# deleted outside the backend (the frontend deletes directly) are picked up when the TTL expires.
+MESH_INDEX_TTL_SECONDS = 300
+MESH_INDEX_MAX = 500
+EDGE_UPSERT_CHUNK = 500
+EDGE_CONFLICT = "user_id,mesh_id,from_key,to_key,edge_type"
+
+_mesh_lock = threading.Lock()
+_mesh_indexes: "OrderedDict[Tuple[str, str], _MeshIndex]" = OrderedDict()
+
+
+class _MeshIndex:
+    def __init__(self):
+        self.items: set = set()                                 # (item_type, item_key)
+        self.courses_by_faculty: Dict[str, List[str]] = {}      # level-1 course codes in the mesh
+        self.all_courses: List[str] = []
+        self.course_faculty: Dict[str, str] = {}
+        self.degrees_by_faculty: Dict[str, List[str]] = {}
+        self.degree_faculty: Dict[str, str] = {}
+        self.adjacency: Dict[str, set] = {}                     # from_key -> {(to_key, edge_type)}
+        self.built = time.monotonic()
+
+    def resolve(self, items: List[ItemLike]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Level-1 course code -> faculty and degree key -> faculty for the items that have one,
+        without registering anything.
+        """
+        level1 = _get_level1_index()["by_key"]
+        unseen = [it for it in items if it.item_type == "degree" and it.item_key not in self.degree_faculty]
+        faculties = _resolve_degree_faculties(unseen)
+        courses: Dict[str, str] = {}
+        degrees: Dict[str, str] = {}
+        for it in items:
+            if it.item_type == "degree":
+                faculty = self.degree_faculty.get(it.item_key) or faculties.get(it.item_key)
+                if faculty:
+                    degrees[it.item_key] = faculty
+            elif it.item_type == "course":
+                rec = (level1.get(str(it.source_id)) if it.source_id else None) or level1.get(it.item_key)
+                if rec:
+                    courses[rec["code"]] = self.course_faculty.get(rec["code"], rec["faculty"])
+        return courses, degrees
+
+    def add_items(self, items: List[ItemLike]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Register persisted items. Returns what resolve() returns for them."""
+        courses, degrees = self.resolve(items)
+        for it in items:
+            self.items.add((it.item_type, it.item_key))
+        for key, faculty in degrees.items():
+            if key not in self.degree_faculty:
+                self.degree_faculty[key] = faculty
+                self.degrees_by_faculty.setdefault(faculty, []).append(key)
+        for code, faculty in courses.items():
+            if code not in self.course_faculty:
+                self.course_faculty[code] = faculty
+                self.courses_by_faculty.setdefault(faculty, []).append(code)
+                self.all_courses.append(code)
+        return courses, degrees
+
+    def remove_keys(self, keys: List[str]):
+        gone = set(keys)
+        self.items = {k for k in self.items if k[1] not in gone}
+        for key in gone:
+            faculty = self.course_faculty.pop(key, None)
+            if faculty is not None:
+                self.courses_by_faculty[faculty].remove(key)
+                self.all_courses.remove(key)
+            faculty = self.degree_faculty.pop(key, None)
+            if faculty is not None:
+                self.degrees_by_faculty[faculty].remove(key)
+            self.adjacency.pop(key, None)
+        for targets in self.adjacency.values():
+            targets.difference_update({t for t in targets if t[0] in gone})
+
+    def add_edge(self, from_key: str, to_key: str, edge_type: str):
+        self.adjacency.setdefault(from_key, set()).add((to_key, edge_type))
+
+    def has_edge(self, from_key: str, to_key: str, edge_type: str) -> bool:
+        return (to_key, edge_type) in self.adjacency.get(from_key, ())
+
+    def out_degree(self, from_key: str, edge_type: str) -> int:
+        return sum(1 for _, t in self.adjacency.get(from_key, ()) if t == edge_type)
+
+
+class _Row:
+    """mindmesh_items row with the ItemLike attributes the index reads."""
+
+    def __init__(self, row: Dict[str, Any]):
+        self.item_type = row.get("item_type")
+        self.item_key = row.get("item_key")
+        self.title = row.get("title")
+        self.metadata = row.get("metadata") or {}
+        self.source_table = row.get("source_table")
+        self.source_id = row.get("source_id")
+
+
+def _load_mesh_index(user_id: str, mesh_id: str) -> _MeshIndex:
+    index = _MeshIndex()
+    items = fetch_all(
+        "mindmesh_items", "item_type,item_key,title,source_id",
+        lambda q: q.eq("user_id", user_id).eq("mesh_id", mesh_id),
+    )
+    index.add_items([_Row(r) for r in items])
+    edges = fetch_all(
+        "mindmesh_edges", "from_key,to_key,edge_type",
+        lambda q: q.eq("user_id", user_id).eq("mesh_id", mesh_id),
     )
-    return { (r["item_type"], r["item_key"]) for r in (q.data or []) }
+    for e in edges:
+        index.add_edge(e["from_key"], e["to_key"], e["edge_type"])
+    return index
+
+
+def _get_mesh_index(user_id: str, mesh_id: str) -> Tuple[_MeshIndex, bool]:
+    """(index, freshly_loaded). Cached per mesh for MESH_INDEX_TTL_SECONDS, LRU-bounded."""
+    key = (user_id, mesh_id)
+    with _mesh_lock:
+        index = _mesh_indexes.get(key)
+        if index is not None and time.monotonic() - index.built < MESH_INDEX_TTL_SECONDS:
+            _mesh_indexes.move_to_end(key)
+            return index, False
+    index = _load_mesh_index(user_id, mesh_id)
+    with _mesh_lock:
+        _mesh_indexes[key] = index
+        while len(_mesh_indexes) > MESH_INDEX_MAX:
+            _mesh_indexes.popitem(last=False)
+    return index, True
+
+
+def invalidate_mesh_index(user_id: str, mesh_id: str):
+    """Drop the cached index, e.g. after items were changed by something other than this module."""
+    with _mesh_lock:
+        _mesh_indexes.pop((user_id, mesh_id), None)
+
 
-async def _auto_add_level1_courses(user_id: str, mesh_id: str, faculty: str) -> int:
+async def delete_mesh_items(user_id: str, mesh_id: str, keys: List[str]):
+    """Delete items and the edges touching them, keeping the cached index in step."""
+    if not keys:
+        return
+    quoted = ",".join(f'"{k}"' for k in keys)
+    supabase.from_("mindmesh_edges").delete().eq("user_id", user_id).eq("mesh_id", mesh_id) \
+        .or_(f"from_key.in.({quoted}),to_key.in.({quoted})").execute()
+    supabase.from_("mindmesh_items").delete().eq("user_id", user_id).eq("mesh_id", mesh_id) \
+        .in_("item_key", keys).execute()
+    with _mesh_lock:
+        index = _mesh_indexes.get((user_id, mesh_id))
+    if index is not None:
+        index.remove_keys(keys)
+
+
+async def upsert_edges(
+    user_id: str,
+    mesh_id: str,
+    edges: List[Dict[str, Any]],
+    items: Optional[List[ItemLike]] = None,
+) -> int:
     """
-    Pull all level-1 courses in the same faculty and upsert them into mindmesh_items.
-    Returns count inserted/upserted.
+    Bulk-write edges in chunks of EDGE_UPSERT_CHUNK. Returns the number written.
+    Pass the (already persisted) new items the edges were built for as `items`, even when
+    there are no edges, so the cached index learns about them. The index is only updated
+    once every chunk is written; a failed write drops it so the next call reloads.
     """
-    # Pull a reasonable slice (adjust if needed)
-    cr = (
-        supabase.table("unsw_courses")
-        .select("id,code,title,faculty")
-        .eq("faculty", faculty)
-        .limit(500)
-        .execute()
-    )
-    rows = [r for r in (cr.data or []) if _is_level1_code(r.get("code"))]
-    if not rows:
-        return 0
+    rows = [{"user_id": user_id, "mesh_id": mesh_id, **e} for e in edges]
+    try:
+        for start in range(0, len(rows), EDGE_UPSERT_CHUNK):
+            supabase.table("mindmesh_edges").upsert(
+                rows[start:start + EDGE_UPSERT_CHUNK],
+                on_conflict=EDGE_CONFLICT,
+            ).execute()
+    except Exception:
+        invalidate_mesh_index(user_id, mesh_id)
+        raise
+    with _mesh_lock:
+        index = _mesh_indexes.get((user_id, mesh_id))
+    if index is not None:
+        if items:
+            index.add_items(items)
+        for e in edges:
+            index.add_edge(e["from_key"], e["to_key"], e["edge_type"])
+    return len(rows)
+
 
-    existing = await _existing_item_keys(user_id, mesh_id)
+async def _auto_add_level1_courses(
+    user_id: str, mesh_id: str, index: _MeshIndex, faculties: List[str], known: set
+) -> Dict[str, str]:
+    """
+    Upsert the level-1 courses of the given faculties that the mesh doesn't have yet
+    (one upsert for all faculties). Returns code -> faculty for the courses added.
+    """
+    level1 = _get_level1_index()
     to_add = []
-    for r in rows:
-        key = ("course", r["code"])
-        if key in existing:
-            continue
-        to_add.append({
-            "user_id": user_id,
-            "mesh_id": mesh_id,
-            "item_type": "course",
-            "item_key": r["code"],
-            "title": r.get("title") or r["code"],
-            "tags": ["course", f"level-{_infer_level_from_code(r.get('code')) or 'x'}"],
-            "metadata": {"faculty": r.get("faculty")},
-            "source_table": "unsw_courses",
-            "source_id": r["id"],
-        })
+    for faculty in faculties:
+        for r in level1["by_faculty"].get(faculty, []):
+            if ("course", r["code"]) in index.items or r["code"] in known:
+                continue
+            to_add.append({
+                "user_id": user_id,
+                "mesh_id": mesh_id,
+                "item_type": "course",
+                "item_key": r["code"],
+                "title": r.get("title") or r["code"],
+                "tags": ["course", "level-1"],
+                "metadata": {"faculty": r.get("faculty")},
+                "source_table": "unsw_courses",
+                "source_id": r["id"],
+            })
 
     if not to_add:
-        return 0
-
+        return {}
     res = supabase.table("mindmesh_items").upsert(
         to_add,
         on_conflict="user_id,mesh_id,item_type,item_key"
     ).execute()
     if getattr(res, "error", None):
-        # Don't explode the request if inserts fail – treat as 0
-        return 0
-    return len(to_add)
+        # Don't explode the request if inserts fail – edges only point at existing items
+        return {}
+    # Written above, so these can go straight into the cached index
+    added, _ = index.add_items([_Row(r) for r in to_add])
+    return added
 
 # ---------- main rule ----------
+BELONGS_TO = "belongs_to"
+
+
+def _belongs_to(degree_key: str, course_code: str) -> Dict[str, Any]:
+    return {
+        "from_key": degree_key,
+        "to_key": course_code,
+        "edge_type": BELONGS_TO,
+        "rationale": "rule:degree->level1(same faculty)",
+        "confidence": 0.9,
+        "metadata": {},
+    }
+
+
 async def degree_to_level1_edges(
     user_id: str,
     mesh_id: str,
@@ -192,70 +350,64 @@ async def degree_to_level1_edges(
     DEGREE -> COURSE (level 1) within same faculty.
     If auto_add_missing_level1=True, we will insert level-1 courses (same faculty)
     into mindmesh_items first so edges always have visible targets.
+
+    Only the delta is computed: edges from newly added degrees, and edges from degrees
+    already in the mesh to newly added level-1 courses. Edges the mesh already has are
+    not emitted again. Pass the result (and new_items) to upsert_edges to write it; the
+    cached index is left untouched until then.
     """
-    new_degrees = [it for it in new_items if it.item_type == "degree"]
-    if not new_degrees:
-        return []
+    index, _ = _get_mesh_index(user_id, mesh_id)
+    new_courses, new_degrees = index.resolve(new_items)
+    # Items the caller knows about that the index doesn't have (e.g. not persisted yet)
+    pending = [it for it in existing_items if (it.item_type, it.item_key) not in index.items]
+    extra_courses, extra_degrees = index.resolve(pending)
+
+    if auto_add_missing_level1 and new_degrees:
+        # One round of writes for all new degrees' faculties, so edges always have visible targets
+        faculties = sorted(set(new_degrees.values()))
+        known = set(new_courses) | set(extra_courses)
+        new_courses.update(await _auto_add_level1_courses(user_id, mesh_id, index, faculties, known))
 
-    # Ensure we have candidates (existing + new)
-    candidates = [it for it in [*new_items, *existing_items] if it.item_type == "course"]
+    # Mesh courses and degrees = the index plus the caller's items it doesn't have yet
+    local_courses: Dict[str, List[str]] = {}
+    for code, faculty in {**extra_courses, **new_courses}.items():
+        if code not in index.course_faculty:
+            local_courses.setdefault(faculty, []).append(code)
+    local_degrees: Dict[str, List[str]] = {}
+    for key, faculty in extra_degrees.items():
+        if key not in index.degree_faculty and key not in new_degrees:
+            local_degrees.setdefault(faculty, []).append(key)
 
     edges: List[Dict[str, Any]] = []
+    emitted: set = set()
+    counts: Dict[str, int] = {}
 
-    for deg in new_degrees:
-        d_fac = await _fetch_degree_faculty(deg)
-        if not d_fac:
-            # Nothing to do without faculty info
-            continue
-
-        # Optionally auto-add missing level-1 courses for this faculty
-        if auto_add_missing_level1:
-            await _auto_add_level1_courses(user_id, mesh_id, d_fac)
-            # Refresh candidates after auto-add
-            # (Only pull minimal fields needed)
-            refreshed = (
-                supabase.from_("mindmesh_items")
-                .select("item_type,item_key,source_table,source_id")
-                .eq("user_id", user_id)
-                .eq("mesh_id", mesh_id)
-                .eq("item_type", "course")
-                .limit(800)
-                .execute()
-            )
-            candidates = [  # rebuild with ItemLike-shape dicts
-                type("X",(object,),r)() for r in (refreshed.data or [])
-            ]
-
-        # Build course catalog for candidates (by source_id or code)
-        keys_or_ids = [(it.source_id, it.item_key) for it in candidates]
-        cat = await _fetch_course_catalog(keys_or_ids)
-
-        added = 0
-        for c in candidates:
-            if added >= max_edges_per_degree:
-                break
-
-            rec = cat.get(c.source_id) or cat.get(c.item_key) or {}
-            if not rec:
-                continue
+    def emit(degree_key: str, course_code: str):
+        if (degree_key, course_code) in emitted or index.has_edge(degree_key, course_code, BELONGS_TO):
+            return
+        if index.out_degree(degree_key, BELONGS_TO) + counts.get(degree_key, 0) >= max_edges_per_degree:
+            return
+        emitted.add((degree_key, course_code))
+        counts[degree_key] = counts.get(degree_key, 0) + 1
+        edges.append(_belongs_to(degree_key, course_code))
 
-            if rec.get("level") != 1:
-                continue
-            c_fac = (rec.get("faculty") or "").strip()
+    # New degrees against every level-1 course in the mesh
+    for deg, d_fac in new_degrees.items():
+        if allow_cross_faculty:
+            targets = index.all_courses + [c for codes in local_courses.values() for c in codes]
+        else:
+            targets = index.courses_by_faculty.get(d_fac, []) + local_courses.get(d_fac, [])
+        for code in targets[:max_edges_per_degree]:
+            emit(deg, code)
 
-            if not allow_cross_faculty and (c_fac and c_fac != d_fac.strip()):
-                continue
-
-            edges.append(
-                {
-                    "from_key": deg.item_key,
-                    "to_key": rec.get("code") or c.item_key,
-                    "edge_type": "belongs_to",
-                    "rationale": "rule:degree->level1(same faculty)",
-                    "confidence": 0.9,
-                    "metadata": {},
-                }
-            )
-            added += 1
+    # New courses against degrees that were already there
+    for code, c_fac in new_courses.items():
+        if allow_cross_faculty:
+            owners = list(index.degree_faculty) + [d for keys in local_degrees.values() for d in keys]
+        else:
+            owners = index.degrees_by_faculty.get(c_fac, []) + local_degrees.get(c_fac, [])
+        for deg in owners:
+            if deg not in new_degrees:
+                emit(deg, code)
 
     return edges
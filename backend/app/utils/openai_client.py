@@ -1,20 +1,65 @@
+import functools
+import logging
 import os
-from openai import OpenAI
 from dotenv import load_dotenv
 from typing import List, Dict, Optional
+from app.utils.tracing import traced
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-openai = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-gemini = OpenAI(
-    api_key=os.getenv("GEMINI_API_KEY"),
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
+
+# Clients (and the openai package itself) are created on first use rather than at
+# import, so a worker that only serves /health or DB-backed routes never pays for them.
+# Gemini is only used for report analysis.
+@functools.lru_cache(maxsize=None)
+def get_openai():
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+@functools.lru_cache(maxsize=None)
+def get_async_openai():
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+@functools.lru_cache(maxsize=None)
+def get_gemini():
+    from openai import OpenAI
+    return OpenAI(
+        api_key=os.getenv("GEMINI_API_KEY"),
+        base_url=os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/openai/"),
+    )
 
 
+@traced(kind="llm")
 def ask_openai(prompt: str) -> str:
     try:
-        response = openai.chat.completions.create(
+        response = get_openai().chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are a helpful expert career advisor.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.7,
+            max_tokens=3000,
+        )
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        logger.warning("OpenAI API error: %s", e)
+        return "Sorry, I couldn't process your request."
+
+
+# Same as ask_openai but awaits the HTTP call, so it can run on the event loop
+@traced(kind="llm")
+async def ask_openai_async(prompt: str) -> str:
+    try:
+        response = await get_async_openai().chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {
@@ -28,13 +73,14 @@ def ask_openai(prompt: str) -> str:
         )
         return response.choices[0].message.content.strip()
     except Exception as e:
-        print("OpenAI API error:", e)
+        logger.warning("OpenAI API error: %s", e)
         return "Sorry, I couldn't process your request."
 
 
+@traced(kind="llm")
 def ask_gemini(prompt: str) -> str:
     try:
-        response = gemini.chat.completions.create(
+        response = get_gemini().chat.completions.create(
             model="gemini-2.5-flash-lite-preview-06-17",
             messages=[
                 {
@@ -46,11 +92,11 @@ def ask_gemini(prompt: str) -> str:
             temperature=0.3,
             max_tokens=2048,
         )
-        print(response.choices[0].message.content)
+        logger.debug("Gemini response: %s", response.choices[0].message.content)
         return response.choices[0].message.content.strip()
 
     except Exception as e:
-        print("Gemini API error:", e)
+        logger.warning("Gemini API error: %s", e)
         return "Sorry could process Gemini request"
 
 
@@ -63,7 +109,7 @@ def ask_chat_completion_stream(
 ):
     messages = [{"role": "system", "content": system_prompt}] + history
     # ask OpenAI to stream
-    return openai.chat.completions.create(
+    return get_openai().chat.completions.create(
         model=model,
         messages=messages,
         temperature=temperature,
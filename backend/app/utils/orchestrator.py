@@ -0,0 +1,164 @@
+# app/utils/orchestrator.py
+# Small DAG runner for multi-stage AI generation (roadmap sections etc.).
+# Stages declare their dependencies and run on the event loop: async stages are
+# awaited directly, sync stages (Supabase queries) go to the shared default executor.
+# Every stage can name a shared limit so concurrent requests compete for one
+# LLM / DB budget per process instead of spinning up their own thread pools.
+
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+# Process-wide concurrency limits, keyed by resource name
+STAGE_LIMITS: Dict[str, int] = {
+    "llm": 8,
+    "db": 16,
+}
+
+_limiters: Dict[str, asyncio.Semaphore] = {}
+
+
+def limiter(name: str) -> asyncio.Semaphore:
+    """Return the shared semaphore for a resource (created on first use)."""
+    sem = _limiters.get(name)
+    if sem is None:
+        sem = asyncio.Semaphore(STAGE_LIMITS.get(name, 4))
+        _limiters[name] = sem
+    return sem
+
+
+@dataclass
+class Stage:
+    """
+    One node of a pipeline.
+
+    func is called as func(context, results) where results holds the outputs of
+    every stage that has finished so far (always including this stage's deps).
+    If a non-required stage raises, its fallback is used as the result and
+    dependents still run.
+    """
+    name: str
+    func: Callable[[Dict[str, Any], Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+    limit: Optional[str] = None
+    required: bool = True
+    fallback: Any = None
+
+
+@dataclass
+class PipelineResult:
+    results: Dict[str, Any]
+    timings: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    total: float = 0.0
+
+
+class StageFailed(Exception):
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+def _topological_order(stages: List[Stage]) -> List[Stage]:
+    by_name = {s.name: s for s in stages}
+    if len(by_name) != len(stages):
+        raise ValueError("Duplicate stage names in pipeline")
+
+    for s in stages:
+        for dep in s.deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage '{s.name}' depends on unknown stage '{dep}'")
+
+    ordered: List[Stage] = []
+    state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+    def visit(s: Stage):
+        mark = state.get(s.name)
+        if mark == 2:
+            return
+        if mark == 1:
+            raise ValueError(f"Dependency cycle detected at stage '{s.name}'")
+        state[s.name] = 1
+        for dep in s.deps:
+            visit(by_name[dep])
+        state[s.name] = 2
+        ordered.append(s)
+
+    for s in stages:
+        visit(s)
+    return ordered
+
+
+async def _call_stage(stage: Stage, context: Dict[str, Any], results: Dict[str, Any]) -> Any:
+    if inspect.iscoroutinefunction(stage.func):
+        return await stage.func(context, results)
+    value = await asyncio.to_thread(stage.func, context, results)
+    if inspect.isawaitable(value):
+        value = await value
+    return value
+
+
+async def run_stages(
+    stages: List[Stage],
+    context: Dict[str, Any],
+    label: str = "pipeline",
+) -> PipelineResult:
+    """
+    Run stages as soon as their dependencies finish and return outputs + timings.
+    Raises StageFailed when a required stage errors.
+    """
+    ordered = _topological_order(stages)
+    results: Dict[str, Any] = {}
+    outcome = PipelineResult(results=results)
+    tasks: Dict[str, asyncio.Task] = {}
+    pipeline_start = time.perf_counter()
+
+    async def run_one(stage: Stage):
+        if stage.deps:
+            await asyncio.gather(*(tasks[d] for d in stage.deps))
+
+        start = time.perf_counter()
+        try:
+            with span(f"{label.split()[0]}.{stage.name}", kind=stage.limit or "stage", pipeline=label) as s:
+                if stage.limit:
+                    async with limiter(stage.limit):
+                        s.set(queued_ms=round((time.perf_counter() - start) * 1000, 1))
+                        value = await _call_stage(stage, context, results)
+                else:
+                    value = await _call_stage(stage, context, results)
+        except Exception as e:
+            outcome.timings[stage.name] = time.perf_counter() - start
+            if stage.required:
+                raise StageFailed(stage.name, e) from e
+            logger.warning("[%s] %s failed, using fallback: %s", label, stage.name, e)
+            outcome.errors[stage.name] = str(e)
+            value = stage.fallback
+
+        outcome.timings[stage.name] = time.perf_counter() - start
+        results[stage.name] = value
+
+    for stage in ordered:
+        tasks[stage.name] = asyncio.create_task(run_one(stage), name=f"{label}:{stage.name}")
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for t in tasks.values():
+            t.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    finally:
+        outcome.total = time.perf_counter() - pipeline_start
+        stage_times = ", ".join(f"{name}={secs:.1f}s" for name, secs in outcome.timings.items())
+        logger.info("[%s] %s | total=%.1fs", label, stage_times, outcome.total)
+
+    return outcome
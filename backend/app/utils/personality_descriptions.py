@@ -0,0 +1,180 @@
+# app/utils/personality_descriptions.py
+# Pre-generated RIASEC result descriptions.
+#
+# A quiz result is described by its Holland code (result_summary, the top two types,
+# e.g. "artistic-investigative") and how strongly the student scored on those two types.
+# Each type's score is 5 questions x 1-5, banded low / moderate / high, so every result
+# maps to one of 30 codes x 6 band pairs = 180 descriptions. They're generated offline
+# into the personality_descriptions table:
+#
+#   description_key text primary key   "artistic-investigative:high:moderate"
+#   result_summary  text
+#   top_band        text
+#   second_band     text
+#   description     text
+#   prompt_version  int
+#   updated_at      timestamptz
+#
+# Job:  python -m app.utils.personality_descriptions [--concurrency 8] [--force]
+#
+# The job skips keys already generated with the current PROMPT_VERSION, so it can be
+# re-run after a failure or a prompt change. The read path serves from an in-process copy
+# of the table and only generates (and stores) a description for a key it hasn't seen.
+
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.database import fetch_all, supabase
+from app.utils.openai_client import ask_openai, ask_openai_async
+from app.utils.precompute import is_failed, run_cli, run_precompute
+
+logger = logging.getLogger(__name__)
+
+RIASEC_TYPES = ("realistic", "investigative", "artistic", "social", "enterprising", "conventional")
+# Upper bounds (inclusive) on a type's quiz score for each band; scores run 5-25
+BANDS = (("low", 11), ("moderate", 18), ("high", 25))
+# Bump when the prompt changes; the job regenerates rows from older versions
+PROMPT_VERSION = 1
+TABLE = "personality_descriptions"
+CACHE_TTL_SECONDS = 3600
+
+_cache: Dict[str, str] = {}
+_cache_loaded: Optional[float] = None
+_cache_lock = threading.Lock()
+
+
+def score_band(score: Any) -> str:
+    try:
+        value = float(score)
+    except (TypeError, ValueError):
+        return "moderate"
+    for band, upper in BANDS:
+        if value <= upper:
+            return band
+    return BANDS[-1][0]
+
+
+def description_key(result_summary: str, trait_scores: Optional[Dict[str, Any]]) -> Tuple[str, str, str]:
+    """(key, top band, second band) for a quiz result."""
+    summary = (result_summary or "").strip().lower()
+    types = summary.split("-")
+    scores = {k.lower(): v for k, v in (trait_scores or {}).items()}
+    top_band = score_band(scores.get(types[0])) if types else "moderate"
+    second_band = score_band(scores.get(types[1])) if len(types) > 1 else top_band
+    return f"{summary}:{top_band}:{second_band}", top_band, second_band
+
+
+def build_prompt(result_summary: str, top_band: str, second_band: str) -> str:
+    types = [t.capitalize() for t in result_summary.split("-")]
+    strengths = f"{types[0]} ({top_band})"
+    if len(types) > 1:
+        strengths += f" and {types[1]} ({second_band})"
+    return f"""
+    You are UniVise's Personality Trait Advisor.
+    A student has completed a RIASEC Holland Code personality quiz and received the following results:
+    - Result_Summary: {result_summary}
+    - Top Personality Types (with how strongly they scored): {strengths}
+
+    Based on these results, provide a concise and clear explanation of what the result_summary (e.g artistic-investigate, realistic-social) means for the student's career and study choices.
+    Highlight the student's strengths and suggest suitable career paths and fields of study that align with their personality traits.
+    Keep the response under 300 words and use a friendly, encouraging tone.
+    Format the response in a string without markdown or code blocks.
+
+    Example Output:
+    This means you have a blend of Artistic and Investigative traits, making you well-suited for careers that involve creativity and analytical thinking. You likely enjoy exploring new ideas, expressing yourself through various art forms, and solving complex problems.
+    Suitable career paths include graphic design, architecture, writing, research, and roles in the tech industry that require innovative thinking.
+    Consider studying subjects like fine arts, computer science, psychology, or engineering to further develop your skills and interests.
+    """
+
+
+def _row(key: str, result_summary: str, top_band: str, second_band: str, description: str) -> Dict[str, Any]:
+    return {
+        "description_key": key,
+        "result_summary": result_summary,
+        "top_band": top_band,
+        "second_band": second_band,
+        "description": description,
+        "prompt_version": PROMPT_VERSION,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _load_table() -> List[Dict[str, Any]]:
+    return fetch_all(TABLE, "description_key,description,prompt_version")
+
+
+def get_description(result_summary: str, trait_scores: Optional[Dict[str, Any]]) -> str:
+    """Stored description for a quiz result; generated and stored only for an unseen key."""
+    global _cache, _cache_loaded
+    key, top_band, second_band = description_key(result_summary, trait_scores)
+    with _cache_lock:
+        if _cache_loaded is None or time.monotonic() - _cache_loaded > CACHE_TTL_SECONDS:
+            try:
+                _cache = {r["description_key"]: r["description"] for r in _load_table() if r.get("description")}
+                _cache_loaded = time.monotonic()
+            except Exception as e:
+                logger.warning("Could not load %s: %s", TABLE, e)
+        description = _cache.get(key)
+    if description:
+        return description
+
+    summary = key.split(":", 1)[0]
+    logger.info("No stored personality description for %s; generating", key)
+    description = ask_openai(build_prompt(summary, top_band, second_band))
+    if is_failed(description):
+        return description
+    try:
+        supabase.table(TABLE).upsert(
+            _row(key, summary, top_band, second_band, description), on_conflict="description_key"
+        ).execute()
+    except Exception as e:
+        logger.warning("Could not store personality description %s: %s", key, e)
+    with _cache_lock:
+        _cache[key] = description
+    return description
+
+
+# ---------------------------------------------------------------------------
+# Offline job
+# ---------------------------------------------------------------------------
+
+def all_keys() -> List[Tuple[str, str, str, str]]:
+    """(key, result_summary, top band, second band) for every reachable result."""
+    band_names = [band for band, _ in BANDS]
+    keys = []
+    for first, second in itertools.permutations(RIASEC_TYPES, 2):
+        summary = f"{first}-{second}"
+        for i, top_band in enumerate(band_names):
+            # The second type never outscores the first
+            for second_band in band_names[:i + 1]:
+                keys.append((f"{summary}:{top_band}:{second_band}", summary, top_band, second_band))
+    return keys
+
+
+async def generate_all(concurrency: int = 8, force: bool = False) -> Dict[str, int]:
+    current = set()
+    if not force:
+        current = {r["description_key"] for r in _load_table()
+                   if r.get("description") and r.get("prompt_version") == PROMPT_VERSION}
+    todo = [k for k in all_keys() if k[0] not in current]
+    logger.info("Generating %d personality descriptions (%d already current)", len(todo), len(current))
+
+    def store(key: Tuple[str, str, str, str], description: str):
+        supabase.table(TABLE).upsert(_row(*key, description), on_conflict="description_key").execute()
+
+    counts = await run_precompute(
+        todo,
+        lambda key: ask_openai_async(build_prompt(*key[1:])),
+        store,
+        concurrency,
+        describe=lambda key: key[0],
+    )
+    return {"total": len(all_keys()), "skipped": len(current), **counts}
+
+
+if __name__ == "__main__":
+    run_cli("Pre-generate RIASEC personality descriptions", generate_all)
@@ -0,0 +1,64 @@
+# app/utils/precompute.py
+# Shared runner for the offline LLM precompute jobs (personality descriptions, degree
+# summaries). A job works out which items are missing or stale, then hands them here:
+# each item is generated under a concurrency bound and stored as soon as it's done, so
+# a failed run keeps everything before it and the next run only redoes what's left.
+
+import argparse
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# ask_openai / ask_openai_async swallow API errors and return an apology instead
+FAILED_PREFIX = "Sorry"
+
+
+def is_failed(text: str) -> bool:
+    return not text or text.startswith(FAILED_PREFIX)
+
+
+async def run_precompute(
+    items: List[Any],
+    generate: Callable[[Any], Awaitable[str]],
+    store: Callable[[Any, str], None],
+    concurrency: int = 8,
+    describe: Callable[[Any], str] = str,
+) -> Dict[str, int]:
+    """
+    generate(item) -> text is awaited under the concurrency bound; store(item, text) is a
+    synchronous write, run in a thread. Failed generations and writes are counted, not raised.
+    describe(item) names an item in log lines.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(item) -> bool:
+        async with semaphore:
+            text = (await generate(item)).strip()
+        if is_failed(text):
+            return False
+        try:
+            await asyncio.to_thread(store, item, text)
+        except Exception as e:
+            logger.warning("Could not store %s: %s", describe(item), e)
+            return False
+        return True
+
+    results = await asyncio.gather(*(run_one(item) for item in items))
+    generated = sum(results)
+    return {"generated": generated, "failed": len(items) - generated}
+
+
+def run_cli(description: str, job: Callable[..., Awaitable[Dict[str, int]]]):
+    """Command line entry point: job(concurrency, force) -> counts with total/generated/failed/skipped."""
+    from app.utils.logging_config import configure_logging
+
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--force", action="store_true", help="regenerate everything")
+    args = parser.parse_args()
+    configure_logging()
+    counts = asyncio.run(job(args.concurrency, args.force))
+    print(f"✅ {counts['generated']} generated, {counts['skipped']} already current, "
+          f"{counts['failed']} failed (of {counts['total']})")
@@ -0,0 +1,115 @@
+# app/utils/roadmap_events.py
+# In-process pub/sub for roadmap background sections.
+# Background pipelines publish when a section lands (or fails) for a roadmap_id and
+# the SSE endpoint in the roadmap router streams those events to the client, so the
+# frontend only re-fetches the payload when something actually changed.
+#
+# Publishing is thread-safe: section saves run in executor threads, so events are
+# handed to each subscriber's event loop with call_soon_threadsafe.
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# How many roadmaps we keep recent events for (late subscribers get a replay)
+MAX_TRACKED_ROADMAPS = 512
+# Drop history for roadmaps that haven't had activity for this long (seconds)
+HISTORY_TTL = 15 * 60
+
+
+class _RoadmapChannel:
+    def __init__(self):
+        self.history: List[Dict[str, Any]] = []
+        self.pending: Optional[set] = None
+        self.subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self.touched = time.time()
+
+
+class RoadmapEventBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels: "OrderedDict[str, _RoadmapChannel]" = OrderedDict()
+
+    def _channel(self, roadmap_id: str) -> _RoadmapChannel:
+        ch = self._channels.get(roadmap_id)
+        if ch is None:
+            ch = _RoadmapChannel()
+            self._channels[roadmap_id] = ch
+        self._channels.move_to_end(roadmap_id)
+        ch.touched = time.time()
+        self._evict()
+        return ch
+
+    def _evict(self):
+        now = time.time()
+        while self._channels:
+            rid, ch = next(iter(self._channels.items()))
+            too_many = len(self._channels) > MAX_TRACKED_ROADMAPS
+            expired = now - ch.touched > HISTORY_TTL
+            if (too_many or expired) and not ch.subscribers:
+                self._channels.popitem(last=False)
+            else:
+                break
+
+    def expect(self, roadmap_id: str, sections: Iterable[str]):
+        """Register the sections that background tasks are about to generate."""
+        with self._lock:
+            ch = self._channel(roadmap_id)
+            ch.pending = set(ch.pending or set()) | set(sections)
+
+    def publish(self, roadmap_id: str, sections: Iterable[str], status: str = "ready", **extra):
+        """Record that sections landed (or failed) and notify subscribers."""
+        sections = list(sections)
+        with self._lock:
+            ch = self._channel(roadmap_id)
+            event = {
+                "type": "section",
+                "roadmap_id": roadmap_id,
+                "sections": sections,
+                "status": status,
+                "at": time.time(),
+                **extra,
+            }
+            events = [event]
+            if ch.pending is not None:
+                ch.pending.difference_update(sections)
+                event["pending"] = sorted(ch.pending)
+                if not ch.pending:
+                    events.append({"type": "complete", "roadmap_id": roadmap_id, "at": time.time()})
+                    ch.pending = None
+            ch.history.extend(events)
+            subscribers = list(ch.subscribers)
+
+        for loop, queue in subscribers:
+            for ev in events:
+                try:
+                    loop.call_soon_threadsafe(queue.put_nowait, ev)
+                except RuntimeError:
+                    # Subscriber's loop already closed
+                    pass
+
+    def subscribe(self, roadmap_id: str) -> Tuple[asyncio.Queue, List[Dict[str, Any]], Optional[List[str]]]:
+        """
+        Subscribe from inside a running event loop.
+        Returns (queue, replayed history, pending sections or None if nothing is expected).
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            ch = self._channel(roadmap_id)
+            ch.subscribers.append((loop, queue))
+            history = list(ch.history)
+            pending = sorted(ch.pending) if ch.pending is not None else None
+        return queue, history, pending
+
+    def unsubscribe(self, roadmap_id: str, queue: asyncio.Queue):
+        with self._lock:
+            ch = self._channels.get(roadmap_id)
+            if ch is None:
+                return
+            ch.subscribers = [(lp, q) for lp, q in ch.subscribers if q is not queue]
+
+
+roadmap_events = RoadmapEventBus()
@@ -3,11 +3,19 @@ SerpAPI Client for fetching company careers page URLs.
 Location: backend/app/utils/serpapi_client.py
 """
 
+import asyncio
+import logging
 import os
-import requests
-from typing import Optional, Dict, List
+import sqlite3
+import tempfile
+import threading
+import time
+import httpx
+from typing import Optional, Dict, List, Tuple
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 
 SERPAPI_KEY = os.getenv("SERPAPI_API_KEY")
@@ -30,105 +38,295 @@ MANUAL_COMPANY_URLS = {
     # Add more as you discover issues
 }
 
+# Persistent company -> careers URL cache (survives restarts, shared by workers on one host)
+CAREERS_CACHE_PATH = os.getenv(
+    "CAREERS_URL_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "univise_careers_urls.sqlite3"),
+)
+CAREERS_CACHE_TTL = 30 * 24 * 3600      # found URLs
+CAREERS_NEGATIVE_TTL = 24 * 3600        # "no URL found" results
+
 
-def get_company_careers_url(company_name: str) -> Optional[str]:
+class CareersUrlCache:
     """
-    Fetch the careers/graduate programs page URL for a given company using SerpAPI.
-    
-    Args:
-        company_name: Name of the company to search for
-        
-    Returns:
-        URL to the company's careers page, or None if not found
+    SQLite-backed cache of careers URLs keyed by normalised company name.
+    Negative entries (url IS NULL) remember companies with no usable result so we
+    don't repeat four SerpAPI searches for them on every request.
     """
-    # Check manual overrides first
-    if company_name in MANUAL_COMPANY_URLS:
-        print(f"✓ Using manual override for {company_name}")
-        return MANUAL_COMPANY_URLS[company_name]
-    
-    if not SERPAPI_KEY:
-        print("Warning: SERPAPI_API_KEY not configured")
-        return None
-    
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats = {"hits": 0, "negative_hits": 0, "misses": 0, "stores": 0, "errors": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS careers_urls (
+                    company_key TEXT PRIMARY KEY,
+                    company_name TEXT NOT NULL,
+                    url TEXT,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, company_name: str) -> Tuple[bool, Optional[str]]:
+        """Returns (found, url). found=True with url=None is a cached negative."""
+        key = normalise_company_name(company_name)
+        with self._lock:
+            try:
+                row = self._connect().execute(
+                    "SELECT url, expires_at FROM careers_urls WHERE company_key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning("✗ Careers URL cache read failed: %s", e)
+                self._stats["errors"] += 1
+                return False, None
+
+            if row is None or row[1] < time.time():
+                self._stats["misses"] += 1
+                return False, None
+            if row[0] is None:
+                self._stats["negative_hits"] += 1
+            else:
+                self._stats["hits"] += 1
+            return True, row[0]
+
+    def put(self, company_name: str, url: Optional[str]):
+        now = time.time()
+        ttl = CAREERS_CACHE_TTL if url else CAREERS_NEGATIVE_TTL
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO careers_urls VALUES (?, ?, ?, ?, ?)",
+                    (normalise_company_name(company_name), company_name, url, now, now + ttl),
+                )
+                conn.commit()
+                self._stats["stores"] += 1
+            except sqlite3.Error as e:
+                logger.warning("✗ Careers URL cache write failed: %s", e)
+                self._stats["errors"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            try:
+                now = time.time()
+                stats["entries"], stats["negative_entries"] = self._connect().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(url IS NULL), 0) FROM careers_urls WHERE expires_at >= ?",
+                    (now,),
+                ).fetchone()
+            except sqlite3.Error:
+                pass
+        lookups = stats["hits"] + stats["negative_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["negative_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+
+def normalise_company_name(company_name: str) -> str:
+    return " ".join(company_name.lower().split())
+
+
+careers_url_cache = CareersUrlCache(CAREERS_CACHE_PATH)
+
+
+def _search_queries(company_name: str) -> List[str]:
     # Clean company name (remove "Pty Ltd", "Australia", etc.)
     clean_name = company_name.replace(" Pty Ltd", "").replace(" Australia", "").replace(" Group", "").strip()
     
     # Try multiple search queries to find the best careers page
-    search_queries = [
+    return [
         f"{clean_name} careers site:*.com.au OR site:*.com",
         f"{clean_name} graduate programs Australia",
         f"{clean_name} jobs opportunities",
         f"{company_name} careers"
     ]
+
+
+def _search_params(query: str) -> Dict[str, object]:
+    return {
+        "q": query,
+        "api_key": SERPAPI_KEY,
+        "num": 8,  # Get top 8 results for better coverage
+        "gl": "au",  # Australia
+        "hl": "en"   # English
+    }
+
+
+def _pick_careers_link(organic_results: List[dict], company_name: str, allow_homepage: bool) -> Optional[str]:
+    # Priority 1: Look for URLs with strong career-related keywords
+    strong_keywords = ["/careers", "/jobs", "/graduate", "/internship", "/join-us", "/work-with-us"]
+    for result in organic_results:
+        link = result.get("link", "").lower()
+        if any(keyword in link for keyword in strong_keywords):
+            logger.debug("✓ Found careers URL for %s: %s", company_name, link)
+            return result.get("link")
     
-    for query_idx, query in enumerate(search_queries):
-        try:
-            params = {
-                "q": query,
-                "api_key": SERPAPI_KEY,
-                "num": 8,  # Get top 8 results for better coverage
-                "gl": "au",  # Australia
-                "hl": "en"   # English
-            }
-            
-            response = requests.get(SERPAPI_BASE_URL, params=params, timeout=15)
-            response.raise_for_status()
-            
-            data = response.json()
-            organic_results = data.get("organic_results", [])
-            
-            if not organic_results:
-                continue
-            
-            # Priority 1: Look for URLs with strong career-related keywords
-            strong_keywords = ["/careers", "/jobs", "/graduate", "/internship", "/join-us", "/work-with-us"]
-            for result in organic_results:
-                link = result.get("link", "").lower()
-                if any(keyword in link for keyword in strong_keywords):
-                    print(f"✓ Found careers URL for {company_name}: {link}")
-                    return result.get("link")
-            
-            # Priority 2: Look for titles with career keywords
-            title_keywords = ["career", "jobs", "graduate", "internship", "opportunities", "join", "work at", "work with"]
-            for result in organic_results:
-                title = result.get("title", "").lower()
-                link = result.get("link", "").lower()
-                
-                if any(keyword in title or keyword in link for keyword in title_keywords):
-                    print(f"✓ Found careers URL for {company_name}: {link}")
-                    return result.get("link")
-            
-            # Priority 3: If first query and we have results, return first result (likely homepage)
-            if query_idx == 0 and organic_results:
-                homepage = organic_results[0].get("link")
-                print(f"⚠ Using homepage for {company_name}: {homepage}")
-                return homepage
-                
-        except requests.exceptions.Timeout:
-            print(f"⏱ Timeout for '{query}' - trying next query")
-            continue
-        except requests.exceptions.RequestException as e:
-            print(f"✗ SerpAPI request failed for query '{query}': {e}")
-            continue
-        except Exception as e:
-            print(f"✗ Unexpected error in SerpAPI search: {e}")
-            continue
+    # Priority 2: Look for titles with career keywords
+    title_keywords = ["career", "jobs", "graduate", "internship", "opportunities", "join", "work at", "work with"]
+    for result in organic_results:
+        title = result.get("title", "").lower()
+        link = result.get("link", "").lower()
+        
+        if any(keyword in title or keyword in link for keyword in title_keywords):
+            logger.debug("✓ Found careers URL for %s: %s", company_name, link)
+            return result.get("link")
     
-    print(f"✗ No URL found for {company_name}")
+    # Priority 3: If first query and we have results, return first result (likely homepage)
+    if allow_homepage and organic_results:
+        homepage = organic_results[0].get("link")
+        logger.debug("⚠ Using homepage for %s: %s", company_name, homepage)
+        return homepage
     return None
 
 
-def get_multiple_company_urls(company_names: List[str]) -> Dict[str, Optional[str]]:
+# ---------------------------------------------------------------------------
+# Async resolver (one company, or many at once)
+# ---------------------------------------------------------------------------
+
+# Companies resolved at the same time per request
+MULTI_LOOKUP_CONCURRENCY = 8
+# Give up on a single company after this long
+COMPANY_DEADLINE_SECONDS = 12.0
+# Hard stop for the whole batch; unfinished companies come back as None
+BATCH_DEADLINE_SECONDS = 25.0
+
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        )
+    return _async_client
+
+
+async def _serp_search_async(query: str) -> List[dict]:
+    response = await _get_async_client().get(SERPAPI_BASE_URL, params=_search_params(query))
+    response.raise_for_status()
+    return response.json().get("organic_results", [])
+
+
+async def _search_careers_url_async(company_name: str) -> Tuple[Optional[str], bool]:
+    """
+    Run the SerpAPI searches for a company. The primary query may fall back to the
+    homepage; after it the fallback queries are raced: the first one that yields a
+    careers link wins and the rest are cancelled.
+    Returns (url, conclusive) where conclusive is False if any search errored.
+    """
+    primary, *fallbacks = _search_queries(company_name)
+    conclusive = True
+
+    try:
+        results = await _serp_search_async(primary)
+        link = _pick_careers_link(results, company_name, allow_homepage=True)
+        if link:
+            return link, True
+    except Exception as e:
+        logger.warning("✗ SerpAPI request failed for query '%s': %s", primary, e)
+        conclusive = False
+
+    async def run_fallback(query: str) -> Optional[str]:
+        return _pick_careers_link(await _serp_search_async(query), company_name, allow_homepage=False)
+
+    pending = {asyncio.create_task(run_fallback(q)): q for q in fallbacks}
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                query = pending.pop(task)
+                try:
+                    link = task.result()
+                except Exception as e:
+                    logger.warning("✗ SerpAPI request failed for query '%s': %s", query, e)
+                    conclusive = False
+                    continue
+                if link:
+                    return link, True
+    finally:
+        for task in pending:
+            task.cancel()
+
+    logger.info("✗ No URL found for %s", company_name)
+    return None, conclusive
+
+
+async def get_company_careers_url_async(company_name: str) -> Optional[str]:
     """
-    Fetch careers URLs for multiple companies.
+    Fetch the careers/graduate programs page URL for a given company using SerpAPI.
+    Manual overrides win, then the careers URL cache; "not found" is only cached
+    when every search actually completed.
+    
+    Args:
+        company_name: Name of the company to search for
+        
+    Returns:
+        URL to the company's careers page, or None if not found
+    """
+    # Check manual overrides first
+    if company_name in MANUAL_COMPANY_URLS:
+        return MANUAL_COMPANY_URLS[company_name]
+
+    # The cache is synchronous sqlite; keep it off the event loop
+    found, cached_url = await asyncio.to_thread(careers_url_cache.get, company_name)
+    if found:
+        return cached_url
+
+    if not SERPAPI_KEY:
+        logger.warning("Warning: SERPAPI_API_KEY not configured")
+        return None
+
+    url, conclusive = await _search_careers_url_async(company_name)
+    if url or conclusive:
+        await asyncio.to_thread(careers_url_cache.put, company_name, url)
+    return url
+
+
+async def get_multiple_company_urls(company_names: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Fetch careers URLs for multiple companies concurrently.
     
     Args:
         company_names: List of company names
         
     Returns:
-        Dictionary mapping company names to their careers URLs
+        Dictionary mapping company names to their careers URLs (None for companies
+        that weren't found or didn't finish before the deadline)
     """
-    results = {}
-    for company in company_names:
-        results[company] = get_company_careers_url(company)
-    return results
\ No newline at end of file
+    semaphore = asyncio.Semaphore(MULTI_LOOKUP_CONCURRENCY)
+    unique_names = list(dict.fromkeys(company_names))
+
+    async def resolve(company: str) -> Optional[str]:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(
+                    get_company_careers_url_async(company), timeout=COMPANY_DEADLINE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                logger.debug("⏱ Deadline reached for %s", company)
+                return None
+
+    tasks = {company: asyncio.create_task(resolve(company)) for company in unique_names}
+    if tasks:
+        await asyncio.wait(tasks.values(), timeout=BATCH_DEADLINE_SECONDS)
+
+    results: Dict[str, Optional[str]] = {}
+    for company, task in tasks.items():
+        if task.done() and not task.cancelled() and task.exception() is None:
+            results[company] = task.result()
+        else:
+            task.cancel()
+            results[company] = None
+    return results
@@ -0,0 +1,23 @@
+# app/utils/sse.py
+# Server-sent events shared by the streaming endpoints (roadmap events, recommendation
+# drafts, switch advisor). Every event is a dict with a "type", sent as the SSE event name.
+
+import json
+from typing import Any, AsyncIterator, Dict
+
+from fastapi.responses import StreamingResponse
+
+KEEP_ALIVE = ": keep-alive\n\n"
+
+
+def sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    # X-Accel-Buffering stops nginx-style proxies holding events back
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
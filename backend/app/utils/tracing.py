@@ -0,0 +1,356 @@
+# app/utils/tracing.py
+# Lightweight request tracing: spans with parent/child links carried in a
+# contextvar, so asyncio tasks and asyncio.to_thread calls started inside a request
+# inherit its trace automatically.
+#
+#   with span("fetch_degree", kind="db"): ...          sync or `async with`
+#   @traced(kind="llm")                                 sync or async functions
+#   traced_task("roadmap.flexibility", coro)            background work in the request's trace
+#
+# Finished spans go to an exporter picked by TRACE_EXPORTER:
+#   none (default) | console | file (JSON lines at TRACE_FILE_PATH) | otlp (OTLP/HTTP JSON to TRACE_OTLP_ENDPOINT)
+# Export runs on a daemon thread behind a bounded queue, so it never blocks a request.
+# Requests slower than TRACE_SLOW_SECONDS log their span breakdown regardless of exporter.
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import secrets
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_FILE_PATH = os.getenv("TRACE_FILE_PATH", os.path.join(tempfile.gettempdir(), "univise-traces.jsonl"))
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_SLOW_SECONDS = float(os.getenv("TRACE_SLOW_SECONDS", "5"))
+# Fraction of successful, fast requests that get an access log line
+REQUEST_LOG_SAMPLE_RATE = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "0.1"))
+SERVICE_NAME = "univise-backend"
+
+EXPORT_QUEUE_SIZE = 10000
+EXPORT_BATCH_SIZE = 256
+EXPORT_FLUSH_SECONDS = 1.0
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds: 1 internal, 2 server, 3 client
+_OTLP_KIND = {"request": 2, "db": 3, "llm": 3, "http": 3}
+
+
+@dataclass
+class _Trace:
+    trace_id: str
+    finished: List["Span"] = field(default_factory=list)
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    trace: _Trace
+    parent_id: Optional[str]
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start: float = field(default_factory=time.time)
+    duration: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "duration_ms": round((self.duration or 0) * 1000, 2),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def current_trace_id() -> Optional[str]:
+    s = _current.get()
+    return s.trace_id if s else None
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[tuple]:
+    """W3C traceparent -> (trace_id, parent span id), or None if malformed."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+class span:
+    """Context manager (sync and async) that records one span under the current one."""
+
+    def __init__(self, name: str, kind: str = "internal", trace_id: Optional[str] = None,
+                 parent_id: Optional[str] = None, **attributes):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.span: Optional[Span] = None
+        self._token = None
+
+    def __enter__(self) -> Span:
+        parent = _current.get()
+        if parent is not None and self.trace_id is None:
+            trace, parent_id = parent.trace, parent.span_id
+        else:
+            trace, parent_id = _Trace(self.trace_id or secrets.token_hex(16)), self.parent_id
+        self.span = Span(self.name, self.kind, trace, parent_id, attributes=dict(self.attributes))
+        self._perf_start = time.perf_counter()
+        self._token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        s = self.span
+        s.duration = time.perf_counter() - self._perf_start
+        if exc is not None:
+            s.error = f"{exc_type.__name__}: {exc}"
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            # Exited in a different context (generator closed elsewhere); just drop it
+            _current.set(None)
+        s.trace.finished.append(s)
+        _exporter.submit(s)
+        return False
+
+    async def __aenter__(self) -> Span:
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+def traced(name: Optional[str] = None, kind: str = "internal"):
+    """Decorator: run the function inside a span named after it."""
+
+    def decorate(func):
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, kind=kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind=kind):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+async def traced_task(name: str, coro, **attributes):
+    """Await coro inside a background span linked to the trace that scheduled it."""
+    with span(name, kind="background", **attributes):
+        return await coro
+
+
+def format_breakdown(root: Span) -> str:
+    """Indented span tree of everything in root's trace that has finished."""
+    spans = root.trace.finished
+    children: Dict[Optional[str], List[Span]] = {}
+    for s in spans:
+        children.setdefault(s.parent_id, []).append(s)
+
+    lines: List[str] = []
+
+    def walk(s: Span, depth: int):
+        offset = (s.start - root.start) * 1000
+        err = f" ERROR {s.error}" if s.error else ""
+        lines.append(f"{'  ' * depth}{s.name} [{s.kind}] +{offset:.0f}ms {s.duration * 1000:.0f}ms{err}")
+        for child in sorted(children.get(s.span_id, []), key=lambda c: c.start):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Exporters
+# ---------------------------------------------------------------------------
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_payload(spans: List[Span]) -> Dict[str, Any]:
+    otlp_spans = []
+    for s in spans:
+        start_ns = int(s.start * 1e9)
+        item = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": _OTLP_KIND.get(s.kind, 1),
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(start_ns + int((s.duration or 0) * 1e9)),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in {"span.kind": s.kind, **s.attributes}.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            item["parentSpanId"] = s.parent_id
+        otlp_spans.append(item)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "app.utils.tracing"}, "spans": otlp_spans}],
+        }]
+    }
+
+
+class SpanExporter:
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.dropped = 0
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, s: Span):
+        if self.mode == "none":
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(s)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        client = httpx.Client(timeout=5) if self.mode == "otlp" else None
+
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + EXPORT_FLUSH_SECONDS
+            while len(batch) < EXPORT_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch, client)
+            except Exception as e:
+                logger.warning("Export of %d spans failed: %s", len(batch), e)
+
+    def _write(self, batch: List[Span], client):
+        if self.mode == "file":
+            with open(TRACE_FILE_PATH, "a") as f:
+                for s in batch:
+                    f.write(json.dumps(s.to_dict(), default=str) + "\n")
+        elif self.mode == "otlp":
+            client.post(TRACE_OTLP_ENDPOINT, json=_otlp_payload(batch))
+        elif self.mode == "console":
+            for s in batch:
+                logger.info("span %s", s.name, extra={"data": s.to_dict()})
+
+
+_exporter = SpanExporter(TRACE_EXPORTER)
+
+
+# ---------------------------------------------------------------------------
+# Integrations
+# ---------------------------------------------------------------------------
+
+async def tracing_middleware(request, call_next):
+    """HTTP middleware: one request span per call, trace id echoed in X-Trace-Id."""
+    incoming = parse_traceparent(request.headers.get("traceparent"))
+    trace_id, parent_id = incoming if incoming else (None, None)
+    route = request.url.path
+    with span(f"{request.method} {route}", kind="request", trace_id=trace_id, parent_id=parent_id,
+              method=request.method, path=route) as s:
+        response = await call_next(request)
+        s.set(status_code=response.status_code)
+        # Name by route template once routing has matched, so ids don't explode span names
+        matched = request.scope.get("route")
+        if matched is not None and getattr(matched, "path", None):
+            s.name = f"{request.method} {matched.path}"
+    response.headers["X-Trace-Id"] = s.trace_id
+    fields = {"method": request.method, "route": s.name, "status": response.status_code,
+              "duration_ms": round(s.duration * 1000, 1)}
+    if s.duration >= TRACE_SLOW_SECONDS:
+        logger.warning("Slow request %s %.1fs\n%s", s.name, s.duration, format_breakdown(s), extra={"data": fields})
+    elif response.status_code >= 500:
+        logger.warning("Request failed %s %d", s.name, response.status_code, extra={"data": fields})
+    else:
+        logger.info("Request %s %d", s.name, response.status_code,
+                    extra={"data": fields, "sample_rate": REQUEST_LOG_SAMPLE_RATE})
+    return response
+
+
+class TracingTransport(httpx.BaseTransport):
+    """httpx transport wrapper that records a span per outgoing request."""
+
+    def __init__(self, inner: httpx.BaseTransport, kind: str):
+        self._inner = inner
+        self._kind = kind
+
+    def handle_request(self, request):
+        path = request.url.path
+        name = f"{self._kind} {request.method} {path.rsplit('/', 1)[-1] or path}"
+        with span(name, kind=self._kind, method=request.method, path=path) as s:
+            response = self._inner.handle_request(request)
+            s.set(status_code=response.status_code)
+            return response
+
+    def close(self):
+        self._inner.close()
+
+
+def instrument_httpx_client(client: httpx.Client, kind: str) -> bool:
+    """Wrap a sync httpx.Client's transport so its requests become spans."""
+    transport = getattr(client, "_transport", None)
+    if transport is None or isinstance(transport, TracingTransport):
+        return False
+    client._transport = TracingTransport(transport, kind)
+    return True
@@ -0,0 +1,189 @@
+# app/utils/transcript_parser.py
+# Rule-based parser for UNSW academic transcripts / statements.
+# Transcripts are regular: term headers ("Term 1 2021", "Semester 2 2018", "Summer Term
+# 2022"), one line per course (COMP1511 Programming Fundamentals 6.00 87 HD) and WAM
+# lines. Parsing that structure takes milliseconds, so report analysis only needs the
+# LLM for the free-form parts (name, program, evaluation, advice).
+
+import re
+from typing import Any, Dict, List, Optional
+
+from app.utils.tracing import traced
+
+COURSE_CODE_RE = re.compile(r"\b([A-Z]{4}\d{4})\b")
+TERM_RE = re.compile(
+    r"^\s*((?:Summer\s+)?(?:Term|Semester|Hexamester|Trimester)\s*[0-9T]?\s*,?\s*(?:19|20)\d{2}"
+    r"|(?:19|20)\d{2}\s+(?:Summer\s+)?(?:Term|Semester|Hexamester|Trimester)\s*[0-9T]?)\b",
+    re.IGNORECASE,
+)
+TERM_WAM_RE = re.compile(r"\bTerm\s+WAM\b[:\s]*(\d{1,3}(?:\.\d+)?)", re.IGNORECASE)
+OVERALL_WAM_RE = re.compile(
+    r"\b(?:Overall\s+|Career\s+|Cumulative\s+|Program\s+)?WAM\b[:\s]*(\d{1,3}(?:\.\d+)?)",
+    re.IGNORECASE,
+)
+NUMBER_RE = re.compile(r"^\d{1,3}(?:\.\d{1,2})?$")
+
+# Grades that award credit
+PASS_GRADES = {"HD", "DN", "CR", "PS", "SY", "PC", "RC", "RS", "CP", "EC", "TR"}
+# Grades that don't (fails / withdrawals)
+FAIL_GRADES = {"FL", "UF", "AF", "AW", "NC", "FY", "W", "WD", "WJ", "KF"}
+ALL_GRADES = PASS_GRADES | FAIL_GRADES | {"NF", "WC", "LE", "PE"}
+
+VALID_UOC = {1, 2, 3, 4, 6, 8, 9, 12, 18, 24}
+
+# Fewer course lines than this means the text isn't a transcript we understand
+MIN_PARSED_COURSES = 3
+
+
+def _parse_course_line(line: str) -> Optional[Dict[str, Any]]:
+    match = COURSE_CODE_RE.search(line)
+    if not match:
+        return None
+
+    tokens = line[match.end():].split()
+    numbers: List[str] = []
+    grade = None
+
+    # Peel result columns (UOC / mark / grade) off the end of the line
+    while tokens:
+        tok = tokens[-1].strip(",;")
+        if grade is None and tok.upper() in ALL_GRADES:
+            grade = tok.upper()
+        elif NUMBER_RE.match(tok) and len(numbers) < 2:
+            numbers.insert(0, tok)
+        else:
+            break
+        tokens.pop()
+
+    title = " ".join(tokens).strip(" -–|")
+    if not title or (grade is None and not numbers):
+        return None
+
+    uoc = None
+    mark = None
+    if len(numbers) == 2:
+        first, second = (float(n) for n in numbers)
+        if first in VALID_UOC:
+            uoc, mark = int(first), second
+        elif second in VALID_UOC:
+            mark, uoc = first, int(second)
+    elif len(numbers) == 1:
+        value = float(numbers[0])
+        # "6.00" style is the units column; a bare integer is the mark
+        if numbers[0].endswith(".00") and value in VALID_UOC:
+            uoc = int(value)
+        else:
+            mark = value
+    if mark is not None and not 0 <= mark <= 100:
+        mark = None
+
+    return {
+        "code": match.group(1),
+        "title": title,
+        "uoc": uoc if uoc is not None else 6,
+        "mark": mark,
+        "grade": grade,
+    }
+
+
+@traced(kind="cpu")
+def parse_unsw_transcript(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse transcript text into terms, courses, UOC and WAM.
+    Returns None when the text doesn't look like a UNSW transcript.
+    Result also carries `unparsed_text`: lines that weren't course/term/WAM lines
+    (header, program details) for the LLM to read.
+    """
+    if not text:
+        return None
+
+    terms: List[Dict[str, Any]] = []
+    current: Optional[Dict[str, Any]] = None
+    overall_wam = None
+    unparsed: List[str] = []
+    seen_courses = 0
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        term_wam = TERM_WAM_RE.search(stripped)
+        if term_wam:
+            if current is not None:
+                current["wam"] = float(term_wam.group(1))
+            continue
+
+        term_match = TERM_RE.match(stripped)
+        if term_match and not COURSE_CODE_RE.search(stripped):
+            current = {"term": " ".join(term_match.group(1).split()), "wam": None, "courses": []}
+            terms.append(current)
+            continue
+
+        course = _parse_course_line(stripped)
+        if course:
+            if current is None:
+                current = {"term": "Unknown term", "wam": None, "courses": []}
+                terms.append(current)
+            current["courses"].append(course)
+            seen_courses += 1
+            continue
+
+        wam_match = OVERALL_WAM_RE.search(stripped)
+        if wam_match:
+            overall_wam = float(wam_match.group(1))
+            continue
+
+        unparsed.append(stripped)
+
+    if seen_courses < MIN_PARSED_COURSES:
+        return None
+
+    terms = [t for t in terms if t["courses"]]
+    courses = [c for t in terms for c in t["courses"]]
+
+    uoc_attempted = sum(c["uoc"] for c in courses if c["grade"] or c["mark"] is not None)
+    uoc_completed = sum(c["uoc"] for c in courses if is_course_completed(c))
+
+    # WAM: use the transcript's own figure, otherwise UOC-weighted mean of marked courses
+    if overall_wam is None:
+        marked = [c for c in courses if c["mark"] is not None]
+        total_uoc = sum(c["uoc"] for c in marked)
+        if total_uoc:
+            overall_wam = round(sum(c["mark"] * c["uoc"] for c in marked) / total_uoc, 2)
+
+    return {
+        "wam": overall_wam,
+        "uoc_attempted": uoc_attempted,
+        "uoc_completed": uoc_completed,
+        "term_summaries": terms,
+        "unparsed_text": "\n".join(unparsed),
+    }
+
+
+def is_course_completed(course: Dict[str, Any]) -> bool:
+    if course.get("grade"):
+        return course["grade"] in PASS_GRADES
+    return course.get("mark") is not None and course["mark"] >= 50
+
+
+def rank_courses(parsed: Dict[str, Any]) -> Dict[str, List[str]]:
+    """High achievements (HD / top marks) and low performers, deterministic."""
+    courses = [c for t in parsed["term_summaries"] for c in t["courses"]]
+    marked = sorted(
+        (c for c in courses if c["mark"] is not None),
+        key=lambda c: c["mark"],
+        reverse=True,
+    )
+
+    def label(c):
+        result = " ".join(str(v) for v in (int(c["mark"]) if c["mark"] is not None else None, c["grade"]) if v is not None)
+        return f"{c['code']} {c['title']} ({result})"
+
+    high = [c for c in courses if c["grade"] == "HD"] or marked[:3]
+    low = [c for c in courses if c["grade"] in FAIL_GRADES]
+    low += [c for c in marked[::-1][:2] if c not in high and c not in low]
+    return {
+        "high_achievements": [label(c) for c in high],
+        "low_performance": [label(c) for c in low],
+    }
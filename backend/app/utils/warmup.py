@@ -0,0 +1,184 @@
+# app/utils/warmup.py
+# Startup warm-up and readiness. Before a worker takes traffic it opens its
+# connections and loads what the hot endpoints need, so the first users don't pay
+# for it:
+#
+#   db        one cheap query, so the PostgREST connection is open and kept alive
+#   llm       import the openai SDK and create the (lazy) OpenAI clients
+#   catalog   map the catalog artifact and ask the kernel to page it in
+#   degrees   build the final-plan degree shortlist index
+#   parsers   run the prerequisite / transcript parsers once, so their regexes are compiled
+#   equivalences  build the course equivalence index used by transfer and prerequisite matching
+#
+# Components warm concurrently under WARMUP_TIMEOUT_SECONDS. By default the app's
+# startup waits for them (uvicorn doesn't bind the port until startup finishes, which
+# is what a Procfile platform routes on). With WARMUP_BLOCKING=false the port binds
+# immediately and /health/ready reports 503 until the required components are ready.
+# Failed components are retried (at most every WARMUP_RETRY_SECONDS) when
+# readiness is polled.
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+from app.utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+WARMUP_BLOCKING = os.getenv("WARMUP_BLOCKING", "true").lower() not in ("0", "false", "no")
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "20"))
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "10"))
+
+# Readiness requires these; the rest degrade gracefully (lazy load on first use)
+REQUIRED_COMPONENTS = {"db"}
+
+SAMPLE_CONDITIONS = "Prerequisite: COMP1511 and (COMP1521 or COMP1531 or DPST1092)"
+SAMPLE_TRANSCRIPT = (
+    "Term 1 2024\n"
+    "COMP1511 Programming Fundamentals 6 85 HD\n"
+    "MATH1131 Mathematics 1A 6 72 CR\n"
+    "ENGG1000 Engineering Design 6 65 CR\n"
+    "Term WAM: 74.0\n"
+)
+
+
+def _warm_db() -> str:
+    from app.utils.database import supabase
+
+    supabase.table("unsw_degrees_final").select("degree_code").limit(1).execute()
+    return "connection open"
+
+
+def _warm_llm() -> str:
+    from app.utils.openai_client import get_async_openai, get_openai
+
+    get_openai()
+    get_async_openai()
+    return "clients created"
+
+
+def _warm_catalog() -> Optional[str]:
+    from app.utils.catalog_artifact import CATALOG_ARTIFACT_PATH, get_catalog
+
+    catalog = get_catalog()
+    if catalog is None:
+        # Not built on this host: lookups fall back to Supabase
+        return None
+    catalog.prefault()
+    counts = catalog.counts()
+    return f"{CATALOG_ARTIFACT_PATH} ({counts['courses']} courses, {counts['degrees']} degrees)"
+
+
+def _warm_degrees() -> str:
+    from app.routers.final_plan_service import get_degree_index
+
+    return f"{len(get_degree_index()['docs'])} degrees indexed"
+
+
+def _warm_parsers() -> str:
+    from app.routers.compare_programs_helpers import parse_prerequisites
+    from app.utils.transcript_parser import parse_unsw_transcript
+
+    parse_prerequisites(SAMPLE_CONDITIONS)
+    parse_unsw_transcript(SAMPLE_TRANSCRIPT)
+    return "regexes compiled"
+
+
+def _warm_equivalences() -> str:
+    from app.routers.compare_programs_helpers import get_equivalence_index
+
+    counts = get_equivalence_index().counts()
+    return f"{counts['courses']} courses in {counts['groups']} groups"
+
+
+COMPONENTS: Dict[str, Callable[[], Optional[str]]] = {
+    "db": _warm_db,
+    "llm": _warm_llm,
+    "catalog": _warm_catalog,
+    "degrees": _warm_degrees,
+    "parsers": _warm_parsers,
+    "equivalences": _warm_equivalences,
+}
+
+# state: pending | warming | ready | skipped (nothing to load) | failed
+_components: Dict[str, Dict[str, Any]] = {
+    name: {"state": "pending", "duration_ms": None, "detail": None} for name in COMPONENTS
+}
+_warmup_ms: Optional[float] = None
+_last_retry = 0.0
+_task: Optional[asyncio.Task] = None
+
+
+async def _warm_component(name: str):
+    component = _components[name]
+    component["state"] = "warming"
+    start = time.perf_counter()
+    try:
+        with span(f"warmup.{name}", kind="internal"):
+            detail = await asyncio.to_thread(COMPONENTS[name])
+        component["state"] = "ready" if detail is not None else "skipped"
+        component["detail"] = detail
+    except Exception as e:
+        component["state"] = "failed"
+        component["detail"] = f"{type(e).__name__}: {e}"
+        logger.warning("Warm-up of %s failed: %s", name, e)
+    finally:
+        component["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+
+async def warm_up(names=None):
+    """Warm the given components (default: all) concurrently, bounded by WARMUP_TIMEOUT_SECONDS."""
+    global _warmup_ms
+    names = list(names or COMPONENTS)
+    start = time.perf_counter()
+
+    tasks = [asyncio.create_task(_warm_component(name)) for name in names]
+    done, pending = await asyncio.wait(tasks, timeout=WARMUP_TIMEOUT_SECONDS)
+    for name, task in zip(names, tasks):
+        if task in pending:
+            # The worker thread can't be interrupted; it keeps going and records its own outcome
+            _components[name]["detail"] = f"still warming after {WARMUP_TIMEOUT_SECONDS:g}s"
+
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+    if _warmup_ms is None:
+        _warmup_ms = elapsed_ms
+    logger.info(
+        "Warm-up finished in %.0fms", elapsed_ms,
+        extra={"data": {name: _components[name]["state"] for name in names}},
+    )
+
+
+def is_ready() -> bool:
+    return _warmup_ms is not None and all(
+        _components[name]["state"] in ("ready", "skipped") for name in REQUIRED_COMPONENTS
+    )
+
+
+def readiness() -> Dict[str, Any]:
+    """Snapshot for /health/ready. Kicks off a retry of failed components if one is due."""
+    global _last_retry, _task
+    failed = [n for n, c in _components.items() if c["state"] == "failed"]
+    now = time.monotonic()
+    if failed and _warmup_ms is not None and (_task is None or _task.done()) \
+            and now - _last_retry >= WARMUP_RETRY_SECONDS:
+        _last_retry = now
+        _task = asyncio.get_running_loop().create_task(warm_up(failed))
+
+    return {
+        "ready": is_ready(),
+        "warmup_ms": _warmup_ms,
+        "components": {name: dict(c, required=name in REQUIRED_COMPONENTS) for name, c in _components.items()},
+    }
+
+
+@asynccontextmanager
+async def warmup_lifespan(app):
+    global _task
+    if WARMUP_BLOCKING:
+        await warm_up()
+    else:
+        _task = asyncio.create_task(warm_up())
+    yield
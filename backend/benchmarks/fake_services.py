@@ -0,0 +1,356 @@
+"""
+Local stand-ins for the services the backend talks to, for benchmarking.
+
+One Starlette app serves:
+    /rest/v1/{table}          in-memory PostgREST subset (the filters/verbs our code uses)
+    /auth/v1/user             Supabase auth: any bearer token is the benchmark user
+    /v1/chat/completions      OpenAI-compatible chat (plain + streaming) with configurable latency
+    /v1/traces                OTLP/HTTP collector stand-in (counts received spans)
+
+Point the backend at it with SUPABASE_URL=http://host:port and
+OPENAI_BASE_URL=http://host:port/v1 (the OpenAI SDK reads that variable).
+"""
+
+import asyncio
+import copy
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+BENCH_USER_ID = "00000000-0000-4000-8000-00000000be4c"
+
+# Reserved PostgREST query params (everything else is a column filter)
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# ---------------------------------------------------------------------------
+# In-memory PostgREST
+# ---------------------------------------------------------------------------
+
+class FakeStore:
+    def __init__(self):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def seed(self, data: Dict[str, List[Dict[str, Any]]]):
+        with self.lock:
+            for table, rows in data.items():
+                self.tables[table] = [dict(r) for r in rows]
+
+
+def _coerce(value: Any, raw: str) -> Tuple[Any, Any]:
+    """Make a filter string comparable with a stored value."""
+    if isinstance(value, bool):
+        return value, raw.lower() == "true"
+    if isinstance(value, (int, float)):
+        try:
+            return value, float(raw)
+        except ValueError:
+            return str(value), raw
+    return ("" if value is None else str(value)), raw
+
+
+def _like(pattern: str, flags=0) -> re.Pattern:
+    return re.compile("^" + re.escape(pattern).replace(r"\*", ".*").replace("%", ".*") + "$", flags | re.DOTALL)
+
+
+def _contains(value: Any, raw: str) -> bool:
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return False
+    try:
+        wanted = json.loads(raw)
+    except ValueError:
+        wanted = raw.strip("{}").split(",")
+    if isinstance(value, list) and isinstance(wanted, list):
+        return all(
+            any(w == v or (isinstance(w, dict) and isinstance(v, dict) and w.items() <= v.items()) for v in value)
+            for w in wanted
+        )
+    if isinstance(value, dict) and isinstance(wanted, dict):
+        return wanted.items() <= value.items()
+    return False
+
+
+def _matches(row: Dict[str, Any], column: str, expr: str) -> bool:
+    negate = expr.startswith("not.")
+    if negate:
+        expr = expr[4:]
+    op, _, raw = expr.partition(".")
+    value = row.get(column)
+
+    if op == "is":
+        result = value is None if raw == "null" else value is (raw == "true")
+    elif op == "in":
+        options = [o.strip().strip('"') for o in raw.strip("()").split(",")]
+        result = ("" if value is None else str(value)) in options
+    elif op in ("like", "ilike"):
+        result = value is not None and bool(
+            _like(raw, re.IGNORECASE if op == "ilike" else 0).match(str(value))
+        )
+    elif op == "cs":
+        result = _contains(value, raw)
+    else:
+        left, right = _coerce(value, raw)
+        try:
+            result = {
+                "eq": lambda: left == right,
+                "neq": lambda: left != right,
+                "gt": lambda: value is not None and left > right,
+                "gte": lambda: value is not None and left >= right,
+                "lt": lambda: value is not None and left < right,
+                "lte": lambda: value is not None and left <= right,
+            }[op]()
+        except (KeyError, TypeError):
+            result = False
+    return not result if negate else result
+
+
+def _project(row: Dict[str, Any], select: str) -> Dict[str, Any]:
+    columns = [c.strip() for c in select.split(",") if c.strip()]
+    if not columns or "*" in columns:
+        return copy.deepcopy(row)
+    return {c: copy.deepcopy(row.get(c)) for c in columns}
+
+
+def _sort(rows: List[Dict[str, Any]], order: str) -> List[Dict[str, Any]]:
+    for part in reversed(order.split(",")):
+        column, *mods = part.split(".")
+        desc = "desc" in mods
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: r[column], reverse=desc)
+        rows = present + missing
+    return rows
+
+
+def _pgrst_error(status: int, code: str, message: str, details: str = "") -> JSONResponse:
+    return JSONResponse({"code": code, "message": message, "details": details, "hint": None}, status_code=status)
+
+
+async def rest_handler(request: Request) -> Response:
+    store: FakeStore = request.app.state.store
+    table = request.path_params["table"]
+    params = request.query_params
+    filters = [(k, v) for k, v in params.multi_items() if k not in RESERVED_PARAMS]
+    prefer = request.headers.get("prefer", "")
+    wants_object = "vnd.pgrst.object" in request.headers.get("accept", "")
+    body = await request.body()
+    payload = json.loads(body) if body else None
+
+    with store.lock:
+        store.requests += 1
+        rows = store.tables.setdefault(table, [])
+        matched = [r for r in rows if all(_matches(r, k, v) for k, v in filters)]
+
+        if request.method in ("GET", "HEAD"):
+            if "order" in params:
+                matched = _sort(matched, params["order"])
+            total = len(matched)
+            offset = int(params.get("offset", 0))
+            limit = int(params["limit"]) if "limit" in params else None
+            page = matched[offset:offset + limit if limit is not None else None]
+            result = [_project(r, params.get("select", "*")) for r in page]
+
+        elif request.method == "POST":
+            new_rows = payload if isinstance(payload, list) else [payload]
+            conflict_cols = params.get("on_conflict", "id").split(",")
+            upsert = "resolution=merge-duplicates" in prefer
+            result = []
+            for new in new_rows:
+                existing = None
+                if upsert and all(new.get(c) is not None for c in conflict_cols):
+                    existing = next(
+                        (r for r in rows if all(r.get(c) == new.get(c) for c in conflict_cols)), None
+                    )
+                if existing is not None:
+                    existing.update(copy.deepcopy(new))
+                    result.append(copy.deepcopy(existing))
+                else:
+                    row = {"id": str(uuid.uuid4()), "created_at": _now(), **copy.deepcopy(new)}
+                    rows.append(row)
+                    result.append(copy.deepcopy(row))
+            total = len(result)
+
+        elif request.method == "PATCH":
+            for r in matched:
+                r.update(copy.deepcopy(payload))
+            result = [copy.deepcopy(r) for r in matched]
+            total = len(result)
+
+        elif request.method == "DELETE":
+            ids = {id(r) for r in matched}
+            store.tables[table] = [r for r in rows if id(r) not in ids]
+            result = [copy.deepcopy(r) for r in matched]
+            total = len(result)
+
+        else:
+            return Response(status_code=405)
+
+    headers = {}
+    if "count=" in prefer:
+        end = max(len(result) - 1, 0)
+        headers["Content-Range"] = f"0-{end}/{total}"
+
+    if request.method == "HEAD":
+        return Response(status_code=200, headers=headers)
+    if "return=minimal" in prefer and request.method != "GET":
+        return Response(status_code=201 if request.method == "POST" else 204, headers=headers)
+
+    if wants_object:
+        if len(result) != 1:
+            return _pgrst_error(
+                406, "PGRST116",
+                "JSON object requested, multiple (or no) rows returned",
+                f"The result contains {len(result)} rows",
+            )
+        return JSONResponse(result[0], headers=headers)
+
+    return JSONResponse(result, status_code=201 if request.method == "POST" else 200, headers=headers)
+
+
+async def auth_user_handler(request: Request) -> Response:
+    if not request.headers.get("authorization", "").startswith("Bearer "):
+        return JSONResponse({"message": "missing token"}, status_code=401)
+    return JSONResponse({
+        "id": BENCH_USER_ID,
+        "aud": "authenticated",
+        "role": "authenticated",
+        "email": "bench@example.com",
+        "app_metadata": {"provider": "email"},
+        "user_metadata": {"student_type": "university"},
+        "created_at": "2025-01-01T00:00:00+00:00",
+    })
+
+
+# ---------------------------------------------------------------------------
+# Fake LLM
+# ---------------------------------------------------------------------------
+
+@dataclass
+class LLMConfig:
+    latency: float = 0.8          # seconds before a non-streamed response
+    jitter: float = 0.2           # +/- uniform jitter on latency
+    token_delay: float = 0.01     # seconds between streamed chunks
+    stream_tokens: int = 60
+
+    def delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+
+# One JSON object carrying every top-level key our prompts ask for, so each caller's
+# assert_keys / .get() passes regardless of which prompt it sent.
+UNIVERSAL_PAYLOAD: Dict[str, Any] = {
+    "summary": "Benchmark summary.",
+    "entry_requirements": {"atar": 90, "selection_rank": "90", "subjects": [], "notes": ""},
+    "program_structure": [],
+    "specialisations": [],
+    "capstone": {"courses": [], "description": ""},
+    "flexibility": {"options": []},
+    "industry": {"overview": ""},
+    "industry_experience": {"mandatory_placements": {"required": False, "details": ""}, "internship_programs": []},
+    "industry_societies": {"societies": []},
+    "career_pathways": {"entry_level": {"roles": []}, "mid_career": {"roles": []}, "senior": {"roles": []}},
+    "societies": [],
+    "honours": {},
+    "top_5_programs": [],
+    "easy_switches": [],
+    "choices": [],
+    "explanation": "Benchmark explanation.",
+    "strengths": [],
+    "weaknesses": [],
+    "evaluation": "",
+    "recommendation": "",
+    "source": "https://www.handbook.unsw.edu.au",
+}
+
+
+def _completion(model: str, content: str) -> Dict[str, Any]:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 100, "completion_tokens": 100, "total_tokens": 200},
+    }
+
+
+def _chunk(model: str, content: Optional[str], finish: Optional[str] = None) -> str:
+    delta = {"content": content} if content is not None else {}
+    data = {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+    }
+    return f"data: {json.dumps(data)}\n\n"
+
+
+async def chat_completions_handler(request: Request) -> Response:
+    config: LLMConfig = request.app.state.llm
+    body = await request.json()
+    model = body.get("model", "fake-model")
+    request.app.state.llm_calls += 1
+
+    if body.get("stream"):
+        async def stream():
+            await asyncio.sleep(config.delay() / 4)
+            for i in range(config.stream_tokens):
+                yield _chunk(model, f"tok{i} ")
+                await asyncio.sleep(config.token_delay)
+            yield _chunk(model, None, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    await asyncio.sleep(config.delay())
+    return JSONResponse(_completion(model, json.dumps(UNIVERSAL_PAYLOAD)))
+
+
+async def traces_handler(request: Request) -> Response:
+    body = await request.json()
+    request.app.state.spans_received += sum(
+        len(scope.get("spans", []))
+        for resource in body.get("resourceSpans", [])
+        for scope in resource.get("scopeSpans", [])
+    )
+    return JSONResponse({})
+
+
+def create_fake_app(store: FakeStore, llm: LLMConfig) -> Starlette:
+    app = Starlette(routes=[
+        Route("/rest/v1/{table}", rest_handler, methods=["GET", "HEAD", "POST", "PATCH", "DELETE"]),
+        Route("/auth/v1/user", auth_user_handler, methods=["GET"]),
+        Route("/v1/chat/completions", chat_completions_handler, methods=["POST"]),
+        Route("/v1beta/openai/chat/completions", chat_completions_handler, methods=["POST"]),
+        Route("/v1/traces", traces_handler, methods=["POST"]),
+    ])
+    app.state.store = store
+    app.state.llm = llm
+    app.state.llm_calls = 0
+    app.state.spans_received = 0
+    return app
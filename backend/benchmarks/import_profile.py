@@ -0,0 +1,137 @@
+"""
+Import-time profile for the backend.
+
+Imports `app.main` in a fresh interpreter under `python -X importtime` and reports
+how long the worker takes to become importable, which packages that time goes to,
+and whether any of the modules we deliberately load lazily (document extraction
+libraries, the openai SDK) were pulled in at import.
+
+Usage (from backend/):
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --runs 5 --top 30
+    python -m benchmarks.import_profile --check      # exit non-zero if a lazy module is imported eagerly
+    python -m benchmarks.import_profile --output benchmarks/results/imports.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use; importing app.main must not pull these in
+LAZY_MODULES = ("PyPDF2", "docx", "PIL", "pytesseract", "openai")
+
+# Clients are constructed at import but never contacted, so placeholders are enough
+PROFILE_ENV = {
+    "SUPABASE_URL": "http://127.0.0.1:9",
+    "SUPABASE_SERVICE_ROLE_KEY": "profile.profile.profile",
+    "OPENAI_API_KEY": "profile",
+    "TRACE_EXPORTER": "none",
+    "LOG_LEVEL": "WARNING",
+}
+
+
+def _parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Rows of `import time: self [us] | cumulative | imported package`."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append({
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            })
+        except ValueError:
+            continue
+    return rows
+
+
+def profile_once(target: str) -> Dict[str, Any]:
+    env = {**os.environ, **PROFILE_ENV}
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.strip().splitlines()[-5:])
+        raise RuntimeError(f"import {target} failed:\n{tail}")
+    return {"wall_ms": wall * 1000, "rows": _parse_importtime(proc.stderr)}
+
+
+def summarise(rows: List[Dict[str, Any]], top: int) -> Dict[str, Any]:
+    by_package: Dict[str, float] = {}
+    for row in rows:
+        package = row["module"].split(".")[0]
+        by_package[package] = by_package.get(package, 0.0) + row["self_ms"]
+
+    app_modules = [r for r in rows if r["module"].split(".")[0] in ("app", "dependencies")]
+    imported = {r["module"].split(".")[0] for r in rows}
+    return {
+        "import_ms": round(sum(r["self_ms"] for r in rows), 1),
+        "modules": len(rows),
+        "packages": sorted(
+            ({"package": p, "self_ms": round(ms, 1)} for p, ms in by_package.items()),
+            key=lambda x: -x["self_ms"],
+        )[:top],
+        "app_modules": sorted(
+            ({"module": r["module"], "cumulative_ms": round(r["cumulative_ms"], 1)} for r in app_modules),
+            key=lambda x: -x["cumulative_ms"],
+        )[:top],
+        "eager_lazy_modules": [m for m in LAZY_MODULES if m in imported],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile backend import time")
+    parser.add_argument("--target", default="app.main", help="module to import")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters to average over")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--check", action="store_true", help="fail if a lazily-loaded module is imported eagerly")
+    parser.add_argument("--output", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    runs = [profile_once(args.target) for _ in range(max(1, args.runs))]
+    # Report the run closest to the median, so the breakdown matches the headline number
+    walls = [r["wall_ms"] for r in runs]
+    median_wall = statistics.median(walls)
+    representative = min(runs, key=lambda r: abs(r["wall_ms"] - median_wall))
+    report = summarise(representative["rows"], args.top)
+    report.update(target=args.target, runs=len(runs), wall_ms_median=round(median_wall, 1),
+                  wall_ms_min=round(min(walls), 1))
+
+    print(f"import {args.target}: {report['wall_ms_median']:.0f}ms wall (median of {len(runs)}, "
+          f"min {report['wall_ms_min']:.0f}ms), {report['import_ms']:.0f}ms in imports, "
+          f"{report['modules']} modules")
+    print("\nBy package (self time):")
+    for item in report["packages"]:
+        print(f"  {item['self_ms']:8.1f}ms  {item['package']}")
+    print("\nApp modules (cumulative):")
+    for item in report["app_modules"]:
+        print(f"  {item['cumulative_ms']:8.1f}ms  {item['module']}")
+
+    eager = report["eager_lazy_modules"]
+    print(f"\nLazy modules imported eagerly: {', '.join(eager) if eager else 'none'}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.check and eager:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+End-to-end benchmark for the backend.
+
+Boots `app.main:app` against local stand-ins (benchmarks.fake_services) seeded with a
+synthetic catalog, then drives the hot endpoints at increasing concurrency and
+reports throughput and p50/p99 latency per scenario.
+
+Usage (from backend/):
+    python -m benchmarks.run
+    python -m benchmarks.run --levels 1,8,32 --llm-latency 1.5 --scenarios compare,chat_stream
+    python -m benchmarks.run --scale 10 --scenarios compare,flexibility_prefilter
+    python -m benchmarks.run --baseline benchmarks/results/20250101-120000.json
+
+Results are written to benchmarks/results/<timestamp>.json. With --baseline, any
+scenario whose p50/p99 grew (or throughput dropped) by more than --threshold is
+reported and the process exits non-zero.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import uvicorn
+
+from benchmarks.fake_services import FakeStore, LLMConfig, create_fake_app
+from benchmarks.seed import BENCH_CONVERSATION_ID, build_seed
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_LEVELS = [1, 4, 16, 32]
+BENCH_TOKEN = "bench-token"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve(app: Any, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.time() + 15
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError(f"Server on port {port} did not start")
+        time.sleep(0.05)
+    return server
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+# ---------------------------------------------------------------------------
+# Scenarios: each call returns (ok, time_to_first_byte or None)
+# ---------------------------------------------------------------------------
+
+ScenarioFn = Callable[[httpx.AsyncClient, Dict[str, Any]], Awaitable[Tuple[bool, Optional[float]]]]
+
+
+async def scenario_compare(client: httpx.AsyncClient, ctx: Dict[str, Any]):
+    resp = await client.post("/compare", json={
+        "user_id": ctx["user_id"],
+        "base_program_code": ctx["base_degree"]["degree_code"],
+        "target_program_code": ctx["target_degree"]["degree_code"],
+    })
+    return resp.status_code == 200, None
+
+
+async def scenario_roadmap_unsw(client: httpx.AsyncClient, ctx: Dict[str, Any]):
+    resp = await client.post(
+        "/roadmap/unsw",
+        json={"degree_id": ctx["base_degree"]["id"]},
+        headers=ctx["auth"],
+    )
+    return resp.status_code == 200, None
+
+
+async def scenario_degrees_for_course(client: httpx.AsyncClient, ctx: Dict[str, Any]):
+    resp = await client.post(
+        "/smart-related/degrees-for-course",
+        json={"course_code": ctx["course_code"]},
+        headers=ctx["auth"],
+    )
+    return resp.status_code == 200, None
+
+
+async def scenario_chat_stream(client: httpx.AsyncClient, ctx: Dict[str, Any]):
+    start = time.perf_counter()
+    ttfb = None
+    async with client.stream(
+        "POST",
+        f"/chat/conversations/{BENCH_CONVERSATION_ID}/reply/stream",
+        headers=ctx["auth"],
+    ) as resp:
+        async for chunk in resp.aiter_bytes():
+            if ttfb is None and chunk:
+                ttfb = time.perf_counter() - start
+        return resp.status_code == 200, ttfb
+
+
+async def scenario_flexibility_prefilter(client: httpx.AsyncClient, ctx: Dict[str, Any]):
+    # Not exposed as an endpoint; called the way the roadmap background task does
+    from app.routers.flexibility_filtering import pre_filter_similar_degrees
+
+    result = await asyncio.to_thread(pre_filter_similar_degrees, ctx["base_degree"]["id"])
+    return isinstance(result, list), None
+
+
+SCENARIOS: Dict[str, ScenarioFn] = {
+    "compare": scenario_compare,
+    "roadmap_unsw": scenario_roadmap_unsw,
+    "degrees_for_course": scenario_degrees_for_course,
+    "chat_stream": scenario_chat_stream,
+    "flexibility_prefilter": scenario_flexibility_prefilter,
+}
+
+
+async def run_level(
+    fn: ScenarioFn,
+    client: httpx.AsyncClient,
+    ctx: Dict[str, Any],
+    concurrency: int,
+    total: int,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    ttfbs: List[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                ok, ttfb = await fn(client, ctx)
+            except Exception as e:
+                ok, ttfb = False, None
+                print(f"[bench] request failed: {e!r}")
+            latencies.append(time.perf_counter() - start)
+            if ttfb is not None:
+                ttfbs.append(ttfb)
+            if not ok:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    ttfbs.sort()
+    result = {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(total / wall, 2) if wall else None,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+    }
+    if ttfbs:
+        result["ttfb_p50_ms"] = round(_percentile(ttfbs, 50) * 1000, 1)
+        result["ttfb_p99_ms"] = round(_percentile(ttfbs, 99) * 1000, 1)
+    return result
+
+
+def compare_to_baseline(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    for scenario, levels in current["results"].items():
+        base_levels = baseline.get("results", {}).get(scenario, {})
+        for level, stats in levels.items():
+            base = base_levels.get(level)
+            if not base:
+                continue
+            for key in ("p50_ms", "p99_ms", "ttfb_p50_ms"):
+                if base.get(key) and stats.get(key) and stats[key] > base[key] * (1 + threshold):
+                    regressions.append(f"{scenario} c={level} {key}: {base[key]} -> {stats[key]}")
+            if base.get("throughput_rps") and stats.get("throughput_rps") \
+                    and stats["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+                regressions.append(
+                    f"{scenario} c={level} throughput_rps: {base['throughput_rps']} -> {stats['throughput_rps']}"
+                )
+    return regressions
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    seed_data = build_seed(args.scale, args.seed)
+    store = FakeStore()
+    store.seed(seed_data)
+    llm = LLMConfig(latency=args.llm_latency, jitter=args.llm_jitter, token_delay=args.token_delay)
+
+    fake_port = _free_port()
+    fake_app = create_fake_app(store, llm)
+    fake_server = _serve(fake_app, fake_port)
+    fake_url = f"http://127.0.0.1:{fake_port}"
+
+    # Must be set before app.main is imported: the Supabase client is created at import time
+    os.environ["SUPABASE_URL"] = fake_url
+    os.environ["SUPABASE_SERVICE_ROLE_KEY"] = "bench.bench.bench"
+    os.environ["OPENAI_API_KEY"] = "bench"
+    os.environ["OPENAI_BASE_URL"] = f"{fake_url}/v1"
+    os.environ["GEMINI_API_KEY"] = "bench"
+    os.environ["GEMINI_BASE_URL"] = f"{fake_url}/v1beta/openai/"
+    if args.trace:
+        os.environ["TRACE_EXPORTER"] = "otlp"
+        os.environ["TRACE_OTLP_ENDPOINT"] = f"{fake_url}/v1/traces"
+
+    from app.main import app
+
+    app_port = _free_port()
+    app_server = _serve(app, app_port)
+
+    degrees = seed_data["unsw_degrees_final"]
+    ctx = {
+        "user_id": seed_data["student_uni_data"][0]["user_id"],
+        "base_degree": degrees[0],
+        "target_degree": degrees[1],
+        "course_code": seed_data["user_completed_courses"][0]["course_code"],
+        "auth": {"Authorization": f"Bearer {BENCH_TOKEN}"},
+    }
+
+    selected = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = [s for s in selected if s not in SCENARIOS]
+    if unknown:
+        print(f"Unknown scenarios: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+        return 2
+    levels = [int(x) for x in args.levels.split(",")]
+
+    output: Dict[str, Any] = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "levels": levels,
+            "requests_per_worker": args.requests_per_worker,
+            "llm_latency": args.llm_latency,
+            "llm_jitter": args.llm_jitter,
+            "token_delay": args.token_delay,
+            "scale": args.scale,
+            "seed": args.seed,
+            "catalog": {t: len(seed_data[t]) for t in ("unsw_degrees_final", "unsw_courses", "unsw_specialisations")},
+        },
+        "results": {},
+    }
+
+    limits = httpx.Limits(max_connections=max(levels) * 2, max_keepalive_connections=max(levels) * 2)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{app_port}", timeout=120, limits=limits) as client:
+        readiness = (await client.get("/health/ready")).json()
+        output["warmup"] = readiness
+        print(f"Warm-up {readiness['warmup_ms']}ms: "
+              + ", ".join(f"{n}={c['state']}" for n, c in readiness["components"].items()))
+        for name in selected:
+            output["results"][name] = {}
+            # One warm-up call so import/connection costs don't land in the first level
+            await SCENARIOS[name](client, ctx)
+            for level in levels:
+                total = max(level * args.requests_per_worker, args.min_requests)
+                stats = await run_level(SCENARIOS[name], client, ctx, level, total)
+                output["results"][name][str(level)] = stats
+                ttfb = f" ttfb_p50={stats['ttfb_p50_ms']}ms" if "ttfb_p50_ms" in stats else ""
+                print(
+                    f"{name:<24} c={level:<3} n={total:<4} "
+                    f"rps={stats['throughput_rps']:<8} p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms"
+                    f"{ttfb} errors={stats['errors']}"
+                )
+
+    # Let background roadmap tasks drain before shutting the fakes down
+    await asyncio.sleep(args.llm_latency * 2)
+    app_server.should_exit = True
+    fake_server.should_exit = True
+    output["fake_stats"] = {
+        "postgrest_requests": store.requests,
+        "llm_calls": fake_app.state.llm_calls,
+        "spans_received": fake_app.state.spans_received,
+    }
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    out_path = os.path.join(args.output_dir, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(out_path, "w") as f:
+        json.dump(output, f, indent=2)
+    print(f"Results written to {out_path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(output, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions vs {args.baseline} (threshold {args.threshold:.0%})")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end backend benchmark")
+    parser.add_argument("--levels", default=",".join(str(x) for x in DEFAULT_LEVELS),
+                        help="comma-separated concurrency levels")
+    parser.add_argument("--scenarios", default="", help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests-per-worker", type=int, default=4)
+    parser.add_argument("--min-requests", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="fake LLM latency in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.01, help="delay between streamed tokens")
+    parser.add_argument("--scale", type=float, default=0.1,
+                        help="synthetic catalog size; 1.0 is roughly the real catalog")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    parser.add_argument("--trace", action="store_true", help="export spans to the fake OTLP collector")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
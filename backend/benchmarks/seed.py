@@ -0,0 +1,65 @@
+"""
+Deterministic seed data for the benchmark fake: a synthetic catalog
+(benchmarks.synthetic_catalog) plus the rows the benchmark user needs for the
+authenticated endpoints.
+"""
+
+import json
+from typing import Any, Dict, List
+
+from benchmarks.fake_services import BENCH_USER_ID
+from benchmarks.synthetic_catalog import generate_catalog
+
+BENCH_CONVERSATION_ID = "00000000-0000-4000-8000-0000000c0471"
+
+
+def build_user_rows(catalog: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    base = catalog["unsw_degrees_final"][0]
+    base_sections = json.loads(base["sections"])
+    taken = [c["code"] for c in base_sections[0]["courses"]][:8]
+
+    messages = []
+    for i in range(6):
+        messages.append({
+            "id": f"msg-{i}",
+            "conversation_id": BENCH_CONVERSATION_ID,
+            "sender": "bot" if i % 2 else "user",
+            "content": f"Message {i} about switching degrees.",
+            "created_at": f"2025-01-01T00:00:0{i}+00:00",
+        })
+
+    return {
+        "student_uni_data": [{
+            "id": "uni-data-bench",
+            "user_id": BENCH_USER_ID,
+            "degree_field": base["program_name"],
+            "academic_year": 2,
+            "interests": "software, data, design",
+        }],
+        "career_recommendations": [{
+            "id": "career-rec-bench",
+            "user_id": BENCH_USER_ID,
+            "career_title": "Software Engineer",
+            "reason": "Strong programming results.",
+        }],
+        "transcript_analysis": [{
+            "id": "transcript-bench",
+            "user_id": BENCH_USER_ID,
+            "analysis": {"wam": 78.5, "uoc_completed": 48},
+        }],
+        "conversation_messages": messages,
+        "user_completed_courses": [{
+            "id": f"completed-{code}",
+            "user_id": BENCH_USER_ID,
+            "course_code": code,
+            "course_name": code,
+            "uoc": 6,
+            "mark": 70 + i,
+            "is_completed": True,
+        } for i, code in enumerate(taken)],
+    }
+
+
+def build_seed(scale: float = 0.1, seed: int = 7) -> Dict[str, List[Dict[str, Any]]]:
+    catalog = generate_catalog(scale, seed)
+    return {**catalog, **build_user_rows(catalog)}
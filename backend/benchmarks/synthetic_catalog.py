@@ -0,0 +1,308 @@
+"""
+Synthetic UNSW-shaped catalog at a configurable scale.
+
+Generates rows for unsw_courses, unsw_degrees_final and unsw_specialisations in the
+same shape the app reads:
+    - degrees carry `sections` JSON (core / prescribed electives / free electives)
+    - specialisations carry `sections` and `sections_degrees` ([{"degree_code": ...}])
+    - courses carry `conditions_for_enrolment` text in the handbook's phrasing
+      (single / or / and / "A and (B or C)", corequisites, UOC conditions), and
+      `equivalent_courses` groups, also stated as an "Equivalent:" clause in that text
+
+scale=1 is roughly the size of the real catalog (~120 degrees, ~200 specialisations,
+~3000 courses). Output is deterministic for a given (scale, seed).
+
+Usage (from backend/):
+    python -m benchmarks.synthetic_catalog --scale 10 --seed 1 --out catalog_x10.json
+"""
+
+import argparse
+import itertools
+import json
+import random
+import string
+from typing import Any, Dict, List
+
+BASE_COURSES = 3000
+BASE_DEGREES = 120
+BASE_SPECIALISATIONS = 200
+COURSES_PER_PREFIX = 40
+
+FACULTIES = {
+    "Engineering": ["COMP", "ELEC", "MECH", "CVEN", "CEIC", "MTRN", "TELE", "SENG"],
+    "Science": ["MATH", "PHYS", "CHEM", "BABS", "BIOS", "GEOS", "PSYC", "MATS"],
+    "UNSW Business School": ["ACCT", "FINS", "MGMT", "ECON", "MARK", "INFS", "COMM", "TABL"],
+    "Arts, Design & Architecture": ["ARTS", "DART", "LING", "HIST", "MDIA", "SOCW", "ARCH", "BENV"],
+    "Medicine & Health": ["HESC", "PHCM", "NEUR", "PATH", "ANAT", "PHSL", "OPTM", "EXPH"],
+    "Law & Justice": ["LAWS", "JURD", "CRIM", "ATSI", "LEGT", "REGL", "HRTS", "POLS"],
+}
+
+TOPICS = [
+    "Foundations", "Principles", "Methods", "Systems", "Design", "Analysis", "Theory",
+    "Practice", "Modelling", "Data", "Computation", "Research", "Professional Practice",
+    "Advanced Topics", "Applications", "Project",
+]
+
+PROGRAM_WORDS = {
+    "Engineering": ["Engineering (Honours)", "Computer Science", "Software Engineering", "Data Science"],
+    "Science": ["Science", "Advanced Science (Honours)", "Medicinal Chemistry", "Psychological Science"],
+    "UNSW Business School": ["Commerce", "Economics", "Actuarial Studies", "Information Systems"],
+    "Arts, Design & Architecture": ["Arts", "Design", "Media", "Architectural Studies"],
+    "Medicine & Health": ["Health Sciences", "Exercise Physiology", "Vision Science", "Public Health"],
+    "Law & Justice": ["Laws", "Criminology", "Justice Studies", "International Studies"],
+}
+
+SPEC_TYPES = ["Major", "Major", "Minor", "Honours"]
+
+
+def _scaled(base: int, scale: float, minimum: int) -> int:
+    return max(minimum, int(round(base * scale)))
+
+
+def _prefixes(count: int) -> Dict[str, str]:
+    """prefix -> faculty; real prefixes first, then synthetic 4-letter ones."""
+    result: Dict[str, str] = {}
+    real = [(p, f) for f, ps in FACULTIES.items() for p in ps]
+    for p, f in real[:count]:
+        result[p] = f
+    faculties = list(FACULTIES)
+    synthetic = ("".join(t) for t in itertools.product(string.ascii_uppercase, repeat=4))
+    while len(result) < count:
+        p = next(synthetic)
+        if p not in result:
+            result[p] = faculties[len(result) % len(faculties)]
+    return result
+
+
+def _conditions(rng: random.Random, level: int, same_prefix: Dict[int, List[str]], sister: List[str]) -> str:
+    """Handbook-style enrolment conditions text for a course."""
+    lower = same_prefix.get(level - 1) or []
+    if level == 1 or not lower:
+        return "" if rng.random() < 0.85 else "Prerequisite: Enrolment in a program with a minimum of 6 UOC completed"
+
+    pool = lower + sister
+    shape = rng.random()
+    if shape < 0.30:
+        text = f"Prerequisite: {rng.choice(lower)}"
+    elif shape < 0.55:
+        a, b = rng.sample(pool, 2) if len(pool) >= 2 else (lower[0], lower[0])
+        text = f"Prerequisite: {a} or {b}"
+    elif shape < 0.75:
+        a, b = rng.sample(pool, 2) if len(pool) >= 2 else (lower[0], lower[0])
+        text = f"Prerequisite: {a} and {b}"
+    elif shape < 0.92 and len(pool) >= 3:
+        a, b, c = rng.sample(pool, 3)
+        text = f"Prerequisite: {a} and ({b} or {c})"
+    else:
+        text = f"Prerequisite: {rng.choice(lower)} and completion of {rng.choice([24, 48, 72])} UOC"
+
+    if rng.random() < 0.1 and same_prefix.get(level):
+        text += f". Corequisite: {rng.choice(same_prefix[level])}"
+    if rng.random() < 0.05:
+        text += f". Minimum WAM of {rng.choice([65, 70, 75])}"
+    return text
+
+
+def generate_courses(rng: random.Random, prefixes: Dict[str, str], total: int) -> List[Dict[str, Any]]:
+    per_prefix = max(8, total // len(prefixes))
+    by_faculty: Dict[str, List[str]] = {}
+    courses: List[Dict[str, Any]] = []
+
+    for prefix, faculty in prefixes.items():
+        by_level: Dict[int, List[str]] = {}
+        # Level mix roughly like the handbook: more level 1-2, fewer level 4
+        levels = [1] * 3 + [2] * 3 + [3] * 3 + [4] * 1
+        counters = {lvl: 0 for lvl in (1, 2, 3, 4)}
+        sister = by_faculty.get(faculty, [])
+        for i in range(per_prefix):
+            level = levels[i % len(levels)]
+            counters[level] += 1
+            code = f"{prefix}{level}{counters[level]:03d}"
+            conditions = _conditions(
+                rng, level, by_level,
+                [c for c in rng.sample(sister, min(4, len(sister))) if int(c[4]) == level - 1],
+            )
+            by_level.setdefault(level, []).append(code)
+            topic = TOPICS[(counters[level] + level) % len(TOPICS)]
+            courses.append({
+                "id": f"course-{code}",
+                "code": code,
+                "title": f"{prefix.title()} {topic} {level}",
+                "uoc": 12 if level == 4 and rng.random() < 0.2 else 6,
+                "study_level": "Undergraduate",
+                "faculty": faculty,
+                "school": f"School of {prefix.title()}",
+                "offering_terms": rng.choice(["Term 1", "Term 2", "Term 3", "Term 1, Term 3", "Term 1, Term 2, Term 3"]),
+                "field_of_education": prefix,
+                "overview": f"{topic} in {prefix.title()} at level {level}. " * rng.randint(4, 12),
+                "conditions_for_enrolment": conditions,
+                "equivalent_courses": [],
+            })
+        by_faculty.setdefault(faculty, []).extend(c for lvl in by_level.values() for c in lvl)
+
+    # Equivalence groups (~3% of courses): same faculty and level, groups of 2-3
+    by_bucket: Dict[tuple, List[Dict[str, Any]]] = {}
+    for c in courses:
+        by_bucket.setdefault((c["faculty"], c["code"][4]), []).append(c)
+    for bucket in by_bucket.values():
+        n_groups = int(len(bucket) * 0.03 / 2.5 + rng.random())
+        for _ in range(n_groups):
+            group = rng.sample(bucket, min(len(bucket), rng.choice([2, 2, 3])))
+            codes = [c["code"] for c in group]
+            for c in group:
+                c["equivalent_courses"] = sorted(set(c["equivalent_courses"]) | (set(codes) - {c["code"]}))
+    # The handbook states them in the conditions text too, which is what the app reads
+    for c in courses:
+        if c["equivalent_courses"]:
+            clause = f"Equivalent: {', '.join(c['equivalent_courses'])}"
+            c["conditions_for_enrolment"] = f"{c['conditions_for_enrolment']}. {clause}" if c["conditions_for_enrolment"] else clause
+    return courses
+
+
+def _section(title: str, codes: List[str], uoc_of: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        "title": title,
+        "uoc": sum(uoc_of[c] for c in codes),
+        "courses": [{"code": c, "name": "", "uoc": uoc_of[c]} for c in codes],
+    }
+
+
+def generate_degrees(rng: random.Random, courses: List[Dict[str, Any]], prefixes: Dict[str, str], total: int) -> List[Dict[str, Any]]:
+    by_prefix: Dict[str, List[str]] = {}
+    for c in courses:
+        by_prefix.setdefault(c["code"][:4], []).append(c["code"])
+    uoc_of = {c["code"]: c["uoc"] for c in courses}
+    prefix_list = list(prefixes)
+    used_names = set()
+
+    degrees: List[Dict[str, Any]] = []
+    for i in range(total):
+        home = prefix_list[i % len(prefix_list)]
+        faculty = prefixes[home]
+        faculty_prefixes = [p for p in prefix_list if prefixes[p] == faculty and p != home]
+        home_codes = by_prefix[home]
+
+        core = [c for c in home_codes if c[4] in "12"][: rng.randint(6, 12)]
+        level3 = [c for c in home_codes if c[4] == "3"][: rng.randint(3, 6)]
+        elective_pool = [c for p in rng.sample(faculty_prefixes, min(3, len(faculty_prefixes))) for c in by_prefix[p]]
+        electives = rng.sample(elective_pool, min(len(elective_pool), rng.randint(8, 20)))
+
+        sections = [
+            _section("Core Courses", core, uoc_of),
+            _section("Level 3 Core Courses", level3, uoc_of),
+            _section("Prescribed Electives", electives, uoc_of),
+            {"title": "Free Electives", "uoc": 36, "courses": []},
+        ]
+        if rng.random() < 0.15:
+            sections.append({"title": "General Education", "uoc": 12, "courses": []})
+
+        code = str(3000 + i)
+        name = f"Bachelor of {PROGRAM_WORDS[faculty][i % len(PROGRAM_WORDS[faculty])]}"
+        if rng.random() < 0.12:
+            other = prefixes[rng.choice(prefix_list)]
+            name += f" / Bachelor of {PROGRAM_WORDS[other][0]}"
+        # Program names are looked up by exact match, keep them unique
+        if name in used_names:
+            name += f" ({home.title()})"
+        if name in used_names:
+            name += f" {code}"
+        used_names.add(name)
+
+        honours = "Honours" in name
+        degrees.append({
+            "id": f"degree-{code}",
+            "degree_code": code,
+            "uac_code": f"42{code}",
+            "program_name": name,
+            "faculty": faculty,
+            "minimum_uoc": 192 if honours else 144,
+            "duration": 4 if honours else 3,
+            "overview_description": f"{name} builds depth in {home.title()}. " * rng.randint(5, 15),
+            "career_outcomes": f"Graduates work in {home.title()} related roles.",
+            "sections": json.dumps(sections),
+        })
+    return degrees
+
+
+def generate_specialisations(rng: random.Random, courses: List[Dict[str, Any]], degrees: List[Dict[str, Any]], prefixes: Dict[str, str], total: int) -> List[Dict[str, Any]]:
+    by_prefix: Dict[str, List[str]] = {}
+    for c in courses:
+        by_prefix.setdefault(c["code"][:4], []).append(c["code"])
+    uoc_of = {c["code"]: c["uoc"] for c in courses}
+    degrees_by_faculty: Dict[str, List[Dict[str, Any]]] = {}
+    for d in degrees:
+        degrees_by_faculty.setdefault(d["faculty"], []).append(d)
+    prefix_list = list(prefixes)
+    suffix_by_prefix: Dict[str, Any] = {}
+
+    specs: List[Dict[str, Any]] = []
+    for i in range(total):
+        prefix = prefix_list[i % len(prefix_list)]
+        faculty = prefixes[prefix]
+        suffix_iter = suffix_by_prefix.setdefault(prefix, (f"{letter}{n}" for n in range(1, 10) for letter in string.ascii_uppercase))
+        major_code = f"{prefix}{next(suffix_iter)}"
+        spec_type = SPEC_TYPES[i % len(SPEC_TYPES)]
+
+        upper = [c for c in by_prefix[prefix] if c[4] in "234"]
+        size = {"Major": rng.randint(6, 10), "Minor": rng.randint(3, 5), "Honours": rng.randint(2, 4)}[spec_type]
+        picked = rng.sample(upper, min(len(upper), size))
+        half = max(1, len(picked) // 2)
+        sections = [_section(f"{spec_type} Core", picked[:half], uoc_of)]
+        if picked[half:]:
+            sections.append(_section(f"{spec_type} Electives", picked[half:], uoc_of))
+
+        pool = degrees_by_faculty.get(faculty, [])
+        owning = rng.sample(pool, min(len(pool), rng.randint(1, 4)))
+        if rng.random() < 0.2 and degrees:
+            owning.append(rng.choice(degrees))
+
+        specs.append({
+            "id": f"spec-{major_code}",
+            "major_code": major_code,
+            "major_name": f"{prefix.title()} {TOPICS[i % len(TOPICS)]}",
+            "specialisation_type": spec_type,
+            "faculty": faculty,
+            "uoc_required": sum(s["uoc"] for s in sections),
+            "overview_description": f"A {spec_type.lower()} in {prefix.title()}.",
+            "sections": json.dumps(sections),
+            "sections_degrees": [
+                {"degree_code": d["degree_code"], "program_name": d["program_name"]}
+                for d in {d["degree_code"]: d for d in owning}.values()
+            ],
+        })
+    return specs
+
+
+def generate_catalog(scale: float = 1.0, seed: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+    """Rows keyed by table name, deterministic for (scale, seed)."""
+    rng = random.Random(seed)
+    n_courses = _scaled(BASE_COURSES, scale, 120)
+    prefixes = _prefixes(max(4, n_courses // COURSES_PER_PREFIX))
+    courses = generate_courses(rng, prefixes, n_courses)
+    degrees = generate_degrees(rng, courses, prefixes, _scaled(BASE_DEGREES, scale, 6))
+    specs = generate_specialisations(rng, courses, degrees, prefixes, _scaled(BASE_SPECIALISATIONS, scale, 6))
+    return {
+        "unsw_courses": courses,
+        "unsw_degrees_final": degrees,
+        "unsw_specialisations": specs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic UNSW catalog")
+    parser.add_argument("--scale", type=float, default=1.0, help="1.0 is roughly the real catalog size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write JSON here (default: print table sizes only)")
+    args = parser.parse_args()
+
+    catalog = generate_catalog(args.scale, args.seed)
+    for table, rows in catalog.items():
+        print(f"{table}: {len(rows)} rows")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(catalog, f)
+        print(f"Written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
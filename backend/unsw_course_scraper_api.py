@@ -1,7 +1,38 @@
-import requests
+"""
+UNSW Handbook sync (CourseLoop search API -> Supabase).
+
+Pages through every undergraduate subject, program and specialisation in the
+handbook with a few concurrent requests, maps each item onto our catalog tables
+and upserts only the rows whose content actually changed:
+
+    subject         -> unsw_courses          (key: code)
+    course          -> unsw_degrees_final    (key: degree_code)
+    aos             -> unsw_specialisations  (key: major_code)
+
+Change detection hashes the mapped columns of the fetched row and of the row
+already in Supabase, so unchanged items cost nothing. Only the columns listed in
+the mappers are written; curated columns (sections, career_outcomes, ...) are
+left alone.
+
+Usage (from backend/):
+    python unsw_course_scraper_api.py                      # sync everything
+    python unsw_course_scraper_api.py --types subject --dry-run
+    python unsw_course_scraper_api.py --record fixtures/handbook   # save raw pages
+    python unsw_course_scraper_api.py --fixtures fixtures/handbook --dry-run   # offline
+"""
+
+import argparse
+import asyncio
+import hashlib
 import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
 
 API_URL = "https://api-ap-southeast-2.prod.courseloop.com/publisher/search-academic-items"
+HANDBOOK_URL = "https://www.handbook.unsw.edu.au"
 
 HEADERS = {
     "Content-Type": "application/json",
@@ -11,42 +42,309 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0"
 }
 
-payload = {
-    "siteId": "unsw-prod-pres",
-    "query": "",
-    "contenttype": "subject",
-    "from": 0,
-    "size": 20,
-    "searchFilters": [
-        {
-            "filterField": "implementationYear",
-            "filterValue": ["2025"],
-            "isExactMatch": False
-        },
-        {
-            "filterField": "studyLevelValue",
-            "filterValue": ["ugrd"],
-            "isExactMatch": False
-        },
-        {
-            "filterField": "active",
-            "filterValue": ["1"],
-            "isExactMatch": False
-        }
-    ]
+IMPLEMENTATION_YEAR = "2025"
+PAGE_SIZE = 100
+# Concurrent requests to CourseLoop (be polite)
+MAX_CONCURRENT_REQUESTS = 4
+# Rows per Supabase upsert call
+UPSERT_BATCH_SIZE = 200
+REQUEST_RETRIES = 3
+
+
+def build_payload(contenttype: str, offset: int, size: int = PAGE_SIZE) -> Dict[str, Any]:
+    return {
+        "siteId": "unsw-prod-pres",
+        "query": "",
+        "contenttype": contenttype,
+        "from": offset,
+        "size": size,
+        "searchFilters": [
+            {
+                "filterField": "implementationYear",
+                "filterValue": [IMPLEMENTATION_YEAR],
+                "isExactMatch": False
+            },
+            {
+                "filterField": "studyLevelValue",
+                "filterValue": ["ugrd"],
+                "isExactMatch": False
+            },
+            {
+                "filterField": "active",
+                "filterValue": ["1"],
+                "isExactMatch": False
+            }
+        ]
+    }
+
+
+# ---------------------------------------------------------------------------
+# Item -> row mappers
+# ---------------------------------------------------------------------------
+
+def _first(item: Dict[str, Any], *keys: str) -> Any:
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, "", []):
+            return value
+    return None
+
+
+def _label(value: Any) -> Optional[str]:
+    # CourseLoop returns some fields as {"label": ..., "value": ...} objects or lists of them
+    if isinstance(value, list):
+        labels = [_label(v) for v in value]
+        return ", ".join(l for l in labels if l) or None
+    if isinstance(value, dict):
+        return value.get("label") or value.get("value")
+    return value
+
+
+def _int(value: Any) -> Optional[int]:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _url(item: Dict[str, Any]) -> Optional[str]:
+    path = _first(item, "urlMap", "url", "academicItemUrl")
+    if not path:
+        return None
+    return path if path.startswith("http") else f"{HANDBOOK_URL}{path}"
+
+
+def map_subject(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "code": item["academicItemCode"],
+        "title": item.get("title"),
+        "uoc": _int(_first(item, "academicItemCreditPoints", "creditPoints")),
+        "faculty": _label(_first(item, "parentAcademicOrg", "owningFaculty", "faculty")),
+        "school": _label(_first(item, "owningAcademicOrg", "school")),
+        "study_level": _label(_first(item, "studyLevelValue", "studyLevel")),
+        "offering_terms": _label(_first(item, "offeringTerms", "offeringDetails")),
+        "field_of_education": _label(_first(item, "fieldOfEducation", "academicItemFieldOfEducation")),
+        "overview": _first(item, "description", "academicItemDescription"),
+    }
+
+
+def map_program(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "degree_code": item["academicItemCode"],
+        "program_name": item.get("title"),
+        "faculty": _label(_first(item, "parentAcademicOrg", "owningFaculty", "faculty")),
+        "minimum_uoc": _int(_first(item, "academicItemCreditPoints", "creditPoints")),
+        "overview_description": _first(item, "description", "academicItemDescription"),
+        "source_url": _url(item),
+    }
+
+
+def map_specialisation(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "major_code": item["academicItemCode"],
+        "major_name": item.get("title"),
+        "specialisation_type": _label(_first(item, "academicItemType", "type")),
+        "faculty": _label(_first(item, "parentAcademicOrg", "owningFaculty", "faculty")),
+        "uoc_required": _int(_first(item, "academicItemCreditPoints", "creditPoints")),
+        "overview_description": _first(item, "description", "academicItemDescription"),
+        "source_url": _url(item),
+    }
+
+
+# contenttype -> (table, key column, mapper)
+SYNC_TARGETS: Dict[str, tuple] = {
+    "subject": ("unsw_courses", "code", map_subject),
+    "course": ("unsw_degrees_final", "degree_code", map_program),
+    "aos": ("unsw_specialisations", "major_code", map_specialisation),
 }
 
 
+def row_hash(row: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(row, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Fetching (live, recording, or from fixtures)
+# ---------------------------------------------------------------------------
+
+class PageSource:
+    """Fetches search pages from CourseLoop, optionally recording or replaying them."""
+
+    def __init__(self, record_dir: Optional[str] = None, fixtures_dir: Optional[str] = None):
+        self.record_dir = record_dir
+        self.fixtures_dir = fixtures_dir
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self.client: Optional[httpx.AsyncClient] = None
+        self.requests = 0
+
+    async def __aenter__(self):
+        if not self.fixtures_dir:
+            self.client = httpx.AsyncClient(headers=HEADERS, timeout=30.0)
+        if self.record_dir:
+            os.makedirs(self.record_dir, exist_ok=True)
+        return self
+
+    async def __aexit__(self, *exc):
+        if self.client:
+            await self.client.aclose()
+
+    @staticmethod
+    def _fixture_name(contenttype: str, offset: int) -> str:
+        return f"{contenttype}-{offset:06d}.json"
+
+    async def fetch(self, contenttype: str, offset: int) -> Dict[str, Any]:
+        if self.fixtures_dir:
+            path = os.path.join(self.fixtures_dir, self._fixture_name(contenttype, offset))
+            if not os.path.exists(path):
+                return {"items": [], "total": 0}
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+
+        payload = build_payload(contenttype, offset)
+        async with self.semaphore:
+            for attempt in range(1, REQUEST_RETRIES + 1):
+                try:
+                    self.requests += 1
+                    response = await self.client.post(API_URL, json=payload)
+                    response.raise_for_status()
+                    data = response.json()
+                    break
+                except (httpx.HTTPError, ValueError) as e:
+                    if attempt == REQUEST_RETRIES:
+                        raise
+                    print(f"⚠ {contenttype} offset={offset} failed ({e}), retrying")
+                    await asyncio.sleep(2 ** attempt)
+
+        if self.record_dir:
+            path = os.path.join(self.record_dir, self._fixture_name(contenttype, offset))
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        return data
+
+
+async def fetch_all_items(source: PageSource, contenttype: str) -> List[Dict[str, Any]]:
+    first = await source.fetch(contenttype, 0)
+    items = list(first.get("items", []))
+    total = first.get("total")
+
+    if isinstance(total, int):
+        offsets = range(PAGE_SIZE, total, PAGE_SIZE)
+        pages = await asyncio.gather(*(source.fetch(contenttype, o) for o in offsets))
+        for page in pages:
+            items.extend(page.get("items", []))
+        return items
+
+    # Total not reported: fetch windows of pages until one comes back short
+    offset = PAGE_SIZE
+    last_page_full = len(items) == PAGE_SIZE
+    while last_page_full:
+        offsets = [offset + i * PAGE_SIZE for i in range(MAX_CONCURRENT_REQUESTS)]
+        pages = await asyncio.gather(*(source.fetch(contenttype, o) for o in offsets))
+        for page in pages:
+            items.extend(page.get("items", []))
+        last_page_full = all(len(p.get("items", [])) == PAGE_SIZE for p in pages)
+        offset = offsets[-1] + PAGE_SIZE
+    return items
+
+
+# ---------------------------------------------------------------------------
+# Diff + upsert
+# ---------------------------------------------------------------------------
+
+def load_existing_hashes(table: str, key: str, columns: List[str]) -> Dict[str, str]:
+    from app.utils.database import supabase
+
+    hashes: Dict[str, str] = {}
+    start = 0
+    while True:
+        res = (
+            supabase.table(table)
+            .select(",".join(columns))
+            .range(start, start + 999)
+            .execute()
+        )
+        rows = res.data or []
+        for row in rows:
+            hashes[row[key]] = row_hash({c: row.get(c) for c in columns})
+        if len(rows) < 1000:
+            return hashes
+        start += 1000
+
+
+def upsert_rows(table: str, key: str, rows: List[Dict[str, Any]]):
+    from app.utils.database import supabase
+
+    for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+        supabase.table(table).upsert(rows[i:i + UPSERT_BATCH_SIZE], on_conflict=key).execute()
+
+
+async def sync_contenttype(source: PageSource, contenttype: str, dry_run: bool) -> Dict[str, Any]:
+    table, key, mapper = SYNC_TARGETS[contenttype]
+    start = time.perf_counter()
+
+    items = await fetch_all_items(source, contenttype)
+    rows: Dict[str, Dict[str, Any]] = {}
+    for item in items:
+        if item.get("academicItemCode"):
+            row = mapper(item)
+            rows[row[key]] = row
+    fetched_in = time.perf_counter() - start
+
+    columns = list(next(iter(rows.values())).keys()) if rows else []
+    existing: Dict[str, str] = {}
+    if rows:
+        try:
+            existing = await asyncio.to_thread(load_existing_hashes, table, key, columns)
+        except Exception as e:
+            if not dry_run:
+                raise
+            # Offline dry runs (fixtures, no Supabase env) diff against an empty table
+            print(f"⚠ Could not read {table} ({e}); treating every row as new")
+
+    changed = [row for code, row in rows.items() if existing.get(code) != row_hash(row)]
+    new = sum(1 for row in changed if row[key] not in existing)
+
+    if changed and not dry_run:
+        await asyncio.to_thread(upsert_rows, table, key, changed)
+
+    stats = {
+        "table": table,
+        "fetched": len(rows),
+        "changed": len(changed),
+        "new": new,
+        "unchanged": len(rows) - len(changed),
+        "seconds": round(time.perf_counter() - start, 1),
+        "fetch_seconds": round(fetched_in, 1),
+    }
+    print(f"{'🔍' if dry_run else '✅'} {contenttype}: {stats}")
+    return stats
+
+
+async def run_sync(
+    types: List[str],
+    dry_run: bool = False,
+    record_dir: Optional[str] = None,
+    fixtures_dir: Optional[str] = None,
+) -> Dict[str, Dict[str, Any]]:
+    async with PageSource(record_dir=record_dir, fixtures_dir=fixtures_dir) as source:
+        results = await asyncio.gather(*(sync_contenttype(source, t, dry_run) for t in types))
+        print(f"CourseLoop requests: {source.requests}")
+    return dict(zip(types, results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the UNSW handbook into Supabase")
+    parser.add_argument("--types", nargs="+", choices=list(SYNC_TARGETS), default=list(SYNC_TARGETS))
+    parser.add_argument("--dry-run", action="store_true", help="Fetch and diff but don't write")
+    parser.add_argument("--record", metavar="DIR", help="Save raw API pages to DIR")
+    parser.add_argument("--fixtures", metavar="DIR", help="Read API pages from DIR instead of the network")
+    args = parser.parse_args()
+
+    if args.record and args.fixtures:
+        parser.error("--record and --fixtures are mutually exclusive")
 
+    asyncio.run(run_sync(args.types, args.dry_run, args.record, args.fixtures))
 
-response = requests.post(API_URL, headers=HEADERS, json=payload)
 
-if response.status_code == 200:
-    data = response.json()
-    courses = data.get("items", [])
-    print(f"✅ Retrieved {len(courses)} courses\n")
-    for course in courses[:5]:
-        print(f"{course['academicItemCode']} - {course['title']}")
-else:
-    print(f"❌ Request failed: {response.status_code}")
-    print(response.text)
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ import {
 import { useNavigate } from "react-router-dom";
 import { UserAuth } from "../context/AuthContext";
 import { supabase } from "../supabaseClient";
+import { readEventStream } from "../utils/sse";
 
 // Utils
 const toPercent = (v) => {
@@ -38,7 +39,10 @@ function ProgressBar({ value }) {
   );
 }
 
-function AuraBoardShell({ label, children }) {
+const sortBySuitability = (recs) =>
+  [...recs].sort((a, b) => toPercent(b.suitability_score) - toPercent(a.suitability_score));
+
+function AuraBoardShell({ label, note, children }) {
   return (
     <div className="card-glass">
       {/* soft spotlight aura */}
@@ -49,7 +53,7 @@ function AuraBoardShell({ label, children }) {
             <span className="inline-block h-1.5 w-1.5 rounded-full bg-sky-500" />
             {label}
           </div>
-          <span className="text-xs text-slate-500 dark:text-slate-300">Click a card to view details</span>
+          <span className="text-xs text-slate-500 dark:text-slate-300">{note || "Click a card to view details"}</span>
         </div>
         {children}
         <div className="mt-4 text-[11px] text-slate-500 dark:text-slate-300 italic">
@@ -86,7 +90,7 @@ function HSItemCard({ rec, onOpen }) {
 
         <div className="flex flex-col justify-center">
           <span className="text-sm  mb-1">ATAR Requirement</span>
-          <Badge color="info" className="w-fit ml-10" size="sm">{rec.atar_requirement}</Badge>
+          <Badge color="info" className="w-fit ml-10" size="sm">{rec.atar_requirement ?? "—"}</Badge>
         </div>
 
         <div className="flex flex-col justify-center">
@@ -103,7 +107,7 @@ function HSItemCard({ rec, onOpen }) {
           <span className="text-xm mb-1">Avg. Years</span>
           <div className="inline-flex items-center gap-1">
             <HiClock />
-            <span className="font-medium">{rec.est_completion_years}</span>
+            <span className="font-medium">{rec.est_completion_years ?? "—"}</span>
           </div>
         </div>
       </div>
@@ -194,9 +198,40 @@ export function RecommendationTable() {
   const userId = session?.user?.id;
   const [loading, setLoading] = useState(false);
   const [recommendations, setRecommendations] = useState([]);
+  // True while showing the instant rule-based drafts the LLM recommendations will replace
+  const [isDraft, setIsDraft] = useState(false);
   const navigate = useNavigate();
 
   useEffect(() => {
+    const controller = new AbortController();
+
+    // Nothing stored yet: show drafts straight away, then the LLM recommendations once ready
+    const streamRecommendations = async () => {
+      const res = await fetch(
+        `${import.meta.env.VITE_API_URL || "http://localhost:8000"}/recommendation/stream`,
+        {
+          headers: { Authorization: `Bearer ${session?.access_token}` },
+          signal: controller.signal,
+        }
+      );
+      if (!res.ok || !res.body) throw new Error(`Recommendation stream failed (${res.status})`);
+
+      await readEventStream(res, (event) => {
+        if (event.type === "draft") {
+          // No drafts (empty survey signals): keep the skeletons until the final results
+          if (!event.recommendations?.length) return;
+          setRecommendations(sortBySuitability(event.recommendations));
+          setIsDraft(true);
+          setLoading(false);
+        } else if (event.type === "final") {
+          setRecommendations(sortBySuitability(event.recommendations ?? []));
+          setIsDraft(false);
+        } else if (event.type === "error") {
+          console.error("Error generating recommendations:", event.detail);
+        }
+      });
+    };
+
     const fetchRecommendations = async () => {
       setLoading(true);
       try {
@@ -214,22 +249,23 @@ export function RecommendationTable() {
         }
         if (response?.error) {
           console.error("Error fetching recommendations:", response.error);
+        } else if (response?.data?.length) {
+          setRecommendations(sortBySuitability(response.data));
         } else {
-          const recs = response?.data ?? [];
-          setRecommendations(
-            recs.sort((a, b) => (toPercent(b.suitability_score) - toPercent(a.suitability_score)))
-          );
+          await streamRecommendations();
         }
       } catch (err) {
+        if (controller.signal.aborted) return;
         console.error("Unexpected error:", err);
       } finally {
-        setLoading(false);
+        if (!controller.signal.aborted) setLoading(false);
       }
     };
 
     if (userType && userId) {
       fetchRecommendations();
     }
+    return () => controller.abort();
   }, [userType, userId]);
 
   if (!userType || !userId) {
@@ -241,9 +277,16 @@ export function RecommendationTable() {
   }
 
   const label = userType === "high_school" ? "Degree Recommendations" : "Career Recommendations";
+  // Drafts aren't stored, so there's no detail page to open yet
+  const openRec = (rec) => {
+    if (!isDraft) navigate(`/recommendation/${rec.id}`, { state: { rec } });
+  };
 
   return (
-    <AuraBoardShell label={label}>
+    <AuraBoardShell
+      label={label}
+      note={isDraft ? "Quick matches from your survey, personalised results are on the way..." : null}
+    >
       <div className="grid grid-cols-1 gap-4">
         {loading ? (
           <>
@@ -255,15 +298,15 @@ export function RecommendationTable() {
           recommendations.map((rec) =>
             userType === "high_school" ? (
               <HSItemCard
-                key={rec.id}
+                key={rec.id ?? rec.degree_name}
                 rec={rec}
-                onOpen={() => navigate(`/recommendation/${rec.id}`, { state: { rec } })}
+                onOpen={() => openRec(rec)}
               />
             ) : (
               <UniItemCard
-                key={rec.id}
+                key={rec.id ?? rec.career_title}
                 rec={rec}
-                onOpen={() => navigate(`/recommendation/${rec.id}`, { state: { rec } })}
+                onOpen={() => openRec(rec)}
               />
             )
           )
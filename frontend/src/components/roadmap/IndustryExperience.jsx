@@ -1,5 +1,6 @@
 import { useState, useEffect } from "react";
 import SaveButton from "../SaveButton";
+import { UserAuth } from "../../context/AuthContext";
 
 import {
   AlertCircle,
@@ -17,6 +18,7 @@ import {
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
 export default function IndustryExperience({ industryExperience }) {
+  const { session } = UserAuth();
   const [showAllPrograms, setShowAllPrograms] = useState(false);
   const [companyUrls, setCompanyUrls] = useState({});
   const [loadingUrls, setLoadingUrls] = useState(false);
@@ -29,7 +31,7 @@ export default function IndustryExperience({ industryExperience }) {
   // Fetch company careers URLs when component mounts
   useEffect(() => {
     const fetchCompanyUrls = async () => {
-      if (!internshipPrograms.length) return;
+      if (!internshipPrograms.length || !session) return;
       
       setLoadingUrls(true);
       try {
@@ -42,6 +44,7 @@ export default function IndustryExperience({ industryExperience }) {
           method: 'POST',
           headers: {
             'Content-Type': 'application/json',
+            'Authorization': `Bearer ${session.access_token}`,
           },
           body: JSON.stringify({ company_names: uniqueCompanies }),
         });
@@ -71,7 +74,7 @@ export default function IndustryExperience({ industryExperience }) {
     };
     
     fetchCompanyUrls();
-  }, [internshipPrograms]);
+  }, [internshipPrograms, session]);
 
   if (!mandatoryPlacements && !internshipPrograms.length && !topCompanies.length) {
     return null;
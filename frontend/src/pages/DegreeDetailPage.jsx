@@ -29,6 +29,8 @@ function DegreeDetailPage() {
   const [degree, setDegree] = useState(null);
   const [advisorSummary, setAdvisorSummary] = useState(null);
   const [loadingSummary, setLoadingSummary] = useState(false);
+  // Summaries are pre-generated offline; a degree the job hasn't covered yet has none
+  const [summaryUnavailable, setSummaryUnavailable] = useState(false);
   const [isOpen, setIsOpen] = useState(false);
   const [loadErr, setLoadErr] = useState(null);
 
@@ -40,6 +42,7 @@ function DegreeDetailPage() {
   const fetchSmartAdvisor = async () => {
     setLoadingSummary(true);
     setAdvisorSummary(null);
+    setSummaryUnavailable(false);
     setLoadErr(null);
     try {
       const res = await fetch(`${import.meta.env.VITE_API_URL || "http://localhost:8000"}/smart-summary/degree`, {
@@ -51,6 +54,10 @@ function DegreeDetailPage() {
         body: JSON.stringify({ degree_id: degreeId }),
       });
       const data = await res.json();
+      if (res.status === 404) {
+        setSummaryUnavailable(true);
+        return;
+      }
       if (!res.ok) throw new Error(data.detail || "Something went wrong");
       setAdvisorSummary(data.summary);
       advisorRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -244,7 +251,7 @@ function DegreeDetailPage() {
                 <HiSparkles className="w-8 h-8 text-emerald-600 dark:text-emerald-400 animate-pulse" />
               </div>
               <p className="text-emerald-800 dark:text-emerald-300 font-semibold">
-                Generating your personalized Smart Advisor summary...
+                Loading the Smart Advisor summary...
               </p>
             </div>
           ) : advisorSummary ? (
@@ -261,17 +268,29 @@ function DegreeDetailPage() {
                 </p>
               </div>
             </>
+          ) : summaryUnavailable ? (
+            <div className="text-center">
+              <div className="inline-block p-4 rounded-full bg-emerald-100 dark:bg-emerald-900/30 mb-4">
+                <HiLightBulb className="w-8 h-8 text-emerald-600 dark:text-emerald-400" />
+              </div>
+              <p className="text-emerald-800 dark:text-emerald-300 font-semibold">
+                A Smart Advisor summary isn't available for this degree yet.
+              </p>
+              <p className="text-sm text-slate-600 dark:text-slate-400 mt-2">
+                Check back soon, summaries are being added across the catalog.
+              </p>
+            </div>
           ) : (
             <div className="flex flex-col md:flex-row items-center justify-between gap-6">
               <div className="flex-1">
                 <div className="flex items-center gap-3 mb-3">
                   <HiLightBulb className="w-7 h-7 text-emerald-600 dark:text-emerald-400" />
                   <h2 className="text-2xl font-bold text-emerald-900 dark:text-emerald-100">
-                    Need Personalized Guidance?
+                    Want a Quick Overview?
                   </h2>
                 </div>
                 <p className="text-slate-700 dark:text-slate-300 leading-relaxed">
-                  Get an AI-powered summary of how this degree aligns with your goals, interests, and personality.
+                  See a Smart Advisor summary of what this degree covers, who it suits, and where it can lead.
                 </p>
               </div>
 
@@ -283,7 +302,7 @@ function DegreeDetailPage() {
                            transition-all duration-200 flex items-center gap-2 whitespace-nowrap"
               >
                 <HiSparkles className="w-5 h-5" />
-                Generate Smart Advisor
+                Show Smart Advisor
               </button>
             </div>
           )}
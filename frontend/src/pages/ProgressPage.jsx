@@ -24,6 +24,7 @@ import ProgramSetupModal from "../components/progress/ProgramSetupModal";
 import SpecialisationSelectionPanel from "../components/progress/SpecialisationSelectionPanel";
 import ProgramSelector from "../components/compare/ProgramSelector";
 import AdvisorReport from "../components/advisor/AdvisorReport";
+import { readEventStream } from "../utils/sse";
 
 // ─── Steps ──────────────────────────────────────────────────────
 const STEPS = [
@@ -361,7 +362,7 @@ function ProgressPage() {
       setComparisonData(compareData);
 
       const aiResponse = await fetch(
-        `${import.meta.env.VITE_API_URL || "http://localhost:8000"}/switch-advisor`,
+        `${import.meta.env.VITE_API_URL || "http://localhost:8000"}/switch-advisor/stream`,
         {
           method: "POST",
           headers: { "Content-Type": "application/json" },
@@ -375,9 +376,28 @@ function ProgressPage() {
           }),
         }
       );
-      const aiData = await aiResponse.json();
-      if (!aiResponse.ok) throw new Error(aiData.detail || "Transfer analysis failed");
-      setAiReport(aiData);
+      if (!aiResponse.ok || !aiResponse.body) {
+        const aiData = await aiResponse.json().catch(() => ({}));
+        throw new Error(aiData.detail || "Transfer analysis failed");
+      }
+
+      // Fields stream in verdict-first; show the report as soon as the first one lands
+      let report = {};
+      let completed = false;
+      await readEventStream(aiResponse, (event) => {
+        if (event.type === "field") {
+          report = { ...report, [event.name]: event.value };
+          setAiReport(report);
+          setReportLoading(false);
+        } else if (event.type === "done") {
+          const { type, cached, ...verdict } = event;
+          setAiReport(verdict);
+          completed = true;
+        } else if (event.type === "error") {
+          throw new Error(event.detail || "Transfer analysis failed");
+        }
+      });
+      if (!completed) throw new Error("Transfer analysis was interrupted. Please try again.");
     } catch (err) {
       console.error(err);
       setReportError(err.message || "Something went wrong. Please try again.");
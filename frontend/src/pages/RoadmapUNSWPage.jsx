@@ -1,4 +1,4 @@
-import { useCallback, useEffect, useMemo, useState } from "react";
+import { useCallback, useEffect, useMemo, useRef, useState } from "react";
 import { useLocation, useNavigate } from "react-router-dom";
 import { DashboardNavBar } from "../components/DashboardNavBar";
 import GradientCard from "../components/GradientCard";
@@ -17,6 +17,7 @@ import SocietiesCommunity from "../components/roadmap/SocietiesCommunity";
 import SpecialisationUNSW from "../components/roadmap/SpecialisationUNSW";
 import SectionTitle from "../components/SectionTitle";
 import { supabase } from "../supabaseClient";
+import { readEventStream } from "../utils/sse";
 
 const DEFAULT_PROGRAM_NAME = "Selected degree";
 const DEFAULT_UAC_CODE = "—";
@@ -81,6 +82,17 @@ const getSelectionRank = (entryRequirements) => {
     null;
 };
 
+// Sections filled in by the background pipelines after the roadmap is created
+const LIVE_SECTIONS = [
+  "flexibility_detailed",
+  "industry_societies",
+  "industry_experience",
+  "career_pathways",
+];
+
+const hasAllSections = (payload) =>
+  !!payload && LIVE_SECTIONS.every((key) => payload[key]);
+
 const useRoadmapData = (
   preloadedPayload,
   preloadedRoadmapId,
@@ -151,11 +163,22 @@ const useRoadmapData = (
     fetchByIdIfNeeded();
   }, [preloadedRoadmapId, data]);
 
-  // Polling effect 
+  // Read by the live-update effect without re-subscribing on every payload merge
+  const dataRef = useRef(data);
+  useEffect(() => {
+    dataRef.current = data;
+  }, [data]);
+
+  // Live section updates: subscribe to the backend SSE channel and re-fetch the
+  // payload once per finished section. Falls back to polling if the stream fails.
   useEffect(() => {
     if (!preloadedRoadmapId) return;
 
-    const interval = setInterval(async () => {
+    let cancelled = false;
+    let interval = null;
+    const controller = new AbortController();
+
+    const refreshPayload = async () => {
       try {
         const { data: row, error } = await supabase
           .from("unsw_roadmap")
@@ -165,14 +188,15 @@ const useRoadmapData = (
 
         if (error) throw error;
 
+        const current = dataRef.current;
         const newFlex = row?.payload?.flexibility_detailed;
-        const existingFlex = data?.payload?.flexibility_detailed;
+        const existingFlex = current?.payload?.flexibility_detailed;
         const newSocieties = row?.payload?.industry_societies;
         const newExperience = row?.payload?.industry_experience;
         const newCareers = row?.payload?.career_pathways;
-        const existingSocieties = data?.payload?.industry_societies;
-        const existingExperience = data?.payload?.industry_experience;
-        const existingCareers = data?.payload?.career_pathways;
+        const existingSocieties = current?.payload?.industry_societies;
+        const existingExperience = current?.payload?.industry_experience;
+        const existingCareers = current?.payload?.career_pathways;
 
         if (
           (newSocieties && !existingSocieties) ||
@@ -186,13 +210,67 @@ const useRoadmapData = (
           }));
 
         }
+        return row?.payload;
       } catch (err) {
         console.warn("[Polling] Error:", err.message);
+        return null;
       }
-    }, 5000);
+    };
 
-    return () => clearInterval(interval);
-  }, [preloadedRoadmapId, data]);
+    const startPolling = () => {
+      if (cancelled || interval) return;
+      interval = setInterval(async () => {
+        const payload = await refreshPayload();
+        if (hasAllSections(payload) && interval) {
+          clearInterval(interval);
+          interval = null;
+        }
+      }, 5000);
+    };
+
+    const subscribe = async () => {
+      try {
+        const { data: { session } } = await supabase.auth.getSession();
+        if (!session) throw new Error("No session");
+
+        const res = await fetch(
+          `${import.meta.env.VITE_API_URL || "http://localhost:8000"}/roadmap/unsw/${preloadedRoadmapId}/events`,
+          {
+            headers: { Authorization: `Bearer ${session.access_token}` },
+            signal: controller.signal,
+          }
+        );
+        if (!res.ok || !res.body) throw new Error(`Events stream failed (${res.status})`);
+
+        let finished = false;
+        await readEventStream(res, async (event) => {
+          if (event.type === "section") await refreshPayload();
+          if (event.type === "complete") finished = true;
+          // pending === null also means this worker isn't tracking the roadmap (restart,
+          // other worker), so only trust it when every section is already saved
+          if (event.type === "subscribed" && event.pending === null) {
+            finished = hasAllSections(await refreshPayload());
+          }
+        });
+
+        // Stream ended without the backend telling us everything landed
+        if (!finished) startPolling();
+      } catch (err) {
+        if (cancelled) return;
+        console.warn("[Roadmap Events] Falling back to polling:", err.message);
+        startPolling();
+      }
+    };
+
+    refreshPayload();
+    subscribe();
+
+    return () => {
+      cancelled = true;
+      controller.abort();
+      if (interval) clearInterval(interval);
+    };
+  }, [preloadedRoadmapId]);
 
   useEffect(() => {
     if (!preloadedRoadmapId || !isRegenerating) return;
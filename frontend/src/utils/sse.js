@@ -0,0 +1,24 @@
+// Reads a server-sent events response (fetch, so it can carry auth headers and a
+// POST body) and calls onEvent with each parsed `data:` payload. Keep-alive
+// comments are skipped. Resolves when the stream ends.
+export async function readEventStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // SSE frames are separated by a blank line
+    let sep;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const frame = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      const dataLine = frame.split("\n").find((line) => line.startsWith("data: "));
+      if (!dataLine) continue;
+      await onEvent(JSON.parse(dataLine.slice(6)));
+    }
+  }
+}